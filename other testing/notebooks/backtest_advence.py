@@ -1,6 +1,8 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from tradingview_loader import load_tradingview
+from portfolio_backtest import run_strategies_batch, run_strategy_vectorized
 
 # ==========================================
 # ⚙️ ตั้งค่าพอร์ตโฟลิโอ (Strategy Settings)
@@ -17,21 +19,9 @@ weights_buffered = {'FRT': 0.35, 'HPG': 0.35, 'MWG': 0.20, 'POW': 0.10}
 # ==========================================
 
 def load_data(filename):
-    # ฟังก์ชันอ่านไฟล์ CSV เหมือนเดิม
+    # ใช้ loader กลาง (มี cache เป็นไฟล์ Feather ข้าง CSV)
     try:
-        df = pd.read_csv(filename)
-        time_col = df.columns[0]
-        try:
-            if df[time_col].dtype in ['int64', 'float64']:
-                df[time_col] = pd.to_datetime(df[time_col], unit='s')
-            else:
-                df[time_col] = pd.to_datetime(df[time_col])
-        except: pass
-        df.set_index(time_col, inplace=True)
-        df.columns = [col.split(' ')[0] for col in df.columns]
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-        return df
+        return load_tradingview(filename)
     except Exception as e:
         print(f"Error: {e}")
         return None
@@ -41,44 +31,10 @@ def run_strategy(prices, weights, rebalance=False):
     Core Engine สำหรับคำนวณเงินในพอร์ต
     rebalance=True : จะทำการปรับพอร์ตทุกต้นปี (Sell High, Buy Low)
     rebalance=False: ถือยาว (Let Profit Run) สัดส่วนจะเพี้ยนไปตามราคาหุ้น
+    หรือระบุรอบเองได้: 'quarterly', 'monthly' หรือ list ของวันที่
+    (คำนวณแบบ vectorized ทั้งก้อน ดู portfolio_backtest.py)
     """
-    # กรองเอาเฉพาะหุ้นที่มีในสูตร
-    tickers = list(weights.keys())
-    data = prices[tickers].dropna()
-    
-    # เงินลงทุนเริ่มต้น
-    cash = initial_capital
-    
-    # คำนวณจำนวนหุ้นที่ซื้อได้ ณ วันแรก
-    shares = {}
-    start_prices = data.iloc[0]
-    for ticker, w in weights.items():
-        shares[ticker] = (cash * w) / start_prices[ticker]
-        
-    equity_curve = []
-    
-    # วนลูปตรวจสอบทีละวัน (Time-Series Loop)
-    current_year = data.index[0].year
-    
-    for date, row in data.iterrows():
-        # 1. คำนวณมูลค่าพอร์ตวันนี้
-        current_val = sum(shares[t] * row[t] for t in tickers)
-        equity_curve.append(current_val)
-        
-        # 2. Logic การ Rebalance (ปรับพอร์ต)
-        if rebalance:
-            # ถ้าปีเปลี่ยน (ขึ้นปีใหม่) ให้ปรับพอร์ต
-            if date.year != current_year:
-                # print(f"🔄 Rebalancing at {date.date()}...") # ปลดคอมเมนต์ถ้าอยากเห็น log
-                
-                # คำนวณจำนวนหุ้นใหม่ ตามมูลค่าพอร์ตปัจจุบัน
-                # (ขายตัวแพง ซื้อตัวถูก ให้กลับมาเท่า % เป้าหมาย)
-                for ticker, w in weights.items():
-                    shares[ticker] = (current_val * w) / row[ticker]
-                
-                current_year = date.year # อัปเดตปีปัจจุบัน
-
-    return pd.Series(equity_curve, index=data.index)
+    return run_strategy_vectorized(prices, weights, initial_capital, rebalance=rebalance)
 
 # --- Main Execution ---
 df = load_data(csv_filename)
@@ -90,11 +46,9 @@ if df is not None:
     all_tickers = list(set(list(weights_original.keys()) + list(weights_buffered.keys())))
     price_data = df[all_tickers].dropna()
 
-    # 1. Run: Original (Buy & Hold)
-    equity_orig = run_strategy(price_data, weights_original, rebalance=False)
-    
-    # 2. Run: Buffered (Buy & Hold)
-    equity_buf = run_strategy(price_data, weights_buffered, rebalance=False)
+    # 1-2. Run: Original และ Buffered (Buy & Hold) ในการคำนวณเดียว
+    equity_bh, stats_bh = run_strategies_batch(price_data, [weights_original, weights_buffered], initial_capital)
+    equity_orig, equity_buf = equity_bh[0], equity_bh[1]
     
     # 3. Run: Buffered + Rebalancing (พระเอกของเรา)
     equity_rebal = run_strategy(price_data, weights_buffered, rebalance=True)
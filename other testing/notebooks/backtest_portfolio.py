@@ -1,6 +1,7 @@
 import pandas as pd
 import matplotlib.pyplot as plt
 import numpy as np
+from tradingview_loader import load_tradingview
 
 # ==========================================
 # ⚙️ ตั้งค่าพอร์ตโฟลิโอของคุณ
@@ -21,24 +22,8 @@ csv_filename = 'tradingview_data.csv'
 
 def run_backtest(filename, weights, capital):
     try:
-        # 1. อ่านและ Clean ข้อมูล (ใช้ Logic เดิมที่เสถียรแล้ว)
-        df = pd.read_csv(filename)
-        time_col = df.columns[0]
-        try:
-            if df[time_col].dtype in ['int64', 'float64']:
-                df[time_col] = pd.to_datetime(df[time_col], unit='s')
-            else:
-                df[time_col] = pd.to_datetime(df[time_col])
-        except: pass
-        df.set_index(time_col, inplace=True)
-        
-        # Clean ชื่อ Column
-        original_columns = df.columns.tolist()
-        df.columns = [col.split(' ')[0] for col in df.columns]
-        
-        # แปลงเป็นตัวเลข
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
+        # 1. อ่านและ Clean ข้อมูล (loader กลาง: parse ครั้งเดียวแล้ว cache เป็น Feather)
+        df = load_tradingview(filename)
         
         # หุ้นในพอร์ต
         tickers = list(weights.keys())
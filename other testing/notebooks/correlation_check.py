@@ -1,37 +1,24 @@
 import pandas as pd
 import seaborn as sns
 import matplotlib.pyplot as plt
+from tradingview_loader import load_tradingview
+from rolling_correlation import RollingCorrelation
 
 # ตั้งค่าชื่อไฟล์
 csv_filename = 'tradingview_data.csv'
 
+# ตั้งค่า Rolling Correlation: หน้าต่าง (วัน) และระดับที่แจ้งเตือนเมื่อคู่ไหนตัดผ่าน
+rolling_window = 60
+alert_levels = (0.3, 0.5)
+
 def analyze_tradingview_data_v2(filename):
     try:
         print(f"📂 กำลังอ่านไฟล์: {filename} ...")
-        df = pd.read_csv(filename)
-        
-        # 1. จัดการเรื่องเวลา (Index)
-        time_col = df.columns[0]
-        try:
-            if df[time_col].dtype in ['int64', 'float64']:
-                df[time_col] = pd.to_datetime(df[time_col], unit='s')
-            else:
-                df[time_col] = pd.to_datetime(df[time_col])
-        except Exception:
-            pass # ถ้าแปลงไม่ได้ ให้ใช้ค่าเดิมไปก่อน
-        
-        df.set_index(time_col, inplace=True)
-
-        # 2. ทำความสะอาดชื่อ Column (เอาคำว่า ' · HOSE: close' ออก เพื่อให้อ่านง่าย)
-        # ตัวอย่าง: 'HPG · HOSE: close' -> 'HPG'
-        df.columns = [col.split(' ')[0] for col in df.columns]
+        # 1-3. อ่านไฟล์, จัดการเวลา, ทำความสะอาดชื่อ Column และแปลงเป็นตัวเลข (loader กลาง)
+        # ตัวอย่างชื่อ Column: 'HPG · HOSE: close' -> 'HPG'
+        df = load_tradingview(filename)
         print(f"📊 หุ้นที่พบ: {df.columns.tolist()}")
 
-        # 3. แปลงข้อมูลเป็นตัวเลข (Force Numeric)
-        # เผื่อมี text แปลกๆ เช่น 'Invalid symbol' จะถูกเปลี่ยนเป็น NaN
-        for col in df.columns:
-            df[col] = pd.to_numeric(df[col], errors='coerce')
-
         # 4. ลบ Column ที่ไม่มีข้อมูลเลย (All NaN) ออกไปก่อน
         df.dropna(axis=1, how='all', inplace=True)
 
@@ -46,6 +33,12 @@ def analyze_tradingview_data_v2(filename):
         print("\n--- Correlation Matrix Result (Top Pairs) ---")
         print(corr_matrix.round(2))
 
+        # 6.1 Rolling Correlation: อัปเดตทีละวัน แจ้งเฉพาะคู่ที่ตัดผ่าน alert_levels
+        monitor = RollingCorrelation(returns.columns, rolling_window, alert_levels)
+        alerts = monitor.run(returns)
+        print(f"\n--- Rolling {rolling_window}D Correlation Alerts (ล่าสุด) ---")
+        print(alerts.tail(20).round(2).to_string(index=False) if not alerts.empty else "ไม่มีคู่ที่ตัดผ่าน")
+
         # 7. พล็อตกราฟ
         plt.figure(figsize=(12, 10))
         sns.heatmap(corr_matrix, 
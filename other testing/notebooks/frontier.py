@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+import scipy.optimize as sco
+
+TRADING_DAYS = 252
+
+
+class OptimizationError(RuntimeError):
+    """SLSQP หาคำตอบไม่สำเร็จ (ข้อความจาก scipy อยู่ใน message)"""
+
+
+def _checked(result, what):
+    """คืน result.x ถ้า optimizer สำเร็จ ไม่งั้น raise พร้อม result.message"""
+    if not result.success:
+        raise OptimizationError(f"{what} ไม่ converge: {result.message}")
+    return result.x
+
+
+def annualized_inputs(returns):
+    """
+    เตรียม input สำหรับ optimizer เป็น numpy array (ไม่ใช้ pandas ใน loop)
+    returns: DataFrame ผลตอบแทนรายวัน
+    คืนค่า : (mu, cov) ต่อปี
+    """
+    r = np.asarray(returns, dtype=np.float64)
+    mu = r.mean(axis=0) * TRADING_DAYS
+    cov = np.cov(r, rowvar=False) * TRADING_DAYS
+    return mu, np.atleast_2d(cov)
+
+
+def _variance(w, cov):
+    return w @ cov @ w
+
+
+def _variance_jac(w, cov):
+    return 2.0 * (cov @ w)
+
+
+def _neg_sharpe_and_jac(w, mu, cov, rf_rate):
+    """ค่า -Sharpe พร้อม gradient แบบ analytic (ไม่ต้องใช้ finite difference)"""
+    cov_w = cov @ w
+    vol = np.sqrt(w @ cov_w)
+    excess = w @ mu - rf_rate
+    sharpe = excess / vol
+    grad = mu / vol - excess * cov_w / vol ** 3
+    return -sharpe, -grad
+
+
+_SUM_TO_ONE = {'type': 'eq', 'fun': lambda w: w.sum() - 1.0, 'jac': lambda w: np.ones_like(w)}
+
+
+def max_sharpe(mu, cov, rf_rate, w0=None, bounds=None):
+    """หาพอร์ต Sharpe สูงสุด (Long only) ด้วย SLSQP + analytic jacobian"""
+    n = len(mu)
+    w0 = np.full(n, 1.0 / n) if w0 is None else w0
+    bounds = bounds or tuple((0.0, 1.0) for _ in range(n))
+    result = sco.minimize(_neg_sharpe_and_jac, w0, args=(mu, cov, rf_rate), jac=True,
+                          method='SLSQP', bounds=bounds, constraints=(_SUM_TO_ONE,))
+    return _checked(result, "Max-Sharpe")
+
+
+def min_variance(cov, w0=None, bounds=None):
+    """หาพอร์ตความผันผวนต่ำสุด (Long only)"""
+    n = cov.shape[0]
+    w0 = np.full(n, 1.0 / n) if w0 is None else w0
+    bounds = bounds or tuple((0.0, 1.0) for _ in range(n))
+    result = sco.minimize(_variance, w0, args=(cov,), jac=_variance_jac,
+                          method='SLSQP', bounds=bounds, constraints=(_SUM_TO_ONE,))
+    return _checked(result, "Min-Variance")
+
+
+def efficient_frontier(returns, rf_rate=0.02, n_points=30, bounds=None):
+    """
+    สร้างเส้น Efficient Frontier ตั้งแต่พอร์ต Min-Variance ไปจนถึงพอร์ต Max-Sharpe
+
+    - ใช้ covariance เป็น numpy array และ gradient แบบ analytic ทุกจุด
+    - แต่ละจุด warm-start จากคำตอบของจุดก่อนหน้า (เป้าหมายผลตอบแทนต่างกันนิดเดียว
+      คำตอบจึงอยู่ใกล้กัน SLSQP เลยใช้รอบน้อยลงมาก)
+
+    returns : DataFrame ผลตอบแทนรายวัน (column = หุ้น)
+    n_points: จำนวนจุดบนเส้น (M)
+    คืนค่า  : DataFrame 1 แถวต่อจุด: target_return, return, volatility, sharpe, iterations,
+              success, message และน้ำหนักแต่ละหุ้น
+              จุดที่ SLSQP ไม่ converge จะมี success=False, message จาก scipy และตัวเลขเป็น NaN
+              (จุดถัดไป warm-start จากจุดล่าสุดที่สำเร็จ)
+    raise   : OptimizationError ถ้าหาพอร์ต Min-Variance หรือ Max-Sharpe (หัว/ท้ายของเส้น) ไม่ได้
+    """
+    tickers = list(returns.columns)
+    mu, cov = annualized_inputs(returns)
+    n = len(tickers)
+    bounds = bounds or tuple((0.0, 1.0) for _ in range(n))
+
+    w_min = min_variance(cov, bounds=bounds)
+    w_max = max_sharpe(mu, cov, rf_rate, w0=w_min, bounds=bounds)
+    targets = np.linspace(w_min @ mu, w_max @ mu, n_points)
+
+    rows = []
+    w = w_min
+    for target in targets:
+        on_target = {'type': 'eq', 'fun': lambda x, t=target: x @ mu - t, 'jac': lambda x: mu}
+        result = sco.minimize(_variance, w, args=(cov,), jac=_variance_jac, method='SLSQP',
+                              bounds=bounds, constraints=(_SUM_TO_ONE, on_target))
+        if not result.success:
+            rows.append([target, np.nan, np.nan, np.nan, result.nit, False, result.message] + [np.nan] * n)
+            continue
+        w = result.x
+        ret, vol = w @ mu, np.sqrt(_variance(w, cov))
+        rows.append([target, ret, vol, (ret - rf_rate) / vol, result.nit, True, result.message] + list(w))
+
+    columns = ['target_return', 'return', 'volatility', 'sharpe', 'iterations', 'success', 'message'] + tickers
+    return pd.DataFrame(rows, columns=columns)
@@ -2,6 +2,8 @@ import pandas as pd
 import numpy as np
 import scipy.optimize as sco
 import matplotlib.pyplot as plt
+from tradingview_loader import load_tradingview
+from frontier import efficient_frontier
 
 # ==========================================
 # ⚙️ ตั้งค่า: เลือกหุ้นที่ต้องการนำมาจัดพอร์ต
@@ -18,28 +20,8 @@ risk_free_rate = 0.02
 
 def get_clean_data(filename, tickers):
     try:
-        df = pd.read_csv(filename)
-        
-        # จัดการเรื่องเวลา
-        time_col = df.columns[0]
-        try:
-            if df[time_col].dtype in ['int64', 'float64']:
-                df[time_col] = pd.to_datetime(df[time_col], unit='s')
-            else:
-                df[time_col] = pd.to_datetime(df[time_col])
-        except:
-            pass
-        df.set_index(time_col, inplace=True)
-
-        # Clean ชื่อ Column
-        df.columns = [col.split(' ')[0] for col in df.columns]
-        
-        # เลือกเฉพาะหุ้นที่เราสนใจ
-        data = df[tickers].copy()
-        
-        # แปลงเป็นตัวเลขและลบ NaN
-        for col in data.columns:
-            data[col] = pd.to_numeric(data[col], errors='coerce')
+        # อ่านเฉพาะหุ้นที่เราสนใจ (loader กลาง: จัดการเวลา, ชื่อ Column และแปลงเป็นตัวเลขให้แล้ว)
+        data = load_tradingview(filename, tickers)
         
         # ใช้ data.dropna() เพื่อให้ได้ช่วงเวลาที่ทุกตัวมีข้อมูลพร้อมกันจริงๆ
         # (สำคัญมากสำหรับการทำ Optimization เพื่อความยุติธรรม)
@@ -114,6 +96,13 @@ if not data.empty:
     print(f"  • Sharpe Ratio: {opt_sharpe:.2f} (ยิ่งสูงยิ่งดี)")
     print("="*40)
 
+    # เส้น Efficient Frontier (Min-Variance -> Max-Sharpe) ดู frontier.py
+    frontier = efficient_frontier(returns, risk_free_rate, n_points=10)
+    print("\n📉 Efficient Frontier (ต่อปี):")
+    print(frontier[['return', 'volatility', 'sharpe']].round(3).to_string(index=False))
+    for _, point in frontier[~frontier['success']].iterrows():
+        print(f"  ⚠️ จุด target {point['target_return']:.3f} คำนวณไม่สำเร็จ: {point['message']}")
+
     # 5. (Optional) พล็อตกราฟ Pie Chart
     plt.figure(figsize=(7, 7))
     # กรองตัวที่น้ำหนักน้อยมากๆ ออก (เช่น < 1%) เพื่อความสวยงาม
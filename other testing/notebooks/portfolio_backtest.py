@@ -0,0 +1,111 @@
+import numpy as np
+import pandas as pd
+
+# ความถี่การ Rebalance ที่รองรับ -> Period ของ pandas
+REBALANCE_PERIODS = {
+    'annual': 'Y',
+    'quarterly': 'Q',
+    'monthly': 'M',
+}
+
+
+def rebalance_mask(index, frequency):
+    """
+    คืน array bool ว่าแถวไหนเป็นวัน Rebalance (วันแรกของรอบใหม่)
+
+    frequency: None/False = ไม่ Rebalance, 'annual' / 'quarterly' / 'monthly'
+               หรือ list ของวันที่เอง (จะ Rebalance ในวันทำการแรกที่ >= วันนั้น)
+    แถวแรกไม่นับเป็นวัน Rebalance (เป็นวันซื้อครั้งแรก)
+    """
+    index = pd.DatetimeIndex(index)
+    mask = np.zeros(len(index), dtype=bool)
+    if not frequency or len(index) == 0:
+        return mask
+
+    if isinstance(frequency, str):
+        if frequency not in REBALANCE_PERIODS:
+            raise ValueError(f"frequency ต้องเป็น {list(REBALANCE_PERIODS)} หรือ list ของวันที่")
+        periods = index.to_period(REBALANCE_PERIODS[frequency]).asi8
+        mask[1:] = periods[1:] != periods[:-1]
+        return mask
+
+    # Custom calendar
+    dates = pd.DatetimeIndex(pd.to_datetime(list(frequency))).sort_values()
+    rows = np.unique(index.searchsorted(dates, side='left'))
+    rows = rows[(rows > 0) & (rows < len(index))]
+    mask[rows] = True
+    return mask
+
+
+def _weight_matrix(weights):
+    """
+    แปลง weights เป็น DataFrame (K x N): แต่ละแถวคือ 1 พอร์ต, แต่ละคอลัมน์คือหุ้น
+    รับได้ทั้ง dict เดียว, list ของ dict หรือ DataFrame (columns = ชื่อหุ้น)
+    """
+    if isinstance(weights, dict):
+        weights = [weights]
+    if isinstance(weights, list):
+        weights = pd.DataFrame(weights)
+    return weights.fillna(0.0).astype(np.float64)
+
+
+def run_strategies_batch(prices, weights, initial_capital, rebalance=False):
+    """
+    รัน Backtest หลายพอร์ตพร้อมกันในการคำนวณเดียว (K พอร์ต x N หุ้น)
+
+    weights : DataFrame (K x N, columns = ชื่อหุ้น) หรือ list ของ dict
+              หุ้นที่ไม่ได้ใส่ในพอร์ตไหนถือว่าน้ำหนัก 0
+    คืนค่า  : (equity, stats)
+              equity = DataFrame (วัน x K) มูลค่าพอร์ตแต่ละแบบ
+              stats  = DataFrame (K แถว) final_value, total_return, cagr, max_drawdown
+    ใช้เฉพาะวันที่หุ้นทุกตัวใน weights มีราคาครบ
+    """
+    w = _weight_matrix(weights)
+    tickers = list(w.columns)
+    data = prices[tickers].dropna()
+    p = data.to_numpy(dtype=np.float64)
+    W = w.to_numpy()                                 # (K, N)
+
+    frequency = 'annual' if rebalance is True else rebalance
+    mask = rebalance_mask(data.index, frequency)
+    segment = np.cumsum(mask)                       # รอบที่ของแต่ละวัน
+    starts = np.concatenate(([0], np.flatnonzero(mask)))
+
+    # การเติบโตภายในรอบ เทียบกับราคาวันต้นรอบ: (T x N) @ (N x K)
+    growth = (p / p[starts[segment]]) @ W.T
+
+    # ทุนต้นรอบ: รอบแรก = เงินตั้งต้น, รอบถัดไปคูณการเติบโตของรอบก่อนหน้า ณ วันต้นรอบใหม่
+    boundary_growth = (p[starts[1:]] / p[starts[:-1]]) @ W.T
+    base = initial_capital * np.vstack((np.ones((1, W.shape[0])), np.cumprod(boundary_growth, axis=0)))
+
+    values = base[segment] * growth
+    equity = pd.DataFrame(values, index=data.index, columns=w.index)
+
+    # สถิติทุกพอร์ตพร้อมกัน
+    peak = np.maximum.accumulate(values, axis=0)
+    years = (data.index[-1] - data.index[0]).days / 365.25 if len(data) > 1 else 0.0
+    total_return = values[-1] / values[0] - 1
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cagr = (values[-1] / values[0]) ** (1 / years) - 1 if years > 0 else np.full(len(W), np.nan)
+    stats = pd.DataFrame({
+        'final_value': values[-1],
+        'total_return': total_return,
+        'cagr': cagr,
+        'max_drawdown': (values / peak - 1).min(axis=0),
+    }, index=w.index)
+    return equity, stats
+
+
+def run_strategy_vectorized(prices, weights, initial_capital, rebalance=False):
+    """
+    คำนวณ Equity Curve แบบไม่ต้องวนลูปทีละวัน (ผลเท่ากับ run_strategy เดิม)
+
+    ระหว่างวัน Rebalance จำนวนหุ้นคงที่ มูลค่าพอร์ตจึงเป็น
+        ทุนต้นรอบ * sum(w * P(t) / P(วันต้นรอบ))
+    และทุนต้นรอบถัดไป = ทุนต้นรอบก่อน * การเติบโตของรอบก่อน (cumulative product)
+
+    rebalance: False = ถือยาว, True = ปรับพอร์ตทุกต้นปี (เหมือนเดิม)
+               หรือ 'annual' / 'quarterly' / 'monthly' / list ของวันที่
+    """
+    equity, _ = run_strategies_batch(prices, weights, initial_capital, rebalance)
+    return equity.iloc[:, 0].rename(None)
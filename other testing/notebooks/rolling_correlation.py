@@ -0,0 +1,127 @@
+import numpy as np
+import pandas as pd
+
+
+class RollingCorrelation:
+    """
+    Correlation Matrix แบบ Rolling Window ที่อัปเดตทีละแถว (ไม่ต้องคำนวณใหม่ทั้งหน้าต่าง)
+
+    เก็บผลรวมสะสม (running sums) แบบ pairwise ขนาด N x N:
+        count[i, j] = จำนวนวันที่หุ้น i และ j มีข้อมูลทั้งคู่
+        sx[i, j]    = ผลรวม x_i ในวันเหล่านั้น (sxx = ผลรวม x_i^2)
+        sxy[i, j]   = ผลรวม x_i * x_j
+    แถวใหม่เข้ามา -> บวกเข้า, แถวที่หลุดหน้าต่าง -> ลบออก = O(N^2) ต่อวัน
+    ผลเท่ากับ returns.rolling(window).corr() ของ pandas (จัดการ NaN แบบ pairwise เหมือนกัน)
+
+    levels: ระดับ Correlation ที่ต้องการแจ้งเตือนเมื่อคู่ไหนตัดผ่าน (เช่น 0.5)
+    """
+
+    def __init__(self, tickers, window=60, levels=(0.5,), min_periods=None, recompute_every=1000):
+        self.tickers = list(tickers)
+        self.window = int(window)
+        self.levels = np.asarray(levels, dtype=np.float64)
+        self.min_periods = self.window if min_periods is None else int(min_periods)
+        # บวก/ลบสะสมนานๆ จะมี error ทศนิยมสะสม -> คำนวณผลรวมใหม่จาก buffer เป็นระยะ
+        self.recompute_every = recompute_every
+
+        n = len(self.tickers)
+        self._buffer = np.full((self.window, n), np.nan)
+        self._pos = 0
+        self._filled = 0
+        self._updates = 0
+        self._count = np.zeros((n, n))
+        self._sx = np.zeros((n, n))
+        self._sxx = np.zeros((n, n))
+        self._sxy = np.zeros((n, n))
+        self._iu = np.triu_indices(n, k=1)
+        self._corr = np.full((n, n), np.nan)
+
+    @staticmethod
+    def _terms(row):
+        valid = np.isfinite(row)
+        x = np.where(valid, row, 0.0)
+        m = valid.astype(np.float64)
+        return np.outer(m, m), np.outer(x, m), np.outer(x * x, m), np.outer(x, x)
+
+    def _add(self, row, sign):
+        count, sx, sxx, sxy = self._terms(row)
+        self._count += sign * count
+        self._sx += sign * sx
+        self._sxx += sign * sxx
+        self._sxy += sign * sxy
+
+    def _recompute(self):
+        rows = self._buffer[:self._filled]
+        valid = np.isfinite(rows)
+        x = np.where(valid, rows, 0.0)
+        m = valid.astype(np.float64)
+        self._count = m.T @ m
+        self._sx = x.T @ m
+        self._sxx = (x * x).T @ m
+        self._sxy = x.T @ x
+
+    def _correlation(self):
+        n = self._count
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = self._sxy - self._sx * self._sx.T / n
+            var_i = self._sxx - self._sx ** 2 / n
+            corr = cov / np.sqrt(var_i * var_i.T)
+        corr = np.clip(corr, -1.0, 1.0)
+        corr[n < max(self.min_periods, 2)] = np.nan
+        return corr
+
+    def update(self, returns_row, date=None):
+        """
+        ใส่ผลตอบแทน 1 วัน (array ยาว N ตามลำดับ tickers, NaN = ไม่มีข้อมูล)
+        คืนค่า: list ของคู่ที่ Correlation ตัดผ่าน levels ในวันนี้ (ว่างถ้าไม่มี)
+        """
+        row = np.asarray(returns_row, dtype=np.float64)
+        if self._filled == self.window:
+            self._add(self._buffer[self._pos], -1.0)
+        else:
+            self._filled += 1
+        self._buffer[self._pos] = row
+        self._pos = (self._pos + 1) % self.window
+        self._updates += 1
+        if self.recompute_every and self._updates % self.recompute_every == 0:
+            self._recompute()
+        else:
+            self._add(row, 1.0)
+
+        previous, self._corr = self._corr, self._correlation()
+        return self._crossings(previous, self._corr, date)
+
+    def _crossings(self, previous, current, date):
+        i, j = self._iu
+        before, after = previous[i, j], current[i, j]
+        # ตัดผ่าน = อยู่คนละฝั่งของ level ระหว่างเมื่อวานกับวันนี้ (ข้ามคู่ที่ยังไม่มีค่า)
+        side_before = before[:, None] >= self.levels[None, :]
+        side_after = after[:, None] >= self.levels[None, :]
+        known = np.isfinite(before) & np.isfinite(after)
+        pairs, levels = np.nonzero((side_before != side_after) & known[:, None])
+        return [{
+            'date': date,
+            'asset1': self.tickers[i[p]],
+            'asset2': self.tickers[j[p]],
+            'level': float(self.levels[k]),
+            'previous': float(before[p]),
+            'correlation': float(after[p]),
+            'direction': 'up' if side_after[p, k] else 'down',
+        } for p, k in zip(pairs, levels)]
+
+    @property
+    def matrix(self):
+        """Correlation Matrix ล่าสุดเป็น DataFrame (N x N)"""
+        return pd.DataFrame(self._corr, index=self.tickers, columns=self.tickers)
+
+    def run(self, returns):
+        """
+        ป้อนผลตอบแทนย้อนหลังทั้งตารางทีละแถว (เหมือนได้ข้อมูลมาทุกวัน)
+        คืนค่า: DataFrame ของ Alert ทั้งหมด เรียงตามวัน
+        """
+        values = returns[self.tickers].to_numpy(dtype=np.float64)
+        alerts = []
+        for date, row in zip(returns.index, values):
+            alerts.extend(self.update(row, date))
+        columns = ['date', 'asset1', 'asset2', 'level', 'previous', 'correlation', 'direction']
+        return pd.DataFrame(alerts, columns=columns)
@@ -0,0 +1,124 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # ไม่มี pyarrow ก็ยังอ่าน CSV ได้ แค่ไม่มี cache
+    feather = None
+
+
+def clean_column_name(col):
+    # 'HPG · HOSE: close' -> 'HPG' (เหมือน Logic เดิมในทุก notebook)
+    return col.split(' ')[0]
+
+
+def _file_sha1(filename):
+    digest = hashlib.sha1()
+    with open(filename, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _parse_csv(filename):
+    """
+    อ่าน CSV ของ TradingView ครั้งเดียวแบบกำหนด dtype ชัดเจน
+    (คอลัมน์แรก = เวลา, ที่เหลือ = ราคา float64)
+    """
+    header = pd.read_csv(filename, nrows=0).columns.tolist()
+    time_col, value_cols = header[0], header[1:]
+    try:
+        df = pd.read_csv(filename, dtype={c: np.float64 for c in value_cols})
+    except ValueError:
+        # มี text แปลกๆ เช่น 'Invalid symbol' -> แปลงเป็น NaN ทีเดียวทั้งตาราง
+        df = pd.read_csv(filename, dtype={c: object for c in value_cols})
+        df[value_cols] = df[value_cols].apply(pd.to_numeric, errors='coerce')
+
+    try:
+        if df[time_col].dtype in ['int64', 'float64']:
+            df[time_col] = pd.to_datetime(df[time_col], unit='s')
+        else:
+            df[time_col] = pd.to_datetime(df[time_col])
+    except Exception:
+        pass
+    df.set_index(time_col, inplace=True)
+    df.columns = [clean_column_name(col) for col in df.columns]
+    return df
+
+
+def _sidecar_path(filename, sha1):
+    stem, _ = os.path.splitext(filename)
+    return f"{stem}.{sha1[:12]}.feather"
+
+
+def _cached_sidecar(filename):
+    """
+    คืน path ของไฟล์ Feather ที่ตรงกับ CSV ปัจจุบัน (สร้างใหม่ถ้ายังไม่มีหรือ CSV เปลี่ยน)
+    ใช้ mtime + ขนาดไฟล์เช็คเร็วๆ ก่อน ถ้าไม่ตรงค่อยคำนวณ hash
+    """
+    index_path = filename + '.cache.json'
+    stat = os.stat(filename)
+    try:
+        with open(index_path, encoding='utf-8') as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = {}
+
+    sidecar = index.get('sidecar')
+    if sidecar and os.path.exists(sidecar):
+        if index.get('mtime_ns') == stat.st_mtime_ns and index.get('size') == stat.st_size:
+            return sidecar
+        sha1 = _file_sha1(filename)
+        if index.get('sha1') == sha1:
+            # แค่ mtime เปลี่ยน (เช่น copy ไฟล์) เนื้อหาเหมือนเดิม
+            index.update(mtime_ns=stat.st_mtime_ns, size=stat.st_size)
+            with open(index_path, 'w', encoding='utf-8') as f:
+                json.dump(index, f)
+            return sidecar
+    else:
+        sha1 = _file_sha1(filename)
+
+    df = _parse_csv(filename)
+    new_sidecar = _sidecar_path(filename, sha1)
+    table = df.reset_index()
+    table.columns = [str(c) for c in table.columns]
+    # ไม่บีบอัด เพื่อให้ memory-map อ่านได้ตรงๆ
+    feather.write_feather(table, new_sidecar, compression='uncompressed')
+    if sidecar and sidecar != new_sidecar and os.path.exists(sidecar):
+        os.remove(sidecar)
+
+    index = {'mtime_ns': stat.st_mtime_ns, 'size': stat.st_size, 'sha1': sha1, 'sidecar': new_sidecar}
+    with open(index_path, 'w', encoding='utf-8') as f:
+        json.dump(index, f)
+    return new_sidecar
+
+
+def load_tradingview(filename, tickers=None, use_cache=True):
+    """
+    โหลดไฟล์ export ของ TradingView เป็น DataFrame ราคา (index = เวลา, column = ชื่อหุ้น)
+
+    ครั้งแรกจะ parse CSV แล้วเขียนไฟล์ Feather ไว้ข้างๆ (ผูกกับ mtime + hash ของ CSV)
+    ครั้งต่อไปจะ memory-map ไฟล์ Feather และอ่านเฉพาะคอลัมน์ที่ขอ
+
+    filename : path ของ CSV
+    tickers  : list ชื่อหุ้นที่ต้องการ (None = ทุกคอลัมน์) ถ้าไม่มีในไฟล์จะ raise KeyError
+    use_cache: False = อ่าน CSV ตรงๆ ไม่ใช้/ไม่สร้าง sidecar
+    """
+    if not use_cache or feather is None:
+        df = _parse_csv(filename)
+        return df[list(tickers)].copy() if tickers is not None else df
+
+    sidecar = _cached_sidecar(filename)
+    # memory-map: ยังไม่มีการ copy ข้อมูล จนกว่าจะแปลงเฉพาะคอลัมน์ที่เลือกเป็น pandas
+    table = feather.read_table(sidecar, memory_map=True)
+    time_col = table.column_names[0]
+    if tickers is not None:
+        missing = [t for t in tickers if t not in table.column_names[1:]]
+        if missing:
+            raise KeyError(missing[0] if len(missing) == 1 else missing)
+        table = table.select([time_col] + list(tickers))
+    return table.to_pandas().set_index(time_col)
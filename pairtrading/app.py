@@ -4,7 +4,20 @@ import pandas as pd
 import plotly.graph_objects as go
 import gspread
 from datetime import datetime, timedelta
-from data_processing import get_market_data
+import os
+import time
+from data_processing import load_prices, get_cointegration
+from core.cache import NullCache, set_cache
+from core.market import pair_prices, calculate_spread, add_rolling_stats
+from core.pipeline import StagePipeline
+from core.decimate import DEFAULT_CHART_WIDTH, decimate_series, max_points_for_width
+from tracing import span, traced, tracer
+from cointegration import hedge_formula
+from hedge import HEDGE_MODES
+from bars import DEFAULT_DAYS, INTERVALS, parse_window
+from core.scheduler import RefreshScheduler, SignalSnapshot, load_watchlist
+from ledger import current_holdings
+from journal import TradeJournal, SheetSyncWorker, LEGACY_COLUMN_MAP
 from strategy import calculate_portfolio_values, calculate_target_values, calculate_target_diffs, get_z_score_advice, generate_action_card
 
 # ---------------------------------------------------------
@@ -12,6 +25,20 @@ from strategy import calculate_portfolio_values, calculate_target_values, calcul
 # ---------------------------------------------------------
 st.set_page_config(page_title="Smart Pair Trading AI", layout="wide", page_icon="📈")
 
+# แอปแคชผลด้วย st.cache_data อยู่แล้ว (data_processing.py) ปิด cache ของ core ไม่ให้ซ้อนกัน
+# ไม่งั้นราคาอาจค้างได้ถึง 2 x 300 วินาที
+set_cache(NullCache())
+
+# เปิด Tracing ด้วย PAIRTRADING_TRACE=1 หรือเปิดหน้าเว็บด้วย ?debug=1 (ปิดอยู่แทบไม่มีค่าใช้จ่าย)
+# แต่ละ session มี trace ของตัวเอง ?debug=1 จึงเปิดเฉพาะผู้ใช้คนนั้น
+if 'trace_session' not in st.session_state:
+    st.session_state.trace_session = tracer.session()
+trace_session = st.session_state.trace_session
+if st.query_params.get("debug") == "1":
+    trace_session.enabled = True
+tracer.activate(trace_session)
+trace_session.begin_rerun()
+
 # ตั้งชื่อไฟล์ Sheet ที่จะใช้เก็บข้อมูล (ต้องตรงกับที่คุณสร้างไว้)
 SHEET_NAME = "Smart_Portfolio_ZScore_Edition"
 
@@ -58,81 +85,67 @@ def init_connection():
         return None, None, error_message, None
 
 # ฟังก์ชันคำนวณยอดสินทรัพย์คงเหลือจากประวัติ
+@traced()
 def calculate_current_holdings(trade_history_df):
-    asset1_holdings = 0.0
-    asset2_holdings = 0.0
-
-    if trade_history_df.empty:
-        return 0.0, 0.0
-
-    # Use consistent internal column names
-    asset1_col_name = 'asset1_action'
-    asset2_col_name = 'asset2_action'
-
-    for index, row in trade_history_df.iterrows():
-        # Process Asset 1
-        action1 = str(row.get(asset1_col_name, '-'))
-        if ':' in action1 or ' ' in action1:
-            parts = action1.replace(':', ' ').split()
-            if len(parts) >= 2:
-                act, amount_str = parts[0], parts[1]
-                try:
-                    amount = float(amount_str)
-                    if act.upper() == 'BUY':
-                        asset1_holdings += amount
-                    elif act.upper() == 'SELL':
-                        asset1_holdings -= amount
-                except ValueError:
-                    pass # Ignore if amount is not a valid float
-
-        # Process Asset 2
-        action2 = str(row.get(asset2_col_name, '-'))
-        if ':' in action2 or ' ' in action2:
-            parts = action2.replace(':', ' ').split()
-            if len(parts) >= 2:
-                act, amount_str = parts[0], parts[1]
-                try:
-                    amount = float(amount_str)
-                    if act.upper() == 'BUY':
-                        asset2_holdings += amount
-                    elif act.upper() == 'SELL':
-                        asset2_holdings -= amount
-                except ValueError:
-                    pass # Ignore if amount is not a valid float
-
-    return asset1_holdings, asset2_holdings
+    # Vectorized parse of the action columns (see ledger.py)
+    return current_holdings(trade_history_df)
+
+# Local trade journal (source of truth) + background mirror to Google Sheet
+@st.cache_resource
+def init_journal():
+    return TradeJournal()
+
+# st.cache_resource ไม่เก็บผลที่ raise ออกไป: ถ้าชีตยังต่อไม่ได้ rerun ถัดไปจะลองใหม่เอง
+@st.cache_resource
+def init_sync_worker(_sh, _journal):
+    ws = _sh.worksheet("History_Log")
+    worker = SheetSyncWorker(_journal, ws)
+    # ทุกครั้งที่เริ่มแอป: push แถวที่ค้าง แล้วดึงแถวในชีตที่ journal ยังไม่มี (เช่นบันทึกจากเครื่องอื่น)
+    with span("gspread.get_all_records"):
+        worker.reconcile()
+    worker.start()
+    return worker
+
+# Background refresh ของคู่ใน watchlist.json (ถ้ามีไฟล์) ให้ราคาและ Z-Score พร้อมก่อนมีคนเปิดหน้า
+@st.cache_resource
+def init_scheduler():
+    watchlist = load_watchlist()
+    if not watchlist:
+        return None
+    scheduler = RefreshScheduler(watchlist)
+    scheduler.start_in_thread()
+    return scheduler
 
 # ฟังก์ชันดึงประวัติการเทรด
-def load_trade_history(sh):
+@traced()
+def load_trade_history(journal):
     try:
-        ws = sh.worksheet("History_Log")
-        data = ws.get_all_records()
-        df = pd.DataFrame(data)
-        
-        # Define potential old and new column names
-        column_map = {
-            'Gold Action': 'asset1_action',
-            'Silver Action': 'asset2_action',
-            'asset1_act': 'asset1_action',
-            'asset2_act': 'asset2_action'
-        }
-        
-        # Rename columns that exist in the dataframe
-        df.rename(columns={k: v for k, v in column_map.items() if k in df.columns}, inplace=True)
-        
+        # Only rows appended since the last rerun are parsed
+        df = journal.to_frame()
+
+        # Rename any legacy column names that are still present
+        df.rename(columns={k: v for k, v in LEGACY_COLUMN_MAP.items() if k in df.columns}, inplace=True)
+
         return df
     except Exception as e:
         return pd.DataFrame()
 
 # ฟังก์ชันบันทึกการเทรดใหม่
-def save_transaction(sh, date, action_type, z_score, asset1_act, asset2_act, note):
+@traced()
+def save_transaction(journal, worker, date, action_type, z_score, asset1_act, asset2_act, note):
     try:
-        ws = sh.worksheet("History_Log")
-        # Ensure the header row in Google Sheet is ['date', 'action_type', 'z_score', 'asset1_act', 'asset2_act', 'note']
-        row = [str(date), action_type, z_score, asset1_act, asset2_act, note]
-        ws.append_row(row)
+        # Written locally first; the sync worker pushes it to History_Log in the background
+        journal.append({
+            'date': str(date),
+            'action_type': action_type,
+            'z_score': float(z_score),
+            'asset1_action': asset1_act,
+            'asset2_action': asset2_act,
+            'note': note,
+        })
+        if worker:
+            worker.notify()
         st.toast('✅ บันทึกข้อมูลสำเร็จ!', icon='💾')
-        st.cache_data.clear() # Clear cache to get fresh data next time
     except Exception as e:
         st.error(f"บันทึกไม่สำเร็จ: {e}")
 
@@ -149,9 +162,22 @@ if toast_msg:
     st.toast(toast_msg)
 
 
+# แต่ละ session มี pipeline ของตัวเอง: stage ไหน input ไม่เปลี่ยนจะใช้ผลเดิม (ดูเวลาได้ที่ Stage timings)
+if 'pipeline' not in st.session_state:
+    st.session_state.pipeline = StagePipeline()
+pipeline = st.session_state.pipeline
+pipeline.begin()
+
 # Load trade history and calculate current holdings
-trade_history = load_trade_history(sh)
-calculated_qty1, calculated_qty2 = calculate_current_holdings(trade_history)
+journal = init_journal()
+try:
+    sync_worker = init_sync_worker(sh, journal)
+except Exception as e:
+    sync_worker = None # Journal still works offline; rows sync once the sheet is reachable
+    st.warning(f"⚠️ ยังซิงก์ History_Log ไม่ได้ (บันทึกไว้ในเครื่องก่อน จะลองใหม่รอบถัดไป): {e}")
+scheduler = init_scheduler()
+trade_history = load_trade_history(journal)
+calculated_qty1, calculated_qty2 = pipeline.run('holdings', (len(trade_history),), calculate_current_holdings, trade_history)
 
 # ---------------------------------------------------------
 # 🎨 SIDEBAR: INPUTS
@@ -166,7 +192,15 @@ with st.sidebar:
         asset1_ticker = st.text_input("Asset 1 Ticker", "GC=F")
         asset2_ticker = st.text_input("Asset 2 Ticker", "SI=F")
         spread_formula = st.text_area("Spread Formula", "(asset2 * 100) - asset1")
-        st.caption("Use 'asset1' and 'asset2' in the formula.")
+        st.caption("Use 'asset1' and 'asset2' in the formula. Allowed: + - * / ** and log, exp, sqrt, abs.")
+        hedge_mode = st.selectbox(
+            "Spread Mode", HEDGE_MODES,
+            format_func={"formula": "Formula (fixed)", "rolling_ols": "Rolling OLS hedge ratio", "kalman": "Kalman hedge ratio"}.get,
+        )
+        bar_interval = st.selectbox(
+            "Bar Interval", list(INTERVALS), index=list(INTERVALS).index("1d"),
+            format_func={"1m": "1 minute", "5m": "5 minutes", "1h": "1 hour", "1d": "1 day"}.get,
+        )
 
         st.markdown("---")
         st.subheader("Current Status")
@@ -181,22 +215,55 @@ with st.sidebar:
 
         st.markdown("---")
         st.subheader("Technical Settings")
-        rolling_window = st.slider("Rolling Window (Days)", 30, 180, 90)
+        if bar_interval == "1d":
+            rolling_window = st.slider("Rolling Window (Days)", 30, 180, 90)
+        else:
+            rolling_window = st.text_input("Rolling Window", "1d",
+                                           help="Bars (e.g. 240) or a time span: 30m, 4h, 5d (trading sessions).")
         z_score_high = st.slider("Z-Score High Threshold", 1.0, 3.0, 2.0, 0.1)
         z_score_low = st.slider("Z-Score Low Threshold", -3.0, -1.0, -2.0, 0.1)
+        chart_width = st.select_slider("Chart Resolution (px)", [600, DEFAULT_CHART_WIDTH, 2400], DEFAULT_CHART_WIDTH,
+                                       help="Long histories are reduced to about 2 points per pixel before plotting.")
 
         submitted = st.form_submit_button("🔄 Calculate Action")
 
     target_asset2_pct = 100 - target_asset1_pct
+    # ตรวจรูปแบบ Rolling Window ก่อน (จำนวนแท่ง หรือช่วงเวลาเช่น 4h, 5d)
+    try:
+        parse_window(rolling_window)
+    except ValueError as e:
+        st.error(str(e))
+        st.stop()
+    history_days = DEFAULT_DAYS[bar_interval]
+    window_label = f"{rolling_window}-Day" if bar_interval == "1d" else f"{rolling_window} ({bar_interval} bars)"
 
 # ---------------------------------------------------------
 # 📊 DASHBOARD LAYOUT
 # ---------------------------------------------------------
 st.title("📈 Smart Pair Trading Manager")
 
-# Load Data
+def prices_stage(asset1_ticker, asset2_ticker, days, interval):
+    data = load_prices((asset1_ticker, asset2_ticker), days, interval)
+    if data.empty:
+        raise ValueError("No market data")
+    return pair_prices(data, asset1_ticker, asset2_ticker, interval)
+
+def spread_stage(prices):
+    return calculate_spread(prices.copy(), spread_formula, rolling_window, hedge_mode)
+
+def z_score_stage(spread):
+    return add_rolling_stats(spread.copy(), rolling_window)
+
+# Load Data: prices -> spread -> z-score แต่ละขั้นคำนวณใหม่เฉพาะเมื่อ key ของตัวเอง/ขั้นก่อนหน้าเปลี่ยน
 try:
-    df = get_market_data(asset1_ticker, asset2_ticker, spread_formula, days=365, rolling_window=rolling_window)
+    # ราคาหมดอายุทุก 5 นาที เหมือน cache ของ load_prices
+    prices = pipeline.run('prices', (asset1_ticker, asset2_ticker, history_days, bar_interval, int(time.time() // 300)),
+                          prices_stage, asset1_ticker, asset2_ticker, history_days, bar_interval)
+    # rolling_window มีผลกับ spread เฉพาะโหมด Rolling OLS
+    spread_window = rolling_window if hedge_mode == "rolling_ols" else None
+    spread = pipeline.run('spread', (pipeline.version('prices'), spread_formula, hedge_mode, spread_window),
+                          spread_stage, prices)
+    df = pipeline.run('z_score', (pipeline.version('spread'), rolling_window), z_score_stage, spread)
     latest = df.iloc[-1]
     p_asset1, p_asset2, z_score = latest['asset1'], latest['asset2'], latest['Z_Score']
 except Exception as e:
@@ -204,7 +271,10 @@ except Exception as e:
     st.stop()
 
 # Tabs for different sections
-tab1, tab2, tab3 = st.tabs(["📊 Dashboard & Action", "📜 Trade History Log", "📖 คู่มือการใช้งาน"])
+tab_names = ["📊 Dashboard & Action", "📜 Trade History Log", "📖 คู่มือการใช้งาน"]
+if trace_session.enabled:
+    tab_names.append("🐞 Debug")
+tab1, tab2, tab3, *debug_tab = st.tabs(tab_names)
 
 with tab1:
     st.subheader("Current Holdings (from History Log)")
@@ -225,23 +295,73 @@ with tab1:
     if z_score > z_score_high: status_text, status_color = f"{asset2_ticker} Expensive", "inverse"
     elif z_score < z_score_low: status_text, status_color = f"{asset2_ticker} Cheap", "normal"
     col4.metric("Market Status", status_text, delta_color=status_color)
-    st.caption(f"The Z-score indicates how far the current spread is from its {rolling_window}-day average.")
+    st.caption(f"The Z-score indicates how far the current spread is from its {window_label} average.")
+    if 'Hedge_Ratio' in df.columns:
+        st.caption(f"Current dynamic hedge ratio: spread = {asset2_ticker} × {df['Hedge_Ratio'].iloc[-1]:.4f} − {asset1_ticker} (+ intercept)")
+
+    # Hedge ratio จากข้อมูลจริง (Engle-Granger) แทนการเดาตัวคูณเอง เช่น asset2 * 100
+    coint = get_cointegration(asset1_ticker, asset2_ticker, days=365)
+    if coint is not None and pd.notna(coint['adf_stat']):
+        verdict = "cointegrated" if coint['cointegrated'] else "not cointegrated"
+        st.info(
+            f"💡 Suggested formula (Engle-Granger): `{hedge_formula(coint['hedge_ratio'])}` — "
+            f"ADF {coint['adf_stat']:.2f} vs {coint['critical_value']:.2f} at 5% ({verdict}), "
+            f"half-life {coint['half_life']:.1f} days"
+        )
+
+    # สัญญาณล่าสุดของทุกคู่ใน watchlist (อ่านจาก snapshot ทันที ไม่ต้องคำนวณใหม่)
+    watch = scheduler.snapshot.entries() if scheduler else SignalSnapshot.read()
+    if watch:
+        with st.expander(f"👀 Watchlist ({len(watch)} pairs, refreshed in background)", expanded=False):
+            st.dataframe(pd.DataFrame([{
+                'Pair': key,
+                'Date': sig.get('date'),
+                'Z-Score': sig.get('z_score'),
+                'Advice': sig.get('advice', sig.get('error')),
+                'Updated': datetime.fromtimestamp(sig['updated_at']).strftime('%H:%M:%S'),
+            } for key, sig in watch.items()]), width='stretch', hide_index=True)
 
     # 2. Interactive Chart
-    fig = go.Figure()
-    fig.add_trace(go.Scatter(x=df.index, y=df['Z_Score'], mode='lines', name='Z-Score', line=dict(color='#3182ce')))
-    fig.add_hline(y=z_score_high, line_dash="dash", line_color="red")
-    fig.add_hline(y=z_score_low, line_dash="dash", line_color="green")
-    fig.update_layout(height=350, margin=dict(l=10, r=10, t=30, b=10), title=f"{rolling_window}-Day Z-Score Trend")
-    st.plotly_chart(fig, width='stretch')
+    # ลดจำนวนจุดก่อนส่งไปหน้าเว็บ (เก็บจุดตัดเส้น Threshold และจุดสูง/ต่ำสุดไว้ครบ)
+    # stage 'chart_data' ของ pipeline จำผลไว้แล้ว (คำนวณใหม่เมื่อ Z-Score ความกว้าง หรือ Threshold เปลี่ยน)
+    def chart_data_stage(df):
+        max_points = max_points_for_width(chart_width)
+        z = decimate_series(df['Z_Score'], max_points, (z_score_low, z_score_high))
+        spread = decimate_series(df['Spread'], max_points)
+        return z, spread
+
+    def figure_stage(z, spread):
+        fig = go.Figure()
+        fig.add_trace(go.Scatter(x=z.index, y=z, mode='lines', name='Z-Score', line=dict(color='#3182ce')))
+        fig.add_trace(go.Scatter(x=spread.index, y=spread, mode='lines', name='Spread', yaxis='y2',
+                                 visible='legendonly', line=dict(color='#a0aec0', width=1)))
+        fig.add_hline(y=z_score_high, line_dash="dash", line_color="red")
+        fig.add_hline(y=z_score_low, line_dash="dash", line_color="green")
+        fig.update_layout(height=350, margin=dict(l=10, r=10, t=30, b=10), title=f"{window_label} Z-Score Trend",
+                          yaxis2=dict(overlaying='y', side='right', showgrid=False))
+        return fig
+
+    z_points, spread_points = pipeline.run('chart_data', (pipeline.version('z_score'), chart_width, z_score_high, z_score_low),
+                                           chart_data_stage, df)
+    fig = pipeline.run('figure', (pipeline.version('chart_data'),), figure_stage, z_points, spread_points)
+    # รวมเวลา serialize figure ของ Plotly ส่งไปหน้าเว็บ
+    with span("render_chart"):
+        st.plotly_chart(fig, width='stretch')
 
     # 3. Calculation & Action
-    val_asset1, val_asset2, total_val = calculate_portfolio_values(qty_asset1, qty_asset2, p_asset1, p_asset2, cash_dca)
-    tgt_asset1, tgt_asset2 = calculate_target_values(total_val, target_asset1_pct, target_asset2_pct)
-    diff_asset1, diff_asset2 = calculate_target_diffs(val_asset1, val_asset2, tgt_asset1, tgt_asset2)
-
-    # Action Logic Override by Z-Score
-    advice = get_z_score_advice(z_score, z_score_high, z_score_low, asset1_ticker, asset2_ticker)
+    def orders_stage():
+        val_asset1, val_asset2, total_val = calculate_portfolio_values(qty_asset1, qty_asset2, p_asset1, p_asset2, cash_dca)
+        tgt_asset1, tgt_asset2 = calculate_target_values(total_val, target_asset1_pct, target_asset2_pct)
+        diff_asset1, diff_asset2 = calculate_target_diffs(val_asset1, val_asset2, tgt_asset1, tgt_asset2)
+        # Action Logic Override by Z-Score
+        advice = get_z_score_advice(z_score, z_score_high, z_score_low, asset1_ticker, asset2_ticker)
+        return diff_asset1, diff_asset2, advice
+
+    diff_asset1, diff_asset2, advice = pipeline.run(
+        'orders',
+        (pipeline.version('z_score'), qty_asset1, qty_asset2, cash_dca, target_asset1_pct, z_score_high, z_score_low),
+        orders_stage,
+    )
     st.info(advice)
 
     # Action Cards
@@ -266,7 +386,7 @@ with tab1:
             save_btn = st.form_submit_button("💾 Save to History Log")
             
             if save_btn and sh:
-                save_transaction(sh, r_date, r_type, z_score, r_asset1, r_asset2, r_note)
+                save_transaction(journal, sync_worker, r_date, r_type, z_score, r_asset1, r_asset2, r_note)
 
 with tab2:
     st.subheader("📜 Transaction History")
@@ -311,7 +431,9 @@ with tab3:
             -   **Gold vs Silver:** `(asset2 * 100) - asset1` (ใช้ `asset2` (Silver) คูณ 100 เพื่อปรับสเกลให้ใกล้เคียงกับ `asset1` (Gold))
             -   **Stock Pair (e.g., KO vs PEP):** `asset1 - asset2`
             -   **Ratio (e.g., BTC vs ETH):** `asset1 / asset2`
-        -   **คำเตือน:** สูตรนี้ใช้ `eval()` ซึ่งมีความเสี่ยง โปรดใช้สูตรจากแหล่งที่เชื่อถือได้เท่านั้น
+        -   **Hedge Ratio จากข้อมูล:** หน้า Dashboard จะแนะนำสูตร `(asset2 * k) - asset1` โดย `k` ได้จากการทำ Regression (Engle-Granger) พร้อมผลทดสอบ Cointegration (ADF) และ Half-life ของการกลับสู่ค่าเฉลี่ย
+        -   **ข้อจำกัด:** สูตรจะถูกตรวจสอบก่อนคำนวณ ใช้ได้เฉพาะ `asset1`, `asset2`, ตัวเลข, เครื่องหมาย `+ - * / **` และฟังก์ชัน `log`, `exp`, `sqrt`, `abs` เท่านั้น
+    -   `Spread Mode`: `Formula (fixed)` ใช้สูตรด้านบนแบบตายตัว, `Rolling OLS` คำนวณ Hedge Ratio ใหม่ทุกวันจาก Regression ย้อนหลังเท่ากับ Rolling Window, `Kalman` ปรับ Hedge Ratio ทีละวันด้วย Kalman Filter (สองโหมดหลังไม่ใช้ Spread Formula)
 
     **B. Current Status (สถานะพอร์ตปัจจุบัน)**
     -   `... Holdings`: ปริมาณสินทรัพย์ที่คุณถือครองอยู่ **(คุณต้องกรอกค่านี้เอง)** โดยสามารถดูยอดที่คำนวณจากประวัติได้ในหน้า Dashboard หลัก
@@ -352,4 +474,33 @@ with tab3:
         2.  เปิดส่วน `Show Raw History Data (for Debugging)`
         3.  **ตรวจสอบคอลัมน์:** ตรวจสอบว่าชื่อคอลัมน์ใน Google Sheet ของคุณมี `asset1_action` และ `asset2_action` (หรือ `Gold Action` และ `Silver Action` สำหรับข้อมูลเก่า)
         4.  **ตรวจสอบรูปแบบข้อมูล:** ข้อมูลในคอลัมน์ action ต้องอยู่ในรูปแบบ `BUY:1.23` หรือ `SELL 4.56` (คั่นด้วย `:` หรือ ` `) และตามด้วยตัวเลขที่ถูกต้อง
-    """)
\ No newline at end of file
+    """)
+
+# ---------------------------------------------------------
+# ⏱️ STAGE TIMINGS (ขั้นไหนคำนวณใหม่ / ใช้ผลเดิมในรอบนี้)
+# ---------------------------------------------------------
+with st.sidebar:
+    with st.expander("⏱️ Stage timings (this rerun)", expanded=False):
+        st.dataframe(pipeline.report(), width='stretch', hide_index=True)
+
+# ---------------------------------------------------------
+# 🐞 DEBUG: TRACING (เฉพาะตอนเปิด Tracing)
+# ---------------------------------------------------------
+if debug_tab:
+    with debug_tab[0]:
+        st.subheader(f"Rerun #{trace_session.rerun}")
+        st.caption("เวลาแต่ละขั้น, Cache hit/miss และขนาดข้อมูล (bytes) ของรอบนี้ ไม่รวมส่วนที่วาดหลังแท็บนี้")
+        st.dataframe(trace_session.summary(), width='stretch', hide_index=True)
+        with st.expander("Spans (this rerun)"):
+            st.dataframe(pd.DataFrame(trace_session.records()), width='stretch', hide_index=True)
+        st.markdown("**All kept reruns**")
+        st.dataframe(trace_session.summary(all_reruns=True), width='stretch', hide_index=True)
+        st.download_button("⬇️ Export spans (JSON lines)", trace_session.to_jsonl(), file_name="trace.jsonl", mime="application/json")
+        # งานเบื้องหลัง (เช่น Scheduler) บันทึกแยกไว้อีก stream ไม่ปนกับ session นี้
+        if tracer.background.enabled:
+            with st.expander("Background spans (scheduler)"):
+                st.dataframe(tracer.background.summary(all_reruns=True), width='stretch', hide_index=True)
+
+    # ส่งออกอัตโนมัติ (ต่อท้ายไฟล์) สำหรับวิเคราะห์ภายหลัง
+    if os.environ.get("PAIRTRADING_TRACE_FILE"):
+        trace_session.export_jsonl(os.environ["PAIRTRADING_TRACE_FILE"])
@@ -0,0 +1,158 @@
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from core.strategy import (
+    MIN_TRADE_VALUE,
+    calculate_portfolio_values,
+    calculate_rebalance_orders,
+    calculate_target_diffs,
+    calculate_target_values,
+)
+
+
+class BacktestResult(NamedTuple):
+    equity: pd.DataFrame
+    trades: pd.DataFrame
+    stats: dict
+
+
+def replay_events(p1: np.ndarray, p2: np.ndarray, z: np.ndarray, target_asset1_pct: int,
+                  z_score_threshold_high: float, z_score_threshold_low: float, dca_amount: float,
+                  dca_every: int, initial_cash: float = 0.0, initial_asset1_qty: float = 0.0,
+                  initial_asset2_qty: float = 0.0, index=None):
+    """
+    The event loop of ``run_pair_backtest`` on plain arrays.
+
+    Returns:
+        tuple: ``(events, qty1, qty2, cash, trades)``: the event bars, holdings
+        and cash after each event, and the order legs (only recorded when
+        ``index`` is given, as ``(time, asset, action, value, units, price, z)``).
+    """
+    n = len(p1)
+    target_asset2_pct = 100 - target_asset1_pct
+    events = np.arange(0, n, dca_every)
+    qty1 = np.zeros(len(events))
+    qty2 = np.zeros(len(events))
+    cash = np.zeros(len(events))
+    trades = []
+
+    q1, q2 = float(initial_asset1_qty), float(initial_asset2_qty)
+    cash_left = initial_cash
+    for k, t in enumerate(events):
+        cash_dca = cash_left + dca_amount
+        if np.isfinite(z[t]):
+            val1, val2, total_val = calculate_portfolio_values(q1, q2, p1[t], p2[t], cash_dca)
+            tgt1, tgt2 = calculate_target_values(total_val, target_asset1_pct, target_asset2_pct)
+            if z_score_threshold_low <= z[t] <= z_score_threshold_high:
+                diff1, diff2 = calculate_target_diffs(val1, val2, tgt1, tgt2)
+            else:
+                diff1, diff2 = calculate_rebalance_orders(
+                    z[t], z_score_threshold_high, z_score_threshold_low,
+                    val1, val2, tgt1, tgt2, cash_dca, p1[t], p2[t], total_val,
+                )
+            for asset, diff, price in (('asset1', diff1, p1[t]), ('asset2', diff2, p2[t])):
+                if abs(diff) < MIN_TRADE_VALUE:
+                    continue
+                units = diff / price
+                if asset == 'asset1':
+                    q1 += units
+                else:
+                    q2 += units
+                cash_dca -= diff
+                if index is not None:
+                    trades.append((index[t], asset, "BUY" if diff > 0 else "SELL", abs(diff), abs(units), price, z[t]))
+        cash_left = cash_dca
+        qty1[k], qty2[k], cash[k] = q1, q2, cash_left
+    return events, qty1, qty2, cash, trades
+
+
+def time_weighted_nav(equity: np.ndarray, flows: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    NAV (starting at 1) and drawdown of an equity curve, with the cash
+    ``flows`` added on each bar stripped out so they do not count as returns.
+    """
+    prev_equity = np.concatenate(([np.nan], equity[:-1]))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(prev_equity > 0, (equity - flows) / prev_equity - 1.0, 0.0)
+    nav = np.cumprod(1.0 + returns)
+    return nav, nav / np.maximum.accumulate(nav) - 1.0
+
+
+def run_pair_backtest(
+    df: pd.DataFrame,
+    target_asset1_pct: int = 50,
+    z_score_threshold_high: float = 2.0,
+    z_score_threshold_low: float = -2.0,
+    dca_amount: float = 1000.0,
+    dca_every: int = 21,
+    initial_cash: float = 0.0,
+    initial_asset1_qty: float = 0.0,
+    initial_asset2_qty: float = 0.0,
+) -> BacktestResult:
+    """
+    Replays the app's DCA + Z-score rebalance rules over history.
+
+    Every ``dca_every`` bars new cash is added and the orders are computed with
+    ``calculate_rebalance_orders``, like ``core.signals.pair_signal``. Holdings stay
+    constant between those events, so the Python loop only runs once per
+    event; the daily equity curve and drawdown are filled in with NumPy.
+
+    Args:
+        df (pd.DataFrame): Output of ``get_market_data`` (``asset1``, ``asset2``, ``Z_Score``).
+        target_asset1_pct (int): The target percentage for asset 1.
+        z_score_threshold_high (float): The upper Z-score threshold.
+        z_score_threshold_low (float): The lower Z-score threshold.
+        dca_amount (float): Cash injected at every event.
+        dca_every (int): Bars between events (21 is roughly monthly on daily bars).
+        initial_cash (float): Cash available before the first event.
+        initial_asset1_qty (float): Units of asset 1 held before the first event.
+        initial_asset2_qty (float): Units of asset 2 held before the first event.
+            The starting cash and holdings count as contributed on the first bar.
+
+    Returns:
+        BacktestResult: ``equity`` (daily ``Equity``, ``Contributed``, ``NAV``,
+        ``Drawdown``, holdings and cash), ``trades`` (one row per order leg) and
+        ``stats`` (final equity, total return, max drawdown, trade count).
+    """
+    p1 = df['asset1'].to_numpy(dtype=float)
+    p2 = df['asset2'].to_numpy(dtype=float)
+    z = df['Z_Score'].to_numpy(dtype=float)
+    n = len(df)
+    events, qty1, qty2, cash, trades = replay_events(
+        p1, p2, z, target_asset1_pct, z_score_threshold_high, z_score_threshold_low, dca_amount, dca_every,
+        initial_cash, initial_asset1_qty, initial_asset2_qty, df.index)
+
+    # Holdings after the latest event at or before each bar.
+    slot = np.searchsorted(events, np.arange(n), side='right') - 1
+    hold1, hold2, hold_cash = qty1[slot], qty2[slot], cash[slot]
+    equity = hold1 * p1 + hold2 * p2 + hold_cash
+
+    flows = np.zeros(n)
+    flows[events] = dca_amount
+    if n:
+        flows[0] += initial_cash + initial_asset1_qty * p1[0] + initial_asset2_qty * p2[0]
+    contributed = np.cumsum(flows)
+
+    # Time-weighted NAV strips out the cash injections so drawdown reflects performance only.
+    nav, drawdown = time_weighted_nav(equity, flows)
+
+    equity_df = pd.DataFrame({
+        'Equity': equity,
+        'Contributed': contributed,
+        'NAV': nav,
+        'Drawdown': drawdown,
+        'asset1_qty': hold1,
+        'asset2_qty': hold2,
+        'Cash': hold_cash,
+    }, index=df.index)
+    trades_df = pd.DataFrame(trades, columns=['date', 'asset', 'action', 'value', 'units', 'price', 'z_score'])
+    stats = {
+        'final_equity': float(equity[-1]) if n else 0.0,
+        'contributed': float(contributed[-1]) if n else 0.0,
+        'total_return': float(nav[-1] - 1.0) if n else 0.0,
+        'max_drawdown': float(drawdown.min()) if n else 0.0,
+        'trades': len(trades_df),
+    }
+    return BacktestResult(equity_df, trades_df, stats)
@@ -0,0 +1,140 @@
+import re
+
+import numpy as np
+import pandas as pd
+
+# Bar intervals accepted by the price store and ``get_market_data``.
+INTERVALS = {
+    "1m": pd.Timedelta(minutes=1),
+    "5m": pd.Timedelta(minutes=5),
+    "1h": pd.Timedelta(hours=1),
+    "1d": pd.Timedelta(days=1),
+}
+
+# How far back Yahoo Finance serves each interval, and the longest span one
+# request may cover. Older bars are only available from the local store.
+MAX_LOOKBACK = {"1m": pd.Timedelta(days=29), "5m": pd.Timedelta(days=59), "1h": pd.Timedelta(days=729)}
+MAX_REQUEST_SPAN = {"1m": pd.Timedelta(days=7)}
+
+# Default history per interval (days), sized to stay within MAX_LOOKBACK.
+DEFAULT_DAYS = {"1m": 7, "5m": 30, "1h": 180, "1d": 365}
+
+# Intraday bars of one leg are carried forward at most this many bars to
+# line up with the other leg; longer gaps (closed sessions) are dropped.
+DEFAULT_MAX_GAP_BARS = 3
+
+# Float32 keeps ~7 significant digits; the opt-in check rejects a series whose
+# round trip moves any price by more than this (relative) or hides a price change.
+FLOAT32_RTOL = 1e-6
+
+_SPAN = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*(m|min|h|d)\s*$", re.IGNORECASE)
+_SPAN_UNITS = {"m": "min", "min": "min", "h": "h", "d": "D"}
+
+
+def check_interval(interval: str) -> str:
+    if interval not in INTERVALS:
+        raise ValueError(f"Unknown bar interval {interval!r}; expected one of {tuple(INTERVALS)}")
+    return interval
+
+
+def parse_window(window) -> int | pd.Timedelta:
+    """
+    Reads a rolling window: a bar count (``90``, ``"90"``) or a time span
+    (``"30m"``, ``"4h"``, ``"5d"``).
+
+    Raises:
+        ValueError: If ``window`` is neither.
+    """
+    if isinstance(window, pd.Timedelta):
+        return window
+    if isinstance(window, (int, np.integer)):
+        return int(window)
+    text = str(window).strip()
+    if text.isdigit():
+        return int(text)
+    match = _SPAN.match(text)
+    if not match:
+        raise ValueError(f"Rolling window must be a bar count or a span like '4h' or '5d', got {window!r}")
+    return pd.Timedelta(float(match.group(1)), unit=_SPAN_UNITS[match.group(2).lower()])
+
+
+def bar_spacing(index: pd.DatetimeIndex) -> pd.Timedelta:
+    """Typical distance between consecutive bars (the median, so session gaps do not count)."""
+    if len(index) < 2:
+        return INTERVALS["1d"]
+    return pd.Timedelta(np.median(np.diff(index.asi8)), unit="ns")
+
+
+def window_bars(window, index: pd.DatetimeIndex) -> int:
+    """
+    Number of bars a rolling window covers on ``index``.
+
+    Spans shorter than a day are divided by the bar spacing ("4h" of 5m bars is
+    48 bars). Day spans count trading sessions, like the app's day-based
+    window: "90d" is 90 daily bars, or 90 times the median number of bars per
+    session for intraday data, so overnight and weekend gaps do not shrink it.
+
+    Args:
+        window: Bar count or span (see ``parse_window``).
+        index (pd.DatetimeIndex): The bars the window runs over.
+
+    Returns:
+        int: Window length in bars, at least 2.
+    """
+    window = parse_window(window)
+    if isinstance(window, int):
+        return max(window, 2)
+    spacing = bar_spacing(index)
+    if window < INTERVALS["1d"] or spacing >= INTERVALS["1d"]:
+        return max(int(round(window / max(spacing, INTERVALS["1m"]))), 2)
+    sessions = window / INTERVALS["1d"]
+    bars_per_session = float(np.median(pd.Series(1, index=index).groupby(index.normalize()).size()))
+    return max(int(round(sessions * bars_per_session)), 2)
+
+
+def align_closes(data: pd.DataFrame, interval: str = "1d", max_gap_bars: int = DEFAULT_MAX_GAP_BARS) -> pd.DataFrame:
+    """
+    Puts several legs on common bars.
+
+    Daily closes keep the dates every leg traded. Intraday legs rarely print
+    on exactly the same minutes (and GC=F vs SI=F, or two exchanges, pause at
+    different times), so a leg's last price is carried forward while it is at
+    most ``max_gap_bars`` bars old; bars where any leg is older than that (a
+    closed session or a halt) are dropped rather than filled with stale prices.
+
+    Args:
+        data (pd.DataFrame): One column per leg, outer-joined on time.
+        interval (str): Bar interval of ``data``.
+        max_gap_bars (int): Largest gap to bridge, in bars.
+
+    Returns:
+        pd.DataFrame: Rows where every leg has a fresh price.
+    """
+    check_interval(interval)
+    if interval == "1d" or max_gap_bars <= 0 or data.empty:
+        return data.dropna()
+    max_age = INTERVALS[interval] * max_gap_bars
+    times = pd.Series(data.index, index=data.index)
+    aligned = {}
+    for column in data.columns:
+        seen = data[column].notna()
+        age = times - times.where(seen).ffill()
+        aligned[column] = data[column].ffill().where(age <= max_age)
+    return pd.DataFrame(aligned, index=data.index).dropna()
+
+
+def float32_precision_ok(values, rtol: float = FLOAT32_RTOL) -> bool:
+    """
+    Whether ``values`` survive a float32 round trip: no price moves by more than
+    ``rtol`` (relative) and no bar-to-bar change rounds away to zero.
+    """
+    x = np.asarray(values, dtype=np.float64)
+    x = x[np.isfinite(x)]
+    if x.size == 0:
+        return True
+    y = x.astype(np.float32).astype(np.float64)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rel = np.abs(y - x) / np.abs(x)
+    if np.nanmax(np.where(x == 0, np.abs(y), rel)) > rtol:
+        return False
+    return not np.any((np.diff(x) != 0) & (np.diff(y) == 0))
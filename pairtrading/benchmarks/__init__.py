@@ -0,0 +1,13 @@
+"""
+Offline benchmark suite for the data and strategy hot paths.
+
+Run from the pairtrading folder:
+    python -m benchmarks run [--quick] [--filter 'zscore*'] [--out results.json]
+    python -m benchmarks run --save-baseline
+    python -m benchmarks compare [BASELINE] [CURRENT] [--threshold 0.2]
+
+``run`` writes a versioned JSON file to benchmarks/results/ (ignored by git);
+``compare`` flags cases that got slower than the stored baseline and exits
+with status 1 when any did. The bench_*.py scripts next to this file are the
+one-off before/after comparisons of individual optimizations.
+"""
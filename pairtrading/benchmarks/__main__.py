@@ -0,0 +1,87 @@
+import argparse
+import sys
+
+from benchmarks import runner
+
+
+def _print_comparison(rows: list[dict], threshold: float) -> None:
+    print(f"{'case':<64} {'baseline':>10} {'current':>10} {'ratio':>7}  status")
+    for row in rows:
+        ratio = "-" if row["ratio"] is None else f"{row['ratio']:.2f}x"
+        print(f"{row['case']:<64} {runner.format_seconds(row['baseline']):>10} "
+              f"{runner.format_seconds(row['current']):>10} {ratio:>7}  {row['status']}")
+    counts = {}
+    for row in rows:
+        counts[row["status"]] = counts.get(row["status"], 0) + 1
+    summary = ", ".join(f"{n} {status}" for status, n in sorted(counts.items()))
+    print(f"\n{summary} (threshold ±{threshold:.0%})")
+
+
+def cmd_run(args) -> int:
+    document = runner.run(args.filter, quick=args.quick, repeat=args.repeat, min_time=args.min_time)
+    path = runner.save(document, args.out or runner.default_output_path(document))
+    print(f"results: {path}", file=sys.stderr)
+    if args.save_baseline:
+        print(f"baseline: {runner.save(document, runner.BASELINE_PATH)}", file=sys.stderr)
+    return 0
+
+
+def cmd_compare(args) -> int:
+    try:
+        baseline = runner.load(args.baseline)
+        if args.current:
+            current = runner.load(args.current)
+        else:
+            current = runner.run(args.filter, quick=args.quick, repeat=args.repeat, min_time=args.min_time)
+            print(f"results: {runner.save(current, runner.default_output_path(current))}", file=sys.stderr)
+    except (OSError, ValueError) as e:
+        print(f"error: {e}", file=sys.stderr)
+        return 2
+
+    differences = runner.environment_differences(baseline, current)
+    if differences:
+        print("warning: environments differ, timings may not be comparable:", file=sys.stderr)
+        for key, (b, c) in differences.items():
+            print(f"  {key}: {b} -> {c}", file=sys.stderr)
+
+    rows = runner.compare(baseline, current, threshold=args.threshold, stat=args.stat)
+    if args.filter:
+        names = {c for c in current["results"]}
+        rows = [r for r in rows if r["case"] in names]
+    _print_comparison(rows, args.threshold)
+    return 1 if any(r["status"] == "regression" for r in rows) else 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m benchmarks",
+                                     description="Offline benchmarks of the data and strategy hot paths.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    def add_run_options(p):
+        p.add_argument("--filter", help="glob on case id or group, e.g. 'zscore' or 'calculate_z_score_*'")
+        p.add_argument("--quick", action="store_true", help="skip the largest inputs")
+        p.add_argument("--repeat", type=int, default=runner.DEFAULT_REPEAT)
+        p.add_argument("--min-time", type=float, default=runner.DEFAULT_MIN_TIME,
+                       help="minimum seconds per timing sample")
+
+    p_run = sub.add_parser("run", help="run the suite and write a result file")
+    add_run_options(p_run)
+    p_run.add_argument("--out", help="result file (default: benchmarks/results/<timestamp>_<commit>.json)")
+    p_run.add_argument("--save-baseline", action="store_true", help="also store the results as the baseline")
+    p_run.set_defaults(func=cmd_run)
+
+    p_cmp = sub.add_parser("compare", help="flag regressions against the baseline")
+    p_cmp.add_argument("baseline", nargs="?", default=runner.BASELINE_PATH)
+    p_cmp.add_argument("current", nargs="?", help="result file to check (default: run the suite now)")
+    add_run_options(p_cmp)
+    p_cmp.add_argument("--threshold", type=float, default=runner.DEFAULT_THRESHOLD,
+                       help="relative slowdown that counts as a regression (default 0.2 = 20%%)")
+    p_cmp.add_argument("--stat", choices=["best", "median", "mean"], default="best")
+    p_cmp.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args(argv)
+    return args.func(args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,49 @@
+"""
+Benchmark: Engle-Granger screening of a correlation-filtered universe.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_cointegration.py [n_tickers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from cointegration import correlated_pairs, engle_granger  # noqa: E402
+
+
+def make_universe(n_tickers: int, n_rows: int = 1250, n_factors: int = 5, seed: int = 0) -> pd.DataFrame:
+    # A few common factors so a realistic share of pairs passes the correlation filter.
+    rng = np.random.default_rng(seed)
+    factors = rng.normal(0, 0.01, size=(n_rows, n_factors))
+    loadings = np.zeros((n_factors, n_tickers))
+    loadings[rng.integers(0, n_factors, n_tickers), np.arange(n_tickers)] = 1.0
+    returns = factors @ loadings + rng.normal(0, 0.004, size=(n_rows, n_tickers))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)),
+                        index=pd.bdate_range("2020-01-01", periods=n_rows),
+                        columns=[f"T{i:04d}" for i in range(n_tickers)])
+
+
+def main(n_tickers: int = 300, min_corr: float = 0.8):
+    prices = make_universe(n_tickers)
+
+    start = time.perf_counter()
+    pairs = correlated_pairs(prices, min_corr)
+    filtered = time.perf_counter() - start
+    print(f"{n_tickers} tickers, {len(pairs):,} pairs with corr >= {min_corr} ({filtered:.3f} s)")
+
+    start = time.perf_counter()
+    result = engle_granger(prices, pairs, use_cache=False)
+    print(f"  vectorized     : {time.perf_counter() - start:8.3f} s, {int(result['cointegrated'].sum())} cointegrated")
+
+    engle_granger(prices, pairs)
+    start = time.perf_counter()
+    engle_granger(prices, pairs)
+    print(f"  cached rerun   : {time.perf_counter() - start:8.3f} s")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 300)
@@ -0,0 +1,47 @@
+"""
+Benchmark: cold-start import time of the headless core vs the Streamlit modules.
+
+Each import runs in a fresh interpreter (best of several runs). Modules whose
+dependencies are not installed are reported as skipped.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_cold_start.py [repeats]
+"""
+import os
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORTS = [
+    ("python (no imports)", "pass"),
+    ("core", "import core"),
+    ("signal_service", "import signal_service"),
+    ("backtest", "import backtest"),
+    ("data_processing (streamlit)", "import data_processing"),
+    ("strategy (streamlit)", "import strategy"),
+]
+
+
+def cold_start(statement: str, repeats: int) -> float | None:
+    best = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        proc = subprocess.run([sys.executable, "-c", statement], cwd=ROOT, capture_output=True)
+        elapsed = time.perf_counter() - start
+        if proc.returncode != 0:
+            return None
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main(repeats: int = 5):
+    for label, statement in IMPORTS:
+        elapsed = cold_start(statement, repeats)
+        shown = "skipped (missing dependency)" if elapsed is None else f"{elapsed * 1000:8.1f} ms"
+        print(f"  {label:30s}: {shown}")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 5)
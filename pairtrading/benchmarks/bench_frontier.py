@@ -0,0 +1,73 @@
+"""
+Benchmark: efficient-frontier engine (analytic Jacobians, NumPy covariance,
+warm starts) vs. the single SLSQP solve of optimize_portfolio.py, as the
+number of tickers grows.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_frontier.py
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import scipy.optimize as sco
+
+NOTEBOOKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'other testing', 'notebooks')
+sys.path.insert(0, NOTEBOOKS_DIR)
+from frontier import annualized_inputs, efficient_frontier, max_sharpe  # noqa: E402
+
+RISK_FREE_RATE = 0.02
+
+
+def make_returns(n_tickers: int, n_rows: int = 1500, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    market = rng.normal(0.0004, 0.01, size=(n_rows, 1))
+    betas = rng.uniform(0.5, 1.5, size=n_tickers)
+    idio = rng.normal(0.0002, 0.015, size=(n_rows, n_tickers)) + rng.uniform(-0.0003, 0.0006, n_tickers)
+    return pd.DataFrame(market * betas + idio, columns=[f"T{i}" for i in range(n_tickers)])
+
+
+def legacy_max_sharpe(returns: pd.DataFrame):
+    """The optimize_portfolio.py approach: pandas inputs, numerical gradients."""
+    mean_returns, cov_matrix = returns.mean(), returns.cov()
+
+    def portfolio_performance(weights):
+        ret = np.sum(mean_returns * weights) * 252
+        std = np.sqrt(np.dot(weights.T, np.dot(cov_matrix, weights))) * np.sqrt(252)
+        return ret, std
+
+    def neg_sharpe_ratio(weights):
+        p_ret, p_std = portfolio_performance(weights)
+        return -(p_ret - RISK_FREE_RATE) / p_std
+
+    n = returns.shape[1]
+    result = sco.minimize(neg_sharpe_ratio, n * [1. / n], method='SLSQP',
+                          bounds=tuple((0.0, 1.0) for _ in range(n)),
+                          constraints=({'type': 'eq', 'fun': lambda x: np.sum(x) - 1}))
+    return result.x
+
+
+def timed(fn, *args, **kwargs):
+    start = time.perf_counter()
+    out = fn(*args, **kwargs)
+    return out, time.perf_counter() - start
+
+
+def main(n_points: int = 30):
+    print(f"{'tickers':>7} {'legacy max-Sharpe':>18} {'new max-Sharpe':>15} {'frontier (%d pts)' % n_points:>18}")
+    for n_tickers in (5, 10, 20, 50, 100):
+        returns = make_returns(n_tickers)
+        w_legacy, t_legacy = timed(legacy_max_sharpe, returns)
+        mu, cov = annualized_inputs(returns)
+        w_new, t_new = timed(max_sharpe, mu, cov, RISK_FREE_RATE)
+        _, t_frontier = timed(efficient_frontier, returns, RISK_FREE_RATE, n_points)
+
+        sharpe = lambda w: (w @ mu - RISK_FREE_RATE) / np.sqrt(w @ cov @ w)  # noqa: E731
+        assert sharpe(w_new) >= sharpe(w_legacy) - 1e-4, "new optimizer found a worse portfolio"
+        print(f"{n_tickers:>7} {t_legacy * 1e3:>15.1f} ms {t_new * 1e3:>12.1f} ms {t_frontier * 1e3:>15.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
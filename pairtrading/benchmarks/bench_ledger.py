@@ -0,0 +1,64 @@
+"""
+Benchmark: vectorized History_Log ledger vs. the old iterrows() parser.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_ledger.py
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ledger import build_ledger  # noqa: E402
+
+
+def make_log(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    acts = rng.choice(['BUY:', 'SELL:', 'BUY ', 'SELL ', 'buy:'], size=(n_rows, 2))
+    amounts = np.round(rng.uniform(0, 5, size=(n_rows, 2)), 4).astype(str)
+    actions = np.char.add(acts, amounts)
+    # Sprinkle in placeholders and junk that both parsers must ignore.
+    actions[rng.random((n_rows, 2)) < 0.05] = '-'
+    actions[rng.random((n_rows, 2)) < 0.01] = 'BUY:abc'
+    return pd.DataFrame({'asset1_action': actions[:, 0], 'asset2_action': actions[:, 1]})
+
+
+def legacy_holdings(trade_history_df):
+    """The previous app.calculate_current_holdings, kept for comparison."""
+    holdings = [0.0, 0.0]
+    for _, row in trade_history_df.iterrows():
+        for i, col in enumerate(('asset1_action', 'asset2_action')):
+            action = str(row.get(col, '-'))
+            if ':' in action or ' ' in action:
+                parts = action.replace(':', ' ').split()
+                if len(parts) >= 2:
+                    try:
+                        amount = float(parts[1])
+                        if parts[0].upper() == 'BUY':
+                            holdings[i] += amount
+                        elif parts[0].upper() == 'SELL':
+                            holdings[i] -= amount
+                    except ValueError:
+                        pass
+    return tuple(holdings)
+
+
+def vectorized_holdings(trade_history_df):
+    ledger = build_ledger(trade_history_df)
+    return ledger['asset1_position'].iloc[-1], ledger['asset2_position'].iloc[-1]
+
+
+def main(n_rows: int = 100_000, repeat: int = 3):
+    log = make_log(n_rows)
+    np.testing.assert_allclose(vectorized_holdings(log), legacy_holdings(log), rtol=1e-9)
+    t_legacy = min(timeit.repeat(lambda: legacy_holdings(log), repeat=repeat, number=1))
+    t_vector = min(timeit.repeat(lambda: vectorized_holdings(log), repeat=repeat, number=1))
+    print(f"{n_rows:,} rows: iterrows {t_legacy * 1e3:.1f} ms | vectorized {t_vector * 1e3:.1f} ms "
+          f"| speedup {t_legacy / t_vector:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark: vectorized calendar rebalancing vs. the old iterrows() loop of
+backtest_advence.run_strategy, and a batch of random allocations in one
+run_strategies_batch call, on the TradingView export.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_portfolio_backtest.py [path/to/tradingview_data.csv]
+"""
+import os
+import sys
+import timeit
+
+import numpy as np
+import pandas as pd
+
+NOTEBOOKS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'other testing', 'notebooks')
+DEFAULT_CSV = os.path.join(NOTEBOOKS_DIR, '..', 'data', 'tradingview_data.csv')
+sys.path.insert(0, NOTEBOOKS_DIR)
+from portfolio_backtest import run_strategies_batch, run_strategy_vectorized  # noqa: E402
+from tradingview_loader import load_tradingview  # noqa: E402
+
+WEIGHTS = {'FRT': 0.35, 'HPG': 0.35, 'MWG': 0.20, 'POW': 0.10}
+INITIAL_CAPITAL = 1_000_000
+
+
+def legacy_run_strategy(prices, weights, initial_capital, rebalance=False):
+    """The previous backtest_advence.run_strategy loop, kept for comparison."""
+    tickers = list(weights.keys())
+    data = prices[tickers].dropna()
+    shares = {t: (initial_capital * w) / data.iloc[0][t] for t, w in weights.items()}
+    equity_curve = []
+    current_year = data.index[0].year
+    for date, row in data.iterrows():
+        current_val = sum(shares[t] * row[t] for t in tickers)
+        equity_curve.append(current_val)
+        if rebalance and date.year != current_year:
+            for ticker, w in weights.items():
+                shares[ticker] = (current_val * w) / row[ticker]
+            current_year = date.year
+    return pd.Series(equity_curve, index=data.index)
+
+
+def main(csv_path: str = DEFAULT_CSV, repeat: int = 5):
+    prices = load_tradingview(csv_path)
+    for rebalance in (False, True):
+        legacy = legacy_run_strategy(prices, WEIGHTS, INITIAL_CAPITAL, rebalance)
+        vector = run_strategy_vectorized(prices, WEIGHTS, INITIAL_CAPITAL, rebalance)
+        np.testing.assert_allclose(vector.to_numpy(), legacy.to_numpy(), rtol=1e-12)
+        t_legacy = min(timeit.repeat(lambda: legacy_run_strategy(prices, WEIGHTS, INITIAL_CAPITAL, rebalance),
+                                     repeat=repeat, number=1))
+        t_vector = min(timeit.repeat(lambda: run_strategy_vectorized(prices, WEIGHTS, INITIAL_CAPITAL, rebalance),
+                                     repeat=repeat, number=1))
+        print(f"rebalance={str(rebalance):<5} rows={len(vector):>5}: loop {t_legacy * 1e3:8.2f} ms | "
+              f"vectorized {t_vector * 1e3:6.2f} ms | speedup {t_legacy / t_vector:6.1f}x")
+
+    # Monte Carlo allocation study: K random long-only portfolios in one call.
+    tickers = ['DGW', 'HPG', 'PNJ', 'POW', 'FRT', 'MWG']
+    rng = np.random.default_rng(0)
+    for k in (100, 1000, 10000):
+        weights = pd.DataFrame(rng.dirichlet(np.ones(len(tickers)), size=k), columns=tickers)
+        elapsed = min(timeit.repeat(lambda: run_strategies_batch(prices, weights, INITIAL_CAPITAL, 'quarterly'),
+                                    repeat=3, number=1))
+        print(f"batch of {k:>5} portfolios (quarterly rebalance): {elapsed * 1e3:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
@@ -0,0 +1,45 @@
+"""
+Benchmark: pair screener scaling with worker count on a synthetic universe.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_screener.py [n_tickers]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from screener import screen_pairs, screen_pairs_parallel  # noqa: E402
+
+
+def make_universe(n_tickers: int, n_rows: int = 1000, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0, 0.01, size=(n_rows, n_tickers))
+    return pd.DataFrame(100 * np.exp(np.cumsum(returns, axis=0)),
+                        columns=[f"T{i:04d}" for i in range(n_tickers)])
+
+
+def main(n_tickers: int = 1000, window: int = 90):
+    prices = make_universe(n_tickers)
+    n_pairs = n_tickers * (n_tickers - 1) // 2
+    print(f"{n_tickers} tickers, {n_pairs:,} pairs, window {window}")
+
+    start = time.perf_counter()
+    expected = screen_pairs(prices, window=window, top=100)
+    print(f"  single process : {time.perf_counter() - start:8.3f} s")
+
+    workers = 1
+    while workers <= (os.cpu_count() or 1):
+        start = time.perf_counter()
+        result = screen_pairs_parallel(prices, window=window, top=100, max_workers=workers)
+        elapsed = time.perf_counter() - start
+        pd.testing.assert_frame_equal(result, expected)
+        print(f"  {workers:3d} worker(s)   : {elapsed:8.3f} s")
+        workers *= 2
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 1000)
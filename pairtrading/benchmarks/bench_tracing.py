@@ -0,0 +1,47 @@
+"""
+Benchmark: per-call overhead of tracing spans and @traced, disabled vs enabled.
+
+Run from the pairtrading folder:
+    python benchmarks/bench_tracing.py [calls]
+"""
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from tracing import Tracer  # noqa: E402
+
+
+def work(x):
+    return x + 1
+
+
+def per_call_ns(fn, calls: int) -> float:
+    start = time.perf_counter()
+    for i in range(calls):
+        fn(i)
+    return (time.perf_counter() - start) / calls * 1e9
+
+
+def main(calls: int = 200_000):
+    tracer = Tracer(enabled=False)
+    decorated = tracer.traced("work")(work)
+
+    def with_span(x):
+        with tracer.span("work"):
+            return work(x)
+
+    baseline = per_call_ns(work, calls)
+    print(f"  plain call          : {baseline:8.1f} ns")
+    print(f"  @traced, disabled   : {per_call_ns(decorated, calls):8.1f} ns")
+    print(f"  span(), disabled    : {per_call_ns(with_span, calls):8.1f} ns")
+
+    tracer.enabled = True
+    tracer.begin_rerun()
+    print(f"  @traced, enabled    : {per_call_ns(decorated, calls // 10):8.1f} ns")
+    tracer.begin_rerun()
+    print(f"  span(), enabled     : {per_call_ns(with_span, calls // 10):8.1f} ns")
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200_000)
@@ -0,0 +1,141 @@
+"""
+Cases of the benchmark suite: the data and strategy hot paths, on seeded
+synthetic series and on the recorded TradingView export (skipped when the
+CSV is not present). Nothing here touches the network.
+"""
+import functools
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.bench_frontier import make_returns
+from benchmarks.bench_ledger import make_log
+from benchmarks.bench_portfolio_backtest import DEFAULT_CSV, INITIAL_CAPITAL, NOTEBOOKS_DIR, WEIGHTS
+from benchmarks.runner import SkipCase, benchmark
+
+sys.path.insert(0, NOTEBOOKS_DIR)
+from frontier import annualized_inputs, efficient_frontier, max_sharpe  # noqa: E402
+from portfolio_backtest import run_strategies_batch, run_strategy_vectorized  # noqa: E402
+from tradingview_loader import load_tradingview  # noqa: E402
+
+from core.decimate import DECIMATION_METHODS, decimate_series  # noqa: E402
+from core.market import calculate_z_score, pair_prices  # noqa: E402
+from core.signals import DEFAULT_PAIR  # noqa: E402
+from ledger import current_holdings  # noqa: E402
+
+FORMULA = DEFAULT_PAIR["spread_formula"]
+RECORDED_PAIR = ("HPG", "MWG")
+RECORDED_FORMULA = "asset1 - asset2"
+RECORDED_TICKERS = ["DGW", "HPG", "PNJ", "POW", "FRT", "MWG"]
+RISK_FREE_RATE = 0.02
+
+
+def make_pair(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Two co-moving random-walk prices on a daily index, shaped like ``pair_prices``."""
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0.0002, 0.01, n_rows).cumsum()
+    asset1 = 1800.0 * np.exp(common + rng.normal(0, 0.004, n_rows).cumsum())
+    asset2 = 22.0 * np.exp(common + rng.normal(0, 0.004, n_rows).cumsum())
+    index = pd.date_range("2000-01-01", periods=n_rows, freq="D")
+    return pd.DataFrame({"asset1": asset1, "asset2": asset2}, index=index)
+
+
+@functools.lru_cache(maxsize=1)
+def recorded_prices() -> pd.DataFrame | None:
+    # Shared by every recorded case; the cases only read from it.
+    if not os.path.exists(DEFAULT_CSV):
+        return None
+    return load_tradingview(DEFAULT_CSV, use_cache=False)
+
+
+# --- Z-score -----------------------------------------------------------------
+
+@benchmark("zscore", params=[{"window": w, "rows": n} for n in (1_000, 10_000, 100_000) for w in (30, 90, 180)],
+           quick=lambda p: p["rows"] <= 10_000)
+def calculate_z_score_synthetic(window: int, rows: int):
+    df = make_pair(rows)
+    return lambda: calculate_z_score(df, FORMULA, window=window)
+
+
+@benchmark("zscore", params=[{"mode": m, "window": 90, "rows": 10_000} for m in ("rolling_ols", "kalman")])
+def calculate_z_score_dynamic(mode: str, window: int, rows: int):
+    df = make_pair(rows)
+    return lambda: calculate_z_score(df, FORMULA, window=window, hedge_mode=mode)
+
+
+@benchmark("zscore", params=[{"window": w, "days": d} for w in ("4h", "1d") for d in (5, 30)],
+           quick=lambda p: p["days"] <= 5)
+def calculate_z_score_minute_bars(window: str, days: int):
+    # 23h sessions of 1m bars with the daily break, one leg missing every 7th bar.
+    index = pd.date_range("2024-01-01", periods=days * 1440, freq="min")
+    index = index[(index.dayofweek < 5) & (index.hour != 22)]
+    df = make_pair(len(index))
+    df.index = index
+    df.iloc[::7, 1] = np.nan
+    return lambda: calculate_z_score(pair_prices(df, "asset1", "asset2", "1m"), FORMULA, window=window)
+
+
+@benchmark("zscore", params=[{"window": w} for w in (30, 90, 180)])
+def calculate_z_score_recorded(window: int):
+    prices = recorded_prices()
+    if prices is None:
+        raise SkipCase(f"{DEFAULT_CSV} not found")
+    df = prices[list(RECORDED_PAIR)].dropna()
+    df.columns = ["asset1", "asset2"]
+    return lambda: calculate_z_score(df, RECORDED_FORMULA, window=window)
+
+
+@benchmark("chart", params=[{"method": m, "rows": n} for m in DECIMATION_METHODS for n in (10_000, 1_000_000)],
+           quick=lambda p: p["rows"] <= 10_000)
+def decimate_z_score(method: str, rows: int, width: int = 1200):
+    z = calculate_z_score(make_pair(rows), FORMULA, window=90)["Z_Score"]
+    return lambda: decimate_series(z, 2 * width, (-2.0, 2.0), method)
+
+
+# --- Holdings from the History_Log -------------------------------------------
+
+@benchmark("holdings", params=[{"rows": n} for n in (100, 10_000, 100_000)],
+           quick=lambda p: p["rows"] <= 10_000)
+def current_holdings_log(rows: int):
+    log = make_log(rows)
+    return lambda: current_holdings(log)
+
+
+# --- Notebook backtests ------------------------------------------------------
+
+@benchmark("backtest", params=[{"rebalance": r} for r in (False, "annual", "quarterly")])
+def run_strategy_recorded(rebalance):
+    prices = recorded_prices()
+    if prices is None:
+        raise SkipCase(f"{DEFAULT_CSV} not found")
+    return lambda: run_strategy_vectorized(prices, WEIGHTS, INITIAL_CAPITAL, rebalance)
+
+
+@benchmark("backtest", params=[{"portfolios": k} for k in (100, 1000)], quick=lambda p: p["portfolios"] <= 100)
+def run_strategies_batch_recorded(portfolios: int):
+    prices = recorded_prices()
+    if prices is None:
+        raise SkipCase(f"{DEFAULT_CSV} not found")
+    rng = np.random.default_rng(0)
+    weights = pd.DataFrame(rng.dirichlet(np.ones(len(RECORDED_TICKERS)), size=portfolios),
+                           columns=RECORDED_TICKERS)
+    return lambda: run_strategies_batch(prices, weights, INITIAL_CAPITAL, "quarterly")
+
+
+# --- SLSQP optimizer ---------------------------------------------------------
+
+@benchmark("optimizer", params=[{"tickers": n} for n in (5, 20, 50)], quick=lambda p: p["tickers"] <= 20)
+def max_sharpe_synthetic(tickers: int):
+    mu, cov = annualized_inputs(make_returns(tickers))
+    return lambda: max_sharpe(mu, cov, RISK_FREE_RATE)
+
+
+@benchmark("optimizer", params=[{"points": 30}])
+def efficient_frontier_recorded(points: int):
+    prices = recorded_prices()
+    if prices is None:
+        raise SkipCase(f"{DEFAULT_CSV} not found")
+    returns = prices[RECORDED_TICKERS].dropna().pct_change().dropna()
+    return lambda: efficient_frontier(returns, RISK_FREE_RATE, n_points=points)
@@ -0,0 +1,255 @@
+"""
+Registry, timer and result files of the benchmark suite (see ``__main__.py``).
+
+A case is a setup function registered with ``@benchmark``: it builds its
+inputs (outside the timing) and returns the zero-argument callable to time.
+"""
+import datetime
+import fnmatch
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, NamedTuple
+
+SCHEMA_VERSION = 1
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+ROOT = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+BASELINE_PATH = os.path.join(RESULTS_DIR, "baseline.json")
+
+DEFAULT_REPEAT = 5
+DEFAULT_MIN_TIME = 0.2
+DEFAULT_THRESHOLD = 0.20
+
+
+class SkipCase(Exception):
+    """Raised by a setup function whose inputs are unavailable (e.g. no recorded CSV)."""
+
+
+class Case(NamedTuple):
+    name: str
+    group: str
+    params: dict
+    setup: Callable[[], Callable[[], object]]
+    quick: bool
+
+    @property
+    def id(self) -> str:
+        if not self.params:
+            return self.name
+        args = ",".join(f"{k}={v}" for k, v in self.params.items())
+        return f"{self.name}[{args}]"
+
+
+_REGISTRY: list[Case] = []
+
+
+def benchmark(group: str, name: str | None = None, params: list[dict] | None = None, quick=True):
+    """
+    Registers a setup function as one case per entry of ``params``.
+
+    Args:
+        group (str): Area of the code (``zscore``, ``holdings``, ...).
+        name (str, optional): Case name; defaults to the function name.
+        params (list[dict], optional): Keyword arguments passed to the setup function.
+        quick (bool | callable): Include the case in ``--quick`` runs; a callable
+            receives the params and decides per case.
+    """
+    def decorator(setup):
+        for p in params or [{}]:
+            in_quick = quick(p) if callable(quick) else bool(quick)
+            _REGISTRY.append(Case(name or setup.__name__, group, dict(p),
+                                  lambda setup=setup, p=p: setup(**p), in_quick))
+        return setup
+    return decorator
+
+
+def cases(pattern: str | None = None, quick: bool = False) -> list[Case]:
+    """Registered cases whose id or group matches the glob ``pattern``."""
+    import benchmarks.cases  # noqa: F401  (registers the cases)
+    selected = []
+    for case in _REGISTRY:
+        if quick and not case.quick:
+            continue
+        if pattern and not (fnmatch.fnmatch(case.id, pattern) or fnmatch.fnmatch(case.group, pattern)):
+            continue
+        selected.append(case)
+    return selected
+
+
+def measure(fn, repeat: int = DEFAULT_REPEAT, min_time: float = DEFAULT_MIN_TIME) -> dict:
+    """
+    Times ``fn`` like ``timeit``: calls per sample are scaled so a sample takes
+    at least ``min_time`` seconds, then ``repeat`` samples are taken.
+
+    Returns:
+        dict: ``best``, ``median`` and ``mean`` seconds per call, plus ``number`` and ``repeat``.
+    """
+    fn()  # warm-up (imports, lazy caches, first-call allocation)
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time or number >= 1_000_000:
+            break
+        number *= 10 if elapsed < min_time / 10 else 2
+    samples = [elapsed / number]
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - start) / number)
+    return {
+        "best": min(samples),
+        "median": statistics.median(samples),
+        "mean": statistics.fmean(samples),
+        "number": number,
+        "repeat": repeat,
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT,
+                             capture_output=True, text=True, timeout=10)
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return out.stdout.strip() or None
+
+
+def environment() -> dict:
+    """Interpreter, library versions, machine and commit the results were taken on."""
+    import numpy as np
+    import pandas as pd
+    import scipy
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "scipy": scipy.__version__,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "cpu_count": os.cpu_count(),
+        "git_commit": _git_commit(),
+    }
+
+
+def run(pattern: str | None = None, quick: bool = False, repeat: int = DEFAULT_REPEAT,
+        min_time: float = DEFAULT_MIN_TIME, log=sys.stderr) -> dict:
+    """
+    Runs the selected cases.
+
+    Returns:
+        dict: The result document (``schema_version``, ``created_at``,
+        ``environment`` and ``results`` keyed by case id).
+    """
+    results = {}
+    for case in cases(pattern, quick):
+        try:
+            fn = case.setup()
+        except SkipCase as e:
+            results[case.id] = {"group": case.group, "params": case.params, "skipped": str(e)}
+            if log:
+                print(f"{case.id:<64} {'skipped':>10}  ({e})", file=log)
+            continue
+        timing = measure(fn, repeat=repeat, min_time=min_time)
+        results[case.id] = {"group": case.group, "params": case.params, **timing}
+        if log:
+            print(f"{case.id:<64} {format_seconds(timing['best']):>10}  (median "
+                  f"{format_seconds(timing['median'])}, {timing['number']}x{repeat})", file=log)
+    return {
+        "schema_version": SCHEMA_VERSION,
+        "created_at": datetime.datetime.now(datetime.timezone.utc).isoformat(timespec="seconds"),
+        "quick": quick,
+        "environment": environment(),
+        "results": results,
+    }
+
+
+def default_output_path(document: dict) -> str:
+    """``results/<UTC timestamp>_<commit>.json``."""
+    stamp = document["created_at"].replace(":", "").replace("-", "").replace("+0000", "Z")
+    commit = document["environment"].get("git_commit") or "nogit"
+    return os.path.join(RESULTS_DIR, f"{stamp}_{commit}.json")
+
+
+def save(document: dict, path: str) -> str:
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(document, f, indent=2, sort_keys=True)
+        f.write("\n")
+    os.replace(tmp, path)
+    return path
+
+
+def load(path: str) -> dict:
+    """
+    Reads a result file.
+
+    Raises:
+        ValueError: If the file was written by an incompatible schema version.
+    """
+    with open(path, encoding="utf-8") as f:
+        document = json.load(f)
+    version = document.get("schema_version")
+    if version != SCHEMA_VERSION:
+        raise ValueError(f"{path}: schema version {version}, expected {SCHEMA_VERSION}")
+    return document
+
+
+def compare(baseline: dict, current: dict, threshold: float = DEFAULT_THRESHOLD,
+            stat: str = "best") -> list[dict]:
+    """
+    Compares two result documents case by case.
+
+    A case is a ``regression`` when ``current / baseline`` exceeds ``1 + threshold``
+    and ``faster`` when it is below ``1 - threshold``; cases only timed on one
+    side (absent or skipped) are ``new`` or ``missing``.
+
+    Returns:
+        list[dict]: One row per case: ``case``, ``baseline``, ``current``, ``ratio``, ``status``.
+    """
+    base, cur = baseline["results"], current["results"]
+    rows = []
+    for case_id in list(base) + [c for c in cur if c not in base]:
+        b = base.get(case_id, {}).get(stat)
+        c = cur.get(case_id, {}).get(stat)
+        if b is None or c is None:
+            status = "new" if b is None else "missing"
+            ratio = None
+        else:
+            ratio = c / b if b > 0 else float("inf")
+            if ratio > 1 + threshold:
+                status = "regression"
+            elif ratio < 1 - threshold:
+                status = "faster"
+            else:
+                status = "ok"
+        rows.append({"case": case_id, "baseline": b, "current": c, "ratio": ratio, "status": status})
+    return rows
+
+
+def environment_differences(baseline: dict, current: dict) -> dict:
+    """Environment fields that differ (timings across them are not comparable)."""
+    keys = ("python", "numpy", "pandas", "scipy", "machine", "processor", "cpu_count")
+    b, c = baseline.get("environment", {}), current.get("environment", {})
+    return {k: (b.get(k), c.get(k)) for k in keys if b.get(k) != c.get(k)}
+
+
+def format_seconds(seconds: float | None) -> str:
+    if seconds is None:
+        return "-"
+    if seconds >= 1:
+        return f"{seconds:.3f} s"
+    if seconds >= 1e-3:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds * 1e6:.1f} µs"
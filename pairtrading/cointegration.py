@@ -0,0 +1,263 @@
+import hashlib
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# MacKinnon (2010) response surface for the Engle-Granger test with two
+# variables and a constant: critical value = b0 + b1 / T + b2 / T**2.
+MACKINNON_COEFFICIENTS = {
+    0.01: (-3.89644, -10.9519, -33.527),
+    0.05: (-3.33613, -6.1101, -6.823),
+    0.10: (-3.04445, -4.2412, -2.720),
+}
+
+RESULT_COLUMNS = ['asset1', 'asset2', 'alpha', 'hedge_ratio', 'adf_stat',
+                  'critical_value', 'cointegrated', 'half_life', 'n_obs', 'end_date']
+
+# (asset1, asset2, digest of both columns and the index, lags) -> (alpha, hedge_ratio,
+# adf_stat, half_life, n_obs), least recently used first.
+_RESULT_CACHE: OrderedDict[tuple, tuple[float, ...]] = OrderedDict()
+_CACHE_LOCK = threading.Lock()
+MAX_CACHE_ENTRIES = 200_000
+
+
+def critical_value(n_obs, level: float = 0.05):
+    """
+    Engle-Granger critical value of the residual ADF statistic.
+
+    Args:
+        n_obs: Number of observations (scalar or array).
+        level (float): Significance level, one of 0.01, 0.05 or 0.10.
+
+    Returns:
+        The critical value; the pair is cointegrated when ``adf_stat`` is below it.
+    """
+    b0, b1, b2 = MACKINNON_COEFFICIENTS[level]
+    n = np.asarray(n_obs, dtype=np.float64)
+    return b0 + b1 / n + b2 / (n * n)
+
+
+def _trailing_valid(y: np.ndarray, x: np.ndarray) -> np.ndarray:
+    """(T, K) mask of the trailing stretch where both legs of each pair are finite."""
+    bad = ~(np.isfinite(y) & np.isfinite(x))
+    t = np.arange(len(y))[:, None]
+    last_bad = np.where(bad, t, -1).max(axis=0)
+    return t > last_bad[None, :]
+
+
+def hedge_ratios(y: np.ndarray, x: np.ndarray, valid: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """
+    OLS of ``y = alpha + beta * x`` for every column at once.
+
+    Args:
+        y (np.ndarray): (T, K) dependent prices (``asset1``).
+        x (np.ndarray): (T, K) regressor prices (``asset2``).
+        valid (np.ndarray): (T, K) mask of rows to use.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(alpha, beta)`` arrays of length K.
+    """
+    w = valid.astype(np.float64)
+    y = np.where(valid, y, 0.0)
+    x = np.where(valid, x, 0.0)
+    n = w.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = x.sum(axis=0) / n
+        my = y.sum(axis=0) / n
+        dx = (x - mx) * w
+        beta = (dx * (y - my)).sum(axis=0) / (dx * dx).sum(axis=0)
+    return my - beta * mx, beta
+
+
+def adf_statistics(residuals: np.ndarray, valid: np.ndarray, lags: int = 1) -> np.ndarray:
+    """
+    ADF t-statistic of every residual column (no constant, ``lags`` lagged differences).
+
+    Fits ``Δe_t = γ·e_{t-1} + Σ φ_k·Δe_{t-k}`` per column by solving the
+    small normal-equation systems of all columns in one batched call.
+
+    Args:
+        residuals (np.ndarray): (T, K) regression residuals.
+        valid (np.ndarray): (T, K) mask of the trailing valid stretch of each column.
+        lags (int): Number of lagged differences.
+
+    Returns:
+        np.ndarray: The t-statistic of γ for each column (NaN if too short).
+    """
+    e = np.where(valid, residuals, 0.0)
+    de = np.diff(e, axis=0)
+    start = lags
+    target = de[start:]                                         # Δe_t
+    regressors = [e[start:-1]] + [de[start - k:-k] for k in range(1, lags + 1)]
+    X = np.stack(regressors, axis=-1)                           # (n, K, p+1)
+    # A regression row is usable only when every lag lies in the valid stretch.
+    rows = valid[:-1 - start] if start else valid[:-1]
+    w = rows.astype(np.float64)
+
+    Xw = X * w[..., None]
+    XtX = np.einsum('nki,nkj->kij', Xw, X)
+    Xty = np.einsum('nki,nk->ki', Xw, target)
+    n_obs = w.sum(axis=0)
+    dof = n_obs - (lags + 1)
+    ok = dof > 0
+    XtX[~ok] = np.eye(lags + 1)
+
+    coef = np.linalg.solve(XtX, Xty[..., None])[..., 0]
+    fitted = np.einsum('nki,ki->nk', X, coef)
+    ssr = (((target - fitted) * w) ** 2).sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        sigma2 = ssr / dof
+        se = np.sqrt(sigma2 * np.linalg.inv(XtX)[:, 0, 0])
+        stat = coef[:, 0] / se
+    return np.where(ok, stat, np.nan)
+
+
+def half_lives(residuals: np.ndarray, valid: np.ndarray) -> np.ndarray:
+    """
+    Half-life of mean reversion from ``Δe_t = c + λ·e_{t-1}``: ``-ln 2 / λ``.
+
+    Returns ``inf`` for columns that do not mean-revert (λ >= 0).
+    """
+    w = (valid[1:] & valid[:-1]).astype(np.float64)
+    lagged = np.where(valid[:-1], residuals[:-1], 0.0)
+    delta = np.where(valid[1:], residuals[1:], 0.0) - lagged
+    n = w.sum(axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mx = (lagged * w).sum(axis=0) / n
+        my = (delta * w).sum(axis=0) / n
+        dx = (lagged - mx) * w
+        lam = (dx * (delta - my)).sum(axis=0) / (dx * dx).sum(axis=0)
+        return np.where(lam < 0, -np.log(2.0) / lam, np.inf)
+
+
+def engle_granger_block(prices: np.ndarray, i_idx: np.ndarray, j_idx: np.ndarray,
+                        lags: int = 1) -> np.ndarray:
+    """
+    Engle-Granger test for one block of pairs.
+
+    Each pair uses the trailing stretch of rows where both tickers have prices.
+
+    Args:
+        prices (np.ndarray): A (T, N) price matrix.
+        i_idx (np.ndarray): Column indices used as ``asset1`` (dependent leg).
+        j_idx (np.ndarray): Column indices used as ``asset2``.
+        lags (int): Lagged differences in the ADF regression.
+
+    Returns:
+        np.ndarray: A (K, 5) array of ``alpha, hedge_ratio, adf_stat, half_life, n_obs``.
+    """
+    y = prices[:, i_idx]
+    x = prices[:, j_idx]
+    valid = _trailing_valid(y, x)
+    alpha, beta = hedge_ratios(y, x, valid)
+    residuals = y - alpha - beta * x
+    adf = adf_statistics(residuals, valid, lags)
+    return np.column_stack([alpha, beta, adf, half_lives(residuals, valid), valid.sum(axis=0)])
+
+
+def correlated_pairs(prices: pd.DataFrame, min_corr: float = 0.8) -> list[tuple[str, str]]:
+    """
+    Pairs whose daily returns are correlated at least ``min_corr``.
+
+    A cheap pre-filter before the cointegration test on a large universe.
+    """
+    corr = prices.pct_change(fill_method=None).corr().to_numpy()
+    i_idx, j_idx = np.triu_indices(len(prices.columns), k=1)
+    keep = corr[i_idx, j_idx] >= min_corr
+    columns = prices.columns
+    return [(columns[i], columns[j]) for i, j in zip(i_idx[keep], j_idx[keep])]
+
+
+def engle_granger(prices: pd.DataFrame, pairs=None, lags: int = 1, level: float = 0.05,
+                  block_size: int = 2000, use_cache: bool = True) -> pd.DataFrame:
+    """
+    Runs the Engle-Granger cointegration test on many candidate pairs.
+
+    ``asset1`` is regressed on ``asset2`` with a constant (the hedge ratio is the
+    slope), the residuals are tested for a unit root with ADF and the half-life
+    of mean reversion is estimated. Pairs are processed in vectorized blocks, and
+    each pair's result is cached under its tickers, a digest of both price
+    columns and the index, and ``lags``, so re-screening unchanged data is
+    free. The cache keeps the ``MAX_CACHE_ENTRIES`` most recently used results.
+
+    Args:
+        prices (pd.DataFrame): Close prices, one column per ticker.
+        pairs: ``(asset1, asset2)`` tuples. None tests every pair of columns.
+        lags (int): Lagged differences in the ADF regression.
+        level (float): Significance level for ``cointegrated`` (0.01, 0.05 or 0.10).
+        block_size (int): Pairs evaluated per vectorized block.
+        use_cache (bool): Reuse and store results in the in-process cache.
+
+    Returns:
+        pd.DataFrame: One row per pair with ``alpha, hedge_ratio, adf_stat,
+        critical_value, cointegrated, half_life, n_obs, end_date``, sorted by
+        ``adf_stat`` (most cointegrated first).
+    """
+    columns = list(prices.columns)
+    position = {ticker: k for k, ticker in enumerate(columns)}
+    if pairs is None:
+        i_all, j_all = np.triu_indices(len(columns), k=1)
+        pairs = [(columns[i], columns[j]) for i, j in zip(i_all, j_all)]
+    pairs = list(pairs)
+
+    values = prices.to_numpy(dtype=np.float64)
+    finite = np.isfinite(values)
+    # Last row with a price for each ticker: the data end date of a pair.
+    last_row = np.where(finite, np.arange(len(values))[:, None], -1).max(axis=0) if len(values) else np.array([])
+
+    def end_date(a1, a2):
+        end = min(last_row[position[a1]], last_row[position[a2]])
+        return prices.index[end] if end >= 0 else None
+
+    # A revised or back-filled price changes its column's digest, so stale
+    # results are never served even when the last date is unchanged.
+    digests = {}
+    if use_cache:
+        index_digest = hashlib.blake2b(pd.util.hash_pandas_object(prices.index).to_numpy().tobytes()).digest()
+        for ticker, k in position.items():
+            digest = hashlib.blake2b(index_digest, digest_size=16)
+            digest.update(np.ascontiguousarray(values[:, k]).tobytes())
+            digests[ticker] = digest.digest()
+
+    def key(a1, a2):
+        return a1, a2, digests[a1], digests[a2], lags
+
+    results = {}
+    todo = []
+    with _CACHE_LOCK:
+        for pair in pairs:
+            cached = _RESULT_CACHE.get(key(*pair)) if use_cache else None
+            if cached is not None:
+                _RESULT_CACHE.move_to_end(key(*pair))
+                results[pair] = cached
+            else:
+                todo.append(pair)
+
+    for start in range(0, len(todo), block_size):
+        block = todo[start:start + block_size]
+        i_idx = np.fromiter((position[a] for a, _ in block), dtype=np.int64, count=len(block))
+        j_idx = np.fromiter((position[b] for _, b in block), dtype=np.int64, count=len(block))
+        stats = engle_granger_block(values, i_idx, j_idx, lags)
+        for pair, row in zip(block, stats):
+            results[pair] = tuple(row)
+    if use_cache and todo:
+        with _CACHE_LOCK:
+            for pair in todo:
+                _RESULT_CACHE[key(*pair)] = results[pair]
+            while len(_RESULT_CACHE) > MAX_CACHE_ENTRIES:
+                _RESULT_CACHE.popitem(last=False)
+
+    rows = [(a1, a2, *results[(a1, a2)], end_date(a1, a2)) for a1, a2 in pairs]
+    out = pd.DataFrame(rows, columns=['asset1', 'asset2', 'alpha', 'hedge_ratio', 'adf_stat',
+                                      'half_life', 'n_obs', 'end_date'])
+    out['n_obs'] = out['n_obs'].astype(np.int64)
+    out['critical_value'] = critical_value(out['n_obs'].to_numpy(), level)
+    out['cointegrated'] = out['adf_stat'] < out['critical_value']
+    return out[RESULT_COLUMNS].sort_values('adf_stat', ignore_index=True)
+
+
+def hedge_formula(hedge_ratio: float) -> str:
+    """Spread formula for a hedge ratio, in the sidebar's ``(asset2 * k) - asset1`` form."""
+    return f"(asset2 * {hedge_ratio:.6g}) - asset1"
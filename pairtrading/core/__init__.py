@@ -0,0 +1,33 @@
+"""
+Streamlit-free core of the pair-trading pipeline.
+
+Import this package (with the pairtrading folder on ``sys.path``) from cron
+jobs, workers or ``signal_service.py``; the app's ``data_processing`` and
+``strategy`` modules wrap the same functions with Streamlit caching and UI.
+"""
+from core.cache import MemoryCache, NullCache, cached, get_cache, set_cache
+from core.decimate import (
+    DECIMATION_METHODS,
+    decimate_indices,
+    decimate_series,
+    max_points_for_width,
+)
+from core.market import (
+    add_rolling_stats,
+    calculate_spread,
+    calculate_z_score,
+    get_cointegration,
+    get_market_data,
+    load_prices,
+    pair_prices,
+)
+from core.signals import DEFAULT_PAIR, pair_signal, pair_signals, signal_from_frame
+from core.strategy import (
+    MIN_TRADE_VALUE,
+    calculate_portfolio_values,
+    calculate_rebalance_orders,
+    calculate_target_diffs,
+    calculate_target_values,
+    get_z_score_advice,
+    order_for,
+)
@@ -0,0 +1,98 @@
+import functools
+import threading
+import time
+
+# Default lifetime of cached results (seconds), same as the app's st.cache_data(ttl=300).
+DEFAULT_TTL = 300
+
+
+class MemoryCache:
+    """
+    Thread-safe in-process cache with a per-entry time to live.
+
+    Any object with the same ``get``/``set``/``clear`` methods can be installed
+    with ``set_cache`` (e.g. an adapter over Redis or a disk cache).
+    """
+
+    def __init__(self, max_entries: int = 1024, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: dict = {}
+        self._lock = threading.Lock()
+
+    def get(self, key) -> tuple[bool, object]:
+        """Returns ``(hit, value)``; expired entries are a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return False, None
+            expires, value = entry
+            if expires is not None and self._clock() >= expires:
+                del self._entries[key]
+                return False, None
+            return True, value
+
+    def set(self, key, value, ttl: float | None = DEFAULT_TTL) -> None:
+        with self._lock:
+            if len(self._entries) >= self.max_entries and key not in self._entries:
+                # Drop the oldest insertion (dicts keep insertion order).
+                self._entries.pop(next(iter(self._entries)))
+            self._entries[key] = (None if ttl is None else self._clock() + ttl, value)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class NullCache:
+    """Cache that never stores anything (e.g. when the caller caches itself)."""
+
+    def get(self, key) -> tuple[bool, object]:
+        return False, None
+
+    def set(self, key, value, ttl: float | None = DEFAULT_TTL) -> None:
+        pass
+
+    def clear(self) -> None:
+        pass
+
+
+_cache = MemoryCache()
+
+
+def get_cache():
+    """Returns the cache used by ``cached`` functions."""
+    return _cache
+
+
+def set_cache(cache) -> None:
+    """Installs the cache used by every ``cached`` function."""
+    global _cache
+    _cache = cache
+
+
+def cached(ttl: float | None = DEFAULT_TTL):
+    """
+    Memoizes a function in the current cache, keyed by its name and arguments.
+
+    The cache is looked up at call time, so ``set_cache`` also applies to
+    functions decorated before it was called. Arguments must be hashable, and
+    cached values are shared, so callers must not mutate them.
+    """
+    def decorator(fn):
+        name = f"{fn.__module__}.{fn.__qualname__}"
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            key = (name, args, tuple(sorted(kwargs.items())))
+            cache = _cache
+            hit, value = cache.get(key)
+            if hit:
+                return value
+            value = fn(*args, **kwargs)
+            cache.set(key, value, ttl)
+            return value
+
+        return wrapper
+
+    return decorator
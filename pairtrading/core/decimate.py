@@ -0,0 +1,168 @@
+"""
+Point reduction for chart payloads.
+
+A chart cannot show more than a couple of points per pixel column, so long
+histories are decimated before they are handed to Plotly. Two selectors:
+
+- ``minmax``: the minimum and maximum of every bucket, so every spike still
+  reaches its true height (the default; best for threshold charts);
+- ``lttb``: Largest-Triangle-Three-Buckets, one visually representative point
+  per bucket (smoother lines for the same budget).
+
+Either way the first and last points, the extremes and both ends of every
+segment that crosses a threshold level are always kept, so crossings are
+drawn exactly where the full series would draw them. Each contiguous run of
+finite values is decimated on its own, and one NaN is kept between runs so
+the chart still shows the gap instead of bridging it.
+"""
+import numpy as np
+import pandas as pd
+
+DECIMATION_METHODS = ("minmax", "lttb")
+DEFAULT_CHART_WIDTH = 1200
+
+
+def max_points_for_width(width: int, method: str = "minmax") -> int:
+    """Point budget for a chart ``width`` pixels wide: min+max per column, or one LTTB point."""
+    return int(width) * (2 if method == "minmax" else 1)
+
+
+def crossing_indices(y: np.ndarray, levels=()) -> np.ndarray:
+    """
+    Both ends of every segment of ``y`` that crosses (or touches) one of ``levels``.
+
+    Args:
+        y (np.ndarray): Finite values.
+        levels: Threshold levels, e.g. ``(z_score_low, z_score_high)``.
+
+    Returns:
+        np.ndarray: Sorted unique indices.
+    """
+    y = np.asarray(y, dtype=float)
+    if len(y) < 2 or not len(levels):
+        return np.empty(0, dtype=np.intp)
+    side = np.sign(y[:, None] - np.asarray(levels, dtype=float)[None, :])
+    changed = np.flatnonzero((side[1:] != side[:-1]).any(axis=1))
+    return np.unique(np.concatenate([changed, changed + 1]))
+
+
+def minmax_indices(y: np.ndarray, n_buckets: int) -> np.ndarray:
+    """Index of the minimum and of the maximum of each of ``n_buckets`` equal-count buckets."""
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    n_buckets = max(1, min(int(n_buckets), n))
+    edges = np.linspace(0, n, n_buckets + 1).astype(np.intp)
+    starts, ends = edges[:-1], edges[1:]
+    width = int((ends - starts).max())
+    # Pad the buckets to a rectangle so argmin/argmax run once over all of them.
+    offsets = starts[:, None] + np.arange(width)[None, :]
+    valid = offsets < ends[:, None]
+    offsets = np.where(valid, offsets, ends[:, None] - 1)
+    values = y[offsets]
+    lo = offsets[np.arange(n_buckets), np.where(valid, values, np.inf).argmin(axis=1)]
+    hi = offsets[np.arange(n_buckets), np.where(valid, values, -np.inf).argmax(axis=1)]
+    return np.unique(np.concatenate([lo, hi]))
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, n_out: int) -> np.ndarray:
+    """
+    Largest-Triangle-Three-Buckets: ``n_out`` indices including the first and last point.
+
+    Args:
+        x (np.ndarray): Increasing positions (e.g. timestamps as float).
+        y (np.ndarray): Values.
+        n_out (int): Number of points to keep (at least 3).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.intp)
+    selected = np.empty(n_out, dtype=np.intp)
+    selected[0], selected[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        # Average of the next bucket (the last point for the final bucket).
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        cx, cy = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        area = np.abs((x[a] - cx) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (cy - y[a]))
+        a = lo + int(area.argmax())
+        selected[i + 1] = a
+    return selected
+
+
+def finite_runs(y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """``(starts, ends)`` of the contiguous runs of finite values in ``y`` (``ends`` exclusive)."""
+    finite = np.isfinite(np.asarray(y, dtype=float)).astype(np.int8)
+    edges = np.flatnonzero(np.diff(np.concatenate(([0], finite, [0]))))
+    return edges[::2], edges[1::2]
+
+
+def _decimate_run(values: np.ndarray, positions: np.ndarray, max_points: int, levels, method: str) -> np.ndarray:
+    # Positions (into ``values``) to keep from one run of finite values.
+    n = len(values)
+    if n <= max_points:
+        return np.arange(n)
+    keep = [np.array([0, n - 1, values.argmin(), values.argmax()]), crossing_indices(values, levels)]
+    budget = max(int(max_points) - sum(len(k) for k in keep), 4)
+    if method == "minmax":
+        keep.append(minmax_indices(values, budget // 2))
+    else:
+        keep.append(lttb_indices(positions, values, budget))
+    return np.unique(np.concatenate(keep))
+
+
+def decimate_indices(y: np.ndarray, max_points: int, levels=(), method: str = "minmax",
+                     x: np.ndarray | None = None) -> np.ndarray:
+    """
+    Positions of ``y`` to plot, at most about ``max_points`` of them.
+
+    Non-finite values (e.g. the Z-score warm-up, or bars missing in one leg)
+    split ``y`` into runs. The budget is shared between the runs by length,
+    each run is decimated on its own, and the first non-finite position after
+    every run but the last is kept as a gap marker. Within a run the crossings
+    of ``levels`` and the extremes are kept first and the selector fills the
+    rest, so the result only exceeds ``max_points`` when the series crosses a
+    level more than ``max_points / 2`` times (or has very many short runs).
+
+    Args:
+        y (np.ndarray): The series values.
+        max_points (int): Point budget.
+        levels: Threshold levels whose crossings must be kept.
+        method (str): 'minmax' or 'lttb'.
+        x (np.ndarray, optional): Positions used by LTTB; defaults to ``arange(len(y))``.
+
+    Returns:
+        np.ndarray: Sorted positions into ``y``.
+
+    Raises:
+        ValueError: On an unknown ``method``.
+    """
+    if method not in DECIMATION_METHODS:
+        raise ValueError(f"Unknown decimation method {method!r}; expected one of {DECIMATION_METHODS}")
+    y = np.asarray(y, dtype=float)
+    starts, ends = finite_runs(y)
+    if not len(starts):
+        return np.empty(0, dtype=np.intp)
+    positions = np.arange(len(y), dtype=float) if x is None else np.asarray(x, dtype=float)
+    lengths = ends - starts
+    total = int(lengths.sum())
+    keep = [ends[:-1]]
+    for start, end, length in zip(starts, ends, lengths):
+        budget = max(int(max_points * length / total), 4) if total > max_points else length
+        keep.append(start + _decimate_run(y[start:end], positions[start:end], budget, levels, method))
+    return np.unique(np.concatenate(keep)).astype(np.intp)
+
+
+def decimate_series(series: pd.Series, max_points: int, levels=(), method: str = "minmax") -> pd.Series:
+    """
+    The points of ``series`` chosen by ``decimate_indices`` (datetime indexes
+    are used as x), with NaN gap markers between runs so the line breaks there.
+    """
+    index = series.index
+    x = index.asi8 if isinstance(index, pd.DatetimeIndex) else None
+    points = series.iloc[decimate_indices(series.to_numpy(dtype=float), max_points, levels, method, x)]
+    # An infinite Z-score (flat window) is a gap marker too, not a point to plot.
+    return points.where(np.isfinite(points.to_numpy(dtype=float)))
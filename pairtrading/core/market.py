@@ -0,0 +1,160 @@
+import pandas as pd
+
+from bars import DEFAULT_MAX_GAP_BARS, align_closes, window_bars
+from cointegration import engle_granger
+from core.cache import cached
+from formula import compile_spread_formula
+from hedge import dynamic_spread
+from price_store import get_price_store
+
+
+@cached(ttl=300)
+def load_prices(tickers: tuple[str, ...], days: int = 365, interval: str = "1d") -> pd.DataFrame:
+    """
+    Fetches closes for a set of tickers in one batched download.
+
+    Every ticker is shared through the local price store, so a ticker used by
+    several pairs is only downloaded once per refresh interval.
+
+    Args:
+        tickers (tuple[str, ...]): The tickers needed by the caller.
+        days (int): The number of days of historical data to fetch.
+        interval (str): Bar interval: '1m', '5m', '1h' or '1d'.
+
+    Returns:
+        pd.DataFrame: One column of Close prices per ticker.
+    """
+    return get_price_store(interval).get_closes(list(tickers), days)
+
+
+def pair_prices(data: pd.DataFrame, asset1_ticker: str, asset2_ticker: str, interval: str = "1d",
+                max_gap_bars: int = DEFAULT_MAX_GAP_BARS) -> pd.DataFrame:
+    """
+    Selects a pair from a price frame as ``asset1``/``asset2`` rows where both have prices.
+
+    Intraday legs are lined up with ``bars.align_closes``: short gaps in one
+    leg are bridged with its last price, closed sessions are dropped.
+
+    Raises:
+        KeyError: If either ticker is missing from ``data``.
+    """
+    missing = [t for t in (asset1_ticker, asset2_ticker) if t not in data.columns]
+    if missing:
+        raise KeyError(f"The downloaded data does not contain {', '.join(missing)}")
+    df = data[[asset1_ticker, asset2_ticker]].copy()
+    df.columns = ["asset1", "asset2"]
+    return align_closes(df, interval, max_gap_bars)
+
+
+def get_market_data(asset1_ticker, asset2_ticker, spread_formula, days=365, rolling_window=90, hedge_mode="formula",
+                    interval="1d"):
+    """
+    Fetches and processes market data for a pair of assets.
+
+    Args:
+        asset1_ticker (str): The ticker for the first asset.
+        asset2_ticker (str): The ticker for the second asset.
+        spread_formula (str): The formula to calculate the spread.
+        days (int): The number of days of historical data to fetch.
+        rolling_window (int | str): The rolling window for Z-score calculation,
+            in bars or as a span such as '4h' or '20d' (see ``bars.window_bars``).
+        hedge_mode (str): 'formula' uses ``spread_formula``; 'rolling_ols' or
+            'kalman' estimate the hedge ratio dynamically (see hedge.py).
+        interval (str): Bar interval: '1m', '5m', '1h' or '1d'.
+
+    Returns:
+        pd.DataFrame: A DataFrame with market data and Z-score calculations
+        (empty when no prices were downloaded).
+
+    Raises:
+        KeyError: If the download does not contain both tickers.
+    """
+    # Prices are cached per ticker set only, so editing the formula or the
+    # rolling window recomputes the Z-score without touching the network.
+    data = load_prices((asset1_ticker, asset2_ticker), days, interval)
+    if data.empty:
+        return pd.DataFrame()
+    df = pair_prices(data, asset1_ticker, asset2_ticker, interval)
+    return calculate_z_score(df, spread_formula, window=rolling_window, hedge_mode=hedge_mode)
+
+
+def get_cointegration(asset1_ticker, asset2_ticker, days=365):
+    """
+    Engle-Granger test of a pair, used to suggest a data-driven hedge ratio.
+
+    Args:
+        asset1_ticker (str): The ticker for the first asset.
+        asset2_ticker (str): The ticker for the second asset.
+        days (int): The number of days of historical data to use.
+
+    Returns:
+        dict | None: ``hedge_ratio``, ``adf_stat``, ``critical_value``,
+        ``cointegrated`` and ``half_life``, or None when there is no data.
+    """
+    data = load_prices((asset1_ticker, asset2_ticker), days)
+    if data.empty or asset1_ticker == asset2_ticker:
+        return None
+    result = engle_granger(data[[asset1_ticker, asset2_ticker]], [(asset1_ticker, asset2_ticker)])
+    return result.iloc[0].to_dict()
+
+
+def calculate_spread(df: pd.DataFrame, spread_formula: str, window: int, hedge_mode: str = "formula") -> pd.DataFrame:
+    """
+    Adds the 'Spread' column (and 'Hedge_Ratio' for the dynamic modes).
+
+    Args:
+        df (pd.DataFrame): DataFrame containing asset prices.
+        spread_formula (str): The formula to calculate the spread.
+        window (int | str): Regression window of the 'rolling_ols' mode, in bars or as a span.
+        hedge_mode (str): 'formula' (default), 'rolling_ols' or 'kalman'.
+
+    Returns:
+        pd.DataFrame: ``df`` with the spread column(s) added.
+    """
+    asset1 = df['asset1'].to_numpy(dtype=float)
+    asset2 = df['asset2'].to_numpy(dtype=float)
+    if hedge_mode == "formula":
+        # The formula is parsed once into a whitelisted AST (see formula.py) and
+        # evaluated on the raw NumPy arrays, so no arbitrary code can run here.
+        spread_fn = compile_spread_formula(spread_formula)
+        df['Spread'] = spread_fn(asset1, asset2)
+    else:
+        df['Spread'], df['Hedge_Ratio'] = dynamic_spread(asset1, asset2, hedge_mode, window_bars(window, df.index))
+    return df
+
+
+def add_rolling_stats(df: pd.DataFrame, window: int) -> pd.DataFrame:
+    """
+    Adds rolling 'Mean', 'Std' and 'Z_Score' of the 'Spread' column.
+
+    Args:
+        df (pd.DataFrame): DataFrame with a 'Spread' column.
+        window (int | str): The rolling window for mean and standard deviation,
+            in bars or as a span such as '4h' or '20d'.
+
+    Returns:
+        pd.DataFrame: ``df`` with the rolling columns added.
+    """
+    window = window_bars(window, df.index)
+    df['Mean'] = df['Spread'].rolling(window=window).mean()
+    df['Std'] = df['Spread'].rolling(window=window).std()
+    df['Z_Score'] = (df['Spread'] - df['Mean']) / df['Std']
+    return df
+
+
+def calculate_z_score(df: pd.DataFrame, spread_formula: str, window: int, hedge_mode: str = "formula") -> pd.DataFrame:
+    """
+    Calculates the spread and Z-score for a pair of assets.
+
+    Args:
+        df (pd.DataFrame): DataFrame containing asset prices.
+        spread_formula (str): The formula to calculate the spread.
+        window (int | str): The rolling window, in bars or as a span such as '4h' or '20d'.
+        hedge_mode (str): 'formula' (default), 'rolling_ols' or 'kalman'. The
+            dynamic modes ignore ``spread_formula`` and add a 'Hedge_Ratio' column.
+
+    Returns:
+        pd.DataFrame: The DataFrame with 'Spread', 'Mean', 'Std', and 'Z_Score' columns added.
+    """
+    df = calculate_spread(df, spread_formula, window, hedge_mode)
+    return add_rolling_stats(df, window)
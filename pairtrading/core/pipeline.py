@@ -0,0 +1,86 @@
+import itertools
+import time
+from typing import NamedTuple
+
+import pandas as pd
+
+from tracing import span
+
+
+class StageTiming(NamedTuple):
+    stage: str
+    ran: bool
+    seconds: float
+
+
+class _Entry(NamedTuple):
+    key: tuple
+    value: object
+    version: int
+
+
+class StagePipeline:
+    """
+    Memoizes a chain of stages (e.g. prices → spread → z-score → orders → figure).
+
+    Each stage keeps its latest result under an explicit dependency key. A
+    stage's key should contain its own inputs plus the ``version`` of every
+    upstream stage it reads, so a change only reruns the stages downstream of
+    it: editing the cash amount reruns ``orders`` but not ``prices``.
+
+    Every ``run`` call is timed; ``timings`` lists the stages of the current
+    pass (reset with ``begin``), which is what the app shows per rerun.
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self.timings: list[StageTiming] = []
+        self._entries: dict[str, _Entry] = {}
+        self._versions = itertools.count(1)
+
+    def begin(self) -> None:
+        """Starts a new pass (one app rerun)."""
+        self.timings = []
+
+    def run(self, name: str, key: tuple, fn, *args, **kwargs):
+        """
+        Returns the stage's cached value if ``key`` is unchanged, otherwise runs ``fn``.
+
+        Args:
+            name (str): Stage name.
+            key (tuple): Dependency key; compared with ``==``.
+            fn: Function computing the stage from ``*args, **kwargs``.
+
+        Returns:
+            The stage value. Exceptions from ``fn`` propagate and nothing is cached.
+        """
+        start = self.clock()
+        entry = self._entries.get(name)
+        ran = entry is None or entry.key != key
+        with span(f"stage:{name}", cache="miss" if ran else "hit"):
+            if ran:
+                value = fn(*args, **kwargs)
+                entry = _Entry(key, value, next(self._versions))
+                self._entries[name] = entry
+        self.timings.append(StageTiming(name, ran, self.clock() - start))
+        return entry.value
+
+    def version(self, name: str) -> int:
+        """Version of a stage's current value (0 if it never ran); changes on every recompute."""
+        entry = self._entries.get(name)
+        return entry.version if entry else 0
+
+    def invalidate(self, name: str | None = None) -> None:
+        """Drops one stage (or all), forcing it to run on the next pass."""
+        if name is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(name, None)
+
+    def report(self) -> pd.DataFrame:
+        """The current pass as a table: stage, ran (or cached), milliseconds."""
+        return pd.DataFrame({
+            'Stage': [t.stage for t in self.timings],
+            'Status': ['ran' if t.ran else 'cached' for t in self.timings],
+            'ms': [round(t.seconds * 1000, 2) for t in self.timings],
+        })
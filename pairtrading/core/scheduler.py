@@ -0,0 +1,364 @@
+"""
+Background refresh of a watchlist of pairs.
+
+Keeps the price store and every watched pair's signal warm, so the first
+viewer of the app (or any reader of the snapshot file) does not pay the
+download and Z-score latency.
+
+Run from the pairtrading folder as its own process:
+    python -m core.scheduler --watchlist watchlist.json --interval 300
+or start it inside the app with ``RefreshScheduler.start_in_thread()``.
+See watchlist.example.json for the file format.
+"""
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from bars import parse_window, window_bars
+from core.market import calculate_z_score, pair_prices
+from core.signals import DEFAULT_PAIR, signal_from_frame
+from formula import compile_spread_formula
+from price_store import get_price_store
+from tracing import tracer
+from zscore_state import RollingZScore
+
+_HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_WATCHLIST_PATH = os.environ.get("PAIRTRADING_WATCHLIST", os.path.join(_HERE, "watchlist.json"))
+DEFAULT_SNAPSHOT_PATH = os.environ.get("PAIRTRADING_SNAPSHOT", os.path.join(_HERE, ".signal_snapshot.json"))
+
+DEFAULT_INTERVAL = 300
+DEFAULT_BATCH_SIZE = 8
+BACKOFF_BASE = 5.0
+BACKOFF_MAX = 900.0
+
+
+def load_watchlist(path: str = DEFAULT_WATCHLIST_PATH) -> list[dict]:
+    """
+    Reads the watchlist: a JSON list of ``"ASSET1:ASSET2"`` strings or pair
+    dicts (``asset1``, ``asset2`` and any ``DEFAULT_PAIR`` setting).
+
+    Returns an empty list when the file does not exist.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            entries = json.load(f)
+    except FileNotFoundError:
+        return []
+    pairs = []
+    for entry in entries:
+        if isinstance(entry, str):
+            asset1, _, asset2 = entry.partition(":")
+            entry = {"asset1": asset1, "asset2": asset2}
+        pairs.append(dict(entry))
+    return pairs
+
+
+def pair_key(spec: dict) -> str:
+    """'GC=F:SI=F', or 'GC=F:SI=F@5m' for intraday bars."""
+    return feed_key(f"{spec['asset1']}:{spec['asset2']}", bar_interval(spec))
+
+
+def bar_interval(spec: dict) -> str:
+    return spec.get("interval", DEFAULT_PAIR["interval"])
+
+
+def feed_key(ticker: str, interval: str) -> str:
+    """A ticker's bars of one interval: 'GC=F' (daily) or 'GC=F@5m'."""
+    return ticker if interval == "1d" else f"{ticker}@{interval}"
+
+
+def split_feed(feed: str) -> tuple[str, str]:
+    ticker, _, interval = feed.rpartition("@")
+    return (ticker, interval) if ticker else (feed, "1d")
+
+
+class SignalSnapshot:
+    """
+    Latest signal of every watched pair, in memory and mirrored to a JSON file.
+
+    The file is replaced atomically, so another process (e.g. the Streamlit
+    app) can read it at any time with ``SignalSnapshot.read``.
+    """
+
+    def __init__(self, path: str | None = DEFAULT_SNAPSHOT_PATH):
+        self.path = path
+        self._entries: dict[str, dict] = {}
+        self._lock = threading.Lock()
+
+    def publish(self, key: str, signal: dict) -> None:
+        with self._lock:
+            self._entries[key] = {**signal, "updated_at": time.time()}
+
+    def get(self, key: str) -> dict | None:
+        with self._lock:
+            return self._entries.get(key)
+
+    def entries(self) -> dict[str, dict]:
+        with self._lock:
+            return dict(self._entries)
+
+    def flush(self) -> None:
+        if not self.path:
+            return
+        payload = {"written_at": time.time(), "signals": self.entries()}
+        tmp = self.path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(payload, f, ensure_ascii=False)
+        os.replace(tmp, self.path)
+
+    @staticmethod
+    def read(path: str = DEFAULT_SNAPSHOT_PATH) -> dict[str, dict]:
+        """Signals by ``"ASSET1:ASSET2"`` from a snapshot file (empty if missing)."""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return json.load(f).get("signals", {})
+        except (OSError, ValueError):
+            return {}
+
+
+class RefreshScheduler:
+    """
+    Asyncio loop that refreshes the watchlist's tickers and recomputes its pairs.
+
+    Every ``interval`` seconds the due tickers are refreshed in batches of
+    ``batch_size`` tickers, one batch after the other in a worker thread:
+    yfinance is not thread-safe, so the price store serializes every download
+    in the process anyway (see ``price_store._YFINANCE_LOCK``). A failing batch
+    backs its tickers off exponentially from ``BACKOFF_BASE`` up to
+    ``BACKOFF_MAX`` seconds without skipping the others. After each round the pairs whose
+    tickers were refreshed are recomputed with ``calculate_z_score`` and
+    published to the snapshot.
+
+    Pairs with intraday bars (``"interval": "5m"`` in the watchlist) are
+    tracked as separate feeds (``feed_key``) and refreshed from the price
+    store of their interval (``store_for``); batches never mix intervals.
+
+    Pairs with a spread formula (``hedge_mode`` 'formula') keep a
+    ``RollingZScore`` of their closed bars, so a round only feeds it the bars
+    that arrived since the last one instead of re-running the rolling
+    statistics over the whole history. The newest bar may still be forming,
+    so it is only previewed; the state is re-seeded with ``calculate_z_score``
+    when a bar in its window was revised or too many bars arrived at once.
+
+    The price store's own ``refresh_interval`` still applies, so the effective
+    cadence is the larger of the two.
+    """
+
+    def __init__(self, watchlist: list[dict], store=None, interval: float = DEFAULT_INTERVAL,
+                 batch_size: int = DEFAULT_BATCH_SIZE, snapshot: SignalSnapshot | None = None,
+                 clock=time.monotonic, store_factory=None):
+        """
+        Args:
+            watchlist (list[dict]): Pairs to keep warm (see ``load_watchlist``).
+            store: Daily price store; defaults to ``get_price_store()``.
+            interval (float): Seconds between refreshes of a ticker.
+            batch_size (int): Tickers per store refresh.
+            snapshot (SignalSnapshot, optional): Where signals are published.
+            clock: Time source, in seconds.
+            store_factory: ``interval -> store`` for intraday pairs. Defaults to
+                ``store.for_interval`` for an injected store, so its downloader
+                is used for every interval, and to ``get_price_store`` otherwise.
+        """
+        self.watchlist = [dict(spec) for spec in watchlist]
+        self.store = store or get_price_store()
+        if store_factory is None:
+            store_factory = get_price_store if store is None else store.for_interval
+        self.store_factory = store_factory
+        self.stores = {"1d": self.store}
+        self.interval = interval
+        self.batch_size = batch_size
+        self.snapshot = snapshot or SignalSnapshot()
+        self.clock = clock
+        self.errors: dict[str, str] = {}
+        # pair key -> (settings it was seeded with, state of the closed bars, time of its last bar)
+        self._z_states: dict[str, tuple[tuple, RollingZScore, pd.Timestamp]] = {}
+        self._failures: dict[str, int] = {}
+        self._due: dict[str, float] = {t: 0.0 for t in self.tickers}
+        self._thread = None
+        self._loop = None
+        self._stop = None
+
+    @property
+    def tickers(self) -> list[str]:
+        """Every watched feed: the ticker for daily pairs, ``ticker@interval`` for intraday ones."""
+        return list(dict.fromkeys(feed for spec in self.watchlist for feed in self._feeds(spec)))
+
+    @staticmethod
+    def _feeds(spec: dict) -> tuple[str, str]:
+        interval = bar_interval(spec)
+        return feed_key(spec["asset1"], interval), feed_key(spec["asset2"], interval)
+
+    def store_for(self, interval: str):
+        if interval not in self.stores:
+            self.stores[interval] = self.store_factory(interval)
+        return self.stores[interval]
+
+    def _days(self, feeds) -> int:
+        wanted = set(feeds)
+        return max(int(spec.get("days", DEFAULT_PAIR["days"])) for spec in self.watchlist
+                   if wanted.intersection(self._feeds(spec)))
+
+    async def _refresh_batch(self, batch: list[str]) -> list[str]:
+        interval = split_feed(batch[0])[1]
+        tickers = [split_feed(feed)[0] for feed in batch]
+        try:
+            await asyncio.to_thread(self.store_for(interval).refresh, tickers, self._days(batch))
+        except Exception as e:
+            now = self.clock()
+            for ticker in batch:
+                failures = self._failures.get(ticker, 0) + 1
+                self._failures[ticker] = failures
+                self._due[ticker] = now + min(BACKOFF_BASE * 2 ** (failures - 1), BACKOFF_MAX)
+                self.errors[ticker] = str(e)
+            return []
+        now = self.clock()
+        for ticker in batch:
+            self._failures.pop(ticker, None)
+            self.errors.pop(ticker, None)
+            self._due[ticker] = now + self.interval
+        return batch
+
+    def compute_pair(self, spec: dict) -> dict:
+        """Recomputes one pair from the (already refreshed) price store."""
+        settings = {k: v for k, v in spec.items() if k not in ("asset1", "asset2")}
+        s = {**DEFAULT_PAIR, **settings}
+        asset1, asset2 = spec["asset1"], spec["asset2"]
+        interval = bar_interval(spec)
+        data = self.store_for(interval).get_closes([asset1, asset2], int(s["days"]))
+        df = self._z_score_frame(pair_key(spec), pair_prices(data, asset1, asset2, interval), s)
+        return signal_from_frame(df, asset1, asset2, **settings)
+
+    def _z_score_frame(self, key: str, prices: pd.DataFrame, s: dict) -> pd.DataFrame:
+        """
+        ``calculate_z_score`` of a pair, or just its newest row from the pair's
+        incremental state when that state is still valid for ``prices``.
+        """
+        window = parse_window(s["rolling_window"])
+        if s["hedge_mode"] != "formula":
+            return calculate_z_score(prices, s["spread_formula"], window=window, hedge_mode=s["hedge_mode"])
+        settings = (s["spread_formula"], str(s["rolling_window"]))
+        seeded = self._z_states.get(key)
+        if seeded is not None and seeded[0] == settings and len(prices):
+            _, state, last_time = seeded
+            pos = prices.index.get_indexer([last_time])[0]
+            start = pos - state.count + 1
+            if 0 <= start and len(prices) - pos - 2 <= state.window:
+                tail = prices.iloc[start:]
+                spreads = compile_spread_formula(s["spread_formula"])(tail["asset1"].to_numpy(dtype=float),
+                                                                      tail["asset2"].to_numpy(dtype=float))
+                spreads = np.where(np.isinf(spreads), np.nan, spreads)
+                absorbed, new = spreads[:state.count], spreads[state.count:]
+                # None of the bars in the state's window may have been revised since.
+                if len(new) and np.allclose(absorbed, state.spreads(), rtol=1e-12, atol=0.0, equal_nan=True):
+                    for spread in new[:-1]:
+                        state.update(spread)
+                    self._z_states[key] = (settings, state, tail.index[-2])
+                    return tail.iloc[-1:].assign(**state.preview(new[-1]))
+
+        df = calculate_z_score(prices, s["spread_formula"], window=window)
+        if len(df) > 1:
+            # Seed from the closed bars only; the newest one may still change.
+            state = RollingZScore.from_frame(df.iloc[:-1], window_bars(window, df.index), s["spread_formula"])
+            self._z_states[key] = (settings, state, df.index[-2])
+        return df
+
+    async def run_once(self) -> list[str]:
+        """
+        Refreshes the tickers that are due and recomputes the affected pairs.
+
+        Returns:
+            list[str]: Keys of the pairs that were republished.
+        """
+        # Each round is one "rerun" of the scheduler's own span stream
+        # (tracer.background, as the scheduler thread has no app session).
+        tracer.begin_rerun()
+        now = self.clock()
+        due = [t for t in self.tickers if self._due.get(t, 0.0) <= now]
+        if not due:
+            return []
+        by_interval: dict[str, list[str]] = {}
+        for feed in due:
+            by_interval.setdefault(split_feed(feed)[1], []).append(feed)
+        batches = [feeds[i:i + self.batch_size] for feeds in by_interval.values()
+                   for i in range(0, len(feeds), self.batch_size)]
+        refreshed = set()
+        for batch in batches:
+            refreshed.update(await self._refresh_batch(batch))
+
+        published = []
+        for spec in self.watchlist:
+            if refreshed.intersection(self._feeds(spec)):
+                try:
+                    signal = await asyncio.to_thread(self.compute_pair, spec)
+                except Exception as e:
+                    signal = {"asset1": spec["asset1"], "asset2": spec["asset2"], "error": str(e)}
+                self.snapshot.publish(pair_key(spec), signal)
+                published.append(pair_key(spec))
+        if published:
+            await asyncio.to_thread(self.snapshot.flush)
+        return published
+
+    async def run(self, stop: asyncio.Event | None = None) -> None:
+        """Runs ``run_once`` until ``stop`` is set, sleeping until the next ticker is due."""
+        stop = stop or asyncio.Event()
+        while not stop.is_set():
+            await self.run_once()
+            wait = max(min(self._due.values(), default=self.clock() + self.interval) - self.clock(), 1.0)
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=wait)
+            except asyncio.TimeoutError:
+                pass
+
+    def start_in_thread(self) -> threading.Thread:
+        """Runs the scheduler on its own event loop in a daemon thread."""
+        ready = threading.Event()
+
+        def target():
+            self._loop = asyncio.new_event_loop()
+            self._stop = asyncio.Event()
+            ready.set()
+            self._loop.run_until_complete(self.run(self._stop))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=target, name="refresh-scheduler", daemon=True)
+        self._thread.start()
+        ready.wait()
+        return self._thread
+
+    def stop(self, timeout: float | None = 10.0) -> None:
+        """Stops a scheduler started with ``start_in_thread``."""
+        if self._thread is None:
+            return
+        self._loop.call_soon_threadsafe(self._stop.set)
+        self._thread.join(timeout)
+        self._thread = None
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Keep a watchlist of pair signals warm.")
+    parser.add_argument("--watchlist", default=DEFAULT_WATCHLIST_PATH)
+    parser.add_argument("--snapshot", default=DEFAULT_SNAPSHOT_PATH)
+    parser.add_argument("--interval", type=float, default=DEFAULT_INTERVAL)
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    args = parser.parse_args(argv)
+
+    watchlist = load_watchlist(args.watchlist)
+    if not watchlist:
+        parser.error(f"no pairs in {args.watchlist}")
+    scheduler = RefreshScheduler(watchlist, interval=args.interval, batch_size=args.batch_size,
+                                 snapshot=SignalSnapshot(args.snapshot))
+    try:
+        asyncio.run(scheduler.run())
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
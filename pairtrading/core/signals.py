@@ -0,0 +1,137 @@
+import math
+
+from bars import parse_window
+from core.market import get_market_data
+from core.strategy import (
+    calculate_portfolio_values,
+    calculate_rebalance_orders,
+    calculate_target_values,
+    get_z_score_advice,
+    order_for,
+)
+
+# Defaults of the app's sidebar.
+DEFAULT_PAIR = {
+    "spread_formula": "(asset2 * 100) - asset1",
+    "hedge_mode": "formula",
+    "rolling_window": 90,
+    "interval": "1d",
+    "days": 365,
+    "z_score_high": 2.0,
+    "z_score_low": -2.0,
+    "qty_asset1": 0.0,
+    "qty_asset2": 0.0,
+    "cash_dca": 1000.0,
+    "target_asset1_pct": 50,
+}
+
+
+def _number(value):
+    """JSON-safe float (NaN/inf become None)."""
+    value = float(value)
+    return value if math.isfinite(value) else None
+
+
+def _bar_time(ts) -> str:
+    """'2024-05-01' for daily bars, the full UTC bar time for intraday ones."""
+    if not hasattr(ts, "date"):
+        return str(ts)
+    return str(ts.date()) if ts == ts.normalize() else ts.isoformat()
+
+
+def _settings(settings: dict) -> dict:
+    unknown = set(settings) - set(DEFAULT_PAIR)
+    if unknown:
+        raise ValueError(f"Unknown pair settings: {', '.join(sorted(unknown))}")
+    return {**DEFAULT_PAIR, **settings}
+
+
+def signal_from_frame(df, asset1: str, asset2: str, **settings) -> dict:
+    """
+    Builds a pair's signal from an already computed ``calculate_z_score`` frame.
+
+    Args:
+        df (pd.DataFrame): Output of ``calculate_z_score`` / ``get_market_data``.
+        asset1 (str): The ticker for asset 1.
+        asset2 (str): The ticker for asset 2.
+        **settings: Overrides of ``DEFAULT_PAIR``.
+
+    Returns:
+        dict: See ``pair_signal``.
+    """
+    s = _settings(settings)
+    if df.empty:
+        return {"asset1": asset1, "asset2": asset2, "error": "No market data"}
+
+    latest = df.iloc[-1]
+    p_asset1, p_asset2, z_score = float(latest["asset1"]), float(latest["asset2"]), float(latest["Z_Score"])
+    target1 = int(s["target_asset1_pct"])
+    val_asset1, val_asset2, total_val = calculate_portfolio_values(
+        float(s["qty_asset1"]), float(s["qty_asset2"]), p_asset1, p_asset2, float(s["cash_dca"]))
+    tgt_val_asset1, tgt_val_asset2 = calculate_target_values(total_val, target1, 100 - target1)
+    diff_asset1, diff_asset2 = calculate_rebalance_orders(
+        z_score, float(s["z_score_high"]), float(s["z_score_low"]), val_asset1, val_asset2,
+        tgt_val_asset1, tgt_val_asset2, float(s["cash_dca"]), p_asset1, p_asset2, total_val)
+
+    signal = {
+        "asset1": asset1,
+        "asset2": asset2,
+        "date": _bar_time(df.index[-1]),
+        "price_asset1": p_asset1,
+        "price_asset2": p_asset2,
+        "spread": _number(latest["Spread"]),
+        "z_score": _number(z_score),
+        "advice": get_z_score_advice(z_score, float(s["z_score_high"]), float(s["z_score_low"]), asset1, asset2),
+        "orders": {asset1: order_for(diff_asset1, p_asset1), asset2: order_for(diff_asset2, p_asset2)},
+    }
+    if "Hedge_Ratio" in df.columns:
+        signal["hedge_ratio"] = _number(latest["Hedge_Ratio"])
+    return signal
+
+
+def pair_signal(asset1: str, asset2: str, **settings) -> dict:
+    """
+    Latest price, Z-score and rebalance orders for one pair, as plain JSON types.
+
+    Uses the app's market data and Z-score advice. The orders follow the
+    strategy's Z-score rules (``calculate_rebalance_orders``, as in
+    backtest.py); the dashboard's action cards only rebalance to the target
+    allocation (``calculate_target_diffs``), so the two differ once the
+    Z-score is outside the thresholds.
+
+    Args:
+        asset1 (str): The ticker for asset 1.
+        asset2 (str): The ticker for asset 2.
+        **settings: Overrides of ``DEFAULT_PAIR`` (formula, window, thresholds,
+            holdings, cash and target allocation).
+
+    Returns:
+        dict: ``asset1, asset2, date, price_asset1, price_asset2, spread,
+        z_score, advice, orders`` (or ``error`` when the pair has no data).
+    """
+    s = _settings(settings)
+    df = get_market_data(asset1, asset2, s["spread_formula"], days=int(s["days"]),
+                         rolling_window=parse_window(s["rolling_window"]), hedge_mode=s["hedge_mode"],
+                         interval=s["interval"])
+    return signal_from_frame(df, asset1, asset2, **s)
+
+
+def pair_signals(pairs: list[dict]) -> list[dict]:
+    """
+    Runs ``pair_signal`` for several pairs; a failing pair reports ``error``
+    instead of aborting the batch.
+
+    Args:
+        pairs (list[dict]): Each dict has ``asset1``, ``asset2`` and optional settings.
+    """
+    out = []
+    for spec in pairs:
+        spec = dict(spec)
+        asset1, asset2 = spec.pop("asset1", None), spec.pop("asset2", None)
+        try:
+            if not asset1 or not asset2:
+                raise ValueError("Each pair needs 'asset1' and 'asset2'")
+            out.append(pair_signal(asset1, asset2, **spec))
+        except Exception as e:
+            out.append({"asset1": asset1, "asset2": asset2, "error": str(e)})
+    return out
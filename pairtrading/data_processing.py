@@ -1,10 +1,36 @@
-import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
 import streamlit as st
+from core import market
+from core.market import calculate_z_score  # noqa: F401  (re-exported for older callers)
+from tracing import mark_cache_miss, traced
 
+# The computations live in core.market (no Streamlit import) so they can run in
+# cron jobs and signal_service.py; this module only adds the app's caching.
+
+@traced("load_prices", cached=True)
 @st.cache_data(ttl=300) # Cache for 5 minutes for speed
-def get_market_data(asset1_ticker, asset2_ticker, spread_formula, days=365, rolling_window=90):
+def load_prices(tickers: tuple[str, ...], days: int = 365, interval: str = "1d") -> pd.DataFrame:
+    """
+    Fetches closes for a set of tickers in one batched download.
+
+    Every ticker is shared through the local price store, so a ticker used by
+    several pairs is only downloaded once per refresh interval.
+
+    Args:
+        tickers (tuple[str, ...]): The tickers needed by the session.
+        days (int): The number of days of historical data to fetch.
+        interval (str): Bar interval: '1m', '5m', '1h' or '1d'.
+
+    Returns:
+        pd.DataFrame: One column of Close prices per ticker.
+    """
+    mark_cache_miss()
+    return market.load_prices(tuple(tickers), days, interval)
+
+@traced("get_market_data", cached=True)
+@st.cache_data(ttl=300)
+def get_market_data(asset1_ticker, asset2_ticker, spread_formula, days=365, rolling_window=90, hedge_mode="formula",
+                    interval="1d"):
     """
     Fetches and processes market data for a pair of assets.
 
@@ -13,58 +39,51 @@ def get_market_data(asset1_ticker, asset2_ticker, spread_formula, days=365, roll
         asset2_ticker (str): The ticker for the second asset.
         spread_formula (str): The formula to calculate the spread.
         days (int): The number of days of historical data to fetch.
-        rolling_window (int): The rolling window for Z-score calculation.
+        rolling_window (int | str): The rolling window for Z-score calculation,
+            in bars or as a span such as '4h' or '20d'.
+        hedge_mode (str): 'formula' uses ``spread_formula``; 'rolling_ols' or
+            'kalman' estimate the hedge ratio dynamically (see hedge.py).
+        interval (str): Bar interval: '1m', '5m', '1h' or '1d'.
 
     Returns:
         pd.DataFrame: A DataFrame with market data and Z-score calculations.
     """
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=days)
-    
-    tickers = f"{asset1_ticker} {asset2_ticker}"
+    mark_cache_miss()
     try:
-        data = yf.download(tickers, start=start_date, end=end_date, progress=False)['Close']
+        # Prices are cached per ticker set only, so editing the formula or the
+        # rolling window recomputes the Z-score without touching the network.
+        data = load_prices((asset1_ticker, asset2_ticker), days, interval)
         if data.empty:
             return pd.DataFrame()
     except Exception as e:
         return pd.DataFrame()
 
-    # Clean Data
-    df = data.copy()
-    
-    # Rename columns for clarity
-    df.rename(columns={asset1_ticker: "asset1", asset2_ticker: "asset2"}, inplace=True)
-        
-    df = df.dropna()
-
-    if 'asset1' not in df.columns or 'asset2' not in df.columns:
+    try:
+        df = market.pair_prices(data, asset1_ticker, asset2_ticker, interval)
+    except KeyError:
         st.error("The downloaded data does not contain the expected asset columns.")
         return pd.DataFrame()
-    
+
     # Calculate Spread & Z-Score
-    df = calculate_z_score(df, spread_formula, window=rolling_window)
-    
-    return df
+    return calculate_z_score(df, spread_formula, window=rolling_window, hedge_mode=hedge_mode)
 
-def calculate_z_score(df: pd.DataFrame, spread_formula: str, window: int) -> pd.DataFrame:
+@traced("get_cointegration", cached=True)
+@st.cache_data(ttl=300)
+def get_cointegration(asset1_ticker, asset2_ticker, days=365):
     """
-    Calculates the spread and Z-score for a pair of assets.
+    Engle-Granger test of a pair, used to suggest a data-driven hedge ratio.
 
     Args:
-        df (pd.DataFrame): DataFrame containing asset prices.
-        spread_formula (str): The formula to calculate the spread.
-        window (int): The rolling window period for mean and standard deviation calculation.
+        asset1_ticker (str): The ticker for the first asset.
+        asset2_ticker (str): The ticker for the second asset.
+        days (int): The number of days of historical data to use.
 
     Returns:
-        pd.DataFrame: The DataFrame with 'Spread', 'Mean', 'Std', and 'Z_Score' columns added.
+        dict | None: ``hedge_ratio``, ``adf_stat``, ``critical_value``,
+        ``cointegrated`` and ``half_life``, or None when there is no data.
     """
-    # This is a security risk, but we accept it for flexibility.
-    # The user is providing the formula.
-    df['Spread'] = eval(spread_formula, {'asset1': df['asset1'], 'asset2': df['asset2']})
-    
-    # Rolling Statistics
-    df['Mean'] = df['Spread'].rolling(window=window).mean()
-    df['Std'] = df['Spread'].rolling(window=window).std()
-    df['Z_Score'] = (df['Spread'] - df['Mean']) / df['Std']
-    
-    return df
+    mark_cache_miss()
+    try:
+        return market.get_cointegration(asset1_ticker, asset2_ticker, days)
+    except Exception:
+        return None
@@ -0,0 +1,216 @@
+import ast
+import operator
+from functools import lru_cache
+
+import numpy as np
+
+# Names a spread formula may reference. Anything else is rejected at compile time.
+ALLOWED_NAMES = ("asset1", "asset2")
+
+# Element-wise functions callable from a formula, e.g. "log(asset1) - log(asset2)".
+ALLOWED_FUNCTIONS = {
+    "abs": np.abs,
+    "log": np.log,
+    "exp": np.exp,
+    "sqrt": np.sqrt,
+}
+
+_BINARY_UFUNCS = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.Pow: np.power,
+}
+
+_UNARY_UFUNCS = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+}
+
+_SCALAR_BINARY = {
+    ast.Add: operator.add,
+    ast.Sub: operator.sub,
+    ast.Mult: operator.mul,
+    ast.Div: operator.truediv,
+    ast.Pow: operator.pow,
+}
+
+
+class FormulaError(ValueError):
+    """Raised when a spread formula is malformed or uses a disallowed construct."""
+
+
+class CompiledFormula:
+    """
+    A spread formula parsed once into a whitelisted AST.
+
+    Calling the object evaluates the formula on raw NumPy arrays. Intermediate
+    results are written in place (``out=``) so a formula like
+    ``(asset2 * 100) - asset1`` allocates a single output array instead of one
+    temporary per operator.
+    """
+
+    def __init__(self, source: str, evaluator):
+        self.source = source
+        self._evaluator = evaluator
+
+    def __call__(self, asset1, asset2) -> np.ndarray:
+        """
+        Evaluates the formula.
+
+        Args:
+            asset1: Prices of the first asset (array-like, any shape).
+            asset2: Prices of the second asset, broadcastable against asset1.
+
+        Returns:
+            np.ndarray: The spread as a float64 array.
+        """
+        env = {
+            "asset1": np.asarray(asset1, dtype=np.float64),
+            "asset2": np.asarray(asset2, dtype=np.float64),
+        }
+        value, _ = self._evaluator(env)
+        if np.ndim(value) == 0:
+            # Constant formula: broadcast to the input shape.
+            return np.full(np.broadcast(env["asset1"], env["asset2"]).shape, value, dtype=np.float64)
+        return value
+
+    def __repr__(self):
+        return f"CompiledFormula({self.source!r})"
+
+
+def _compile_node(node):
+    """
+    Turns an AST node into an evaluator ``env -> (value, owned)``.
+
+    ``owned`` is True when ``value`` is a temporary array created by the
+    evaluator itself, which means the parent operation may overwrite it.
+    Constant sub-expressions are folded at compile time.
+    """
+    if isinstance(node, ast.Expression):
+        return _compile_node(node.body)
+
+    if isinstance(node, ast.Constant):
+        if isinstance(node.value, bool) or not isinstance(node.value, (int, float)):
+            raise FormulaError(f"Unsupported constant: {node.value!r}")
+        return _constant(node.value)
+
+    if isinstance(node, ast.Name):
+        if node.id not in ALLOWED_NAMES:
+            raise FormulaError(f"Unknown name '{node.id}'. Use only {', '.join(ALLOWED_NAMES)}.")
+        name = node.id
+        return lambda env: (env[name], False)
+
+    if isinstance(node, ast.UnaryOp):
+        op_type = type(node.op)
+        if op_type not in _UNARY_UFUNCS:
+            raise FormulaError(f"Unsupported operator: {op_type.__name__}")
+        operand = _compile_node(node.operand)
+        if getattr(operand, "constant", None) is not None:
+            return _constant(-operand.constant if op_type is ast.USub else operand.constant)
+        ufunc = _UNARY_UFUNCS[op_type]
+
+        def unary(env):
+            value, owned = operand(env)
+            return ufunc(value, out=value if _reusable(value, owned) else None), True
+        return unary
+
+    if isinstance(node, ast.BinOp):
+        op_type = type(node.op)
+        if op_type not in _BINARY_UFUNCS:
+            raise FormulaError(f"Unsupported operator: {op_type.__name__}")
+        left = _compile_node(node.left)
+        right = _compile_node(node.right)
+        left_const = getattr(left, "constant", None)
+        right_const = getattr(right, "constant", None)
+        if left_const is not None and right_const is not None:
+            try:
+                value = _SCALAR_BINARY[op_type](left_const, right_const)
+            except (ZeroDivisionError, OverflowError) as e:
+                raise FormulaError(f"Invalid constant expression: {e}") from e
+            return _constant(value)
+        ufunc = _BINARY_UFUNCS[op_type]
+
+        def binary(env):
+            lval, lowned = left(env)
+            rval, rowned = right(env)
+            out = None
+            if _reusable(lval, lowned) and lval.shape == np.broadcast(lval, rval).shape:
+                out = lval
+            elif _reusable(rval, rowned) and rval.shape == np.broadcast(lval, rval).shape:
+                out = rval
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                return ufunc(lval, rval, out=out), True
+        return binary
+
+    if isinstance(node, ast.Call):
+        if not isinstance(node.func, ast.Name) or node.func.id not in ALLOWED_FUNCTIONS:
+            raise FormulaError(f"Unsupported function call. Allowed: {', '.join(ALLOWED_FUNCTIONS)}.")
+        if len(node.args) != 1 or node.keywords:
+            raise FormulaError(f"{node.func.id}() takes exactly one argument.")
+        ufunc = ALLOWED_FUNCTIONS[node.func.id]
+        arg = _compile_node(node.args[0])
+        if getattr(arg, "constant", None) is not None:
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                return _constant(ufunc(arg.constant))
+
+        def call(env):
+            value, owned = arg(env)
+            with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+                return ufunc(value, out=value if _reusable(value, owned) else None), True
+        return call
+
+    raise FormulaError(f"Unsupported syntax: {type(node).__name__}")
+
+
+def _reusable(value, owned: bool) -> bool:
+    # Scalar inputs make ufuncs return NumPy scalars, which cannot be written to.
+    return owned and isinstance(value, np.ndarray) and value.ndim > 0
+
+
+def _constant(value):
+    """
+    Evaluator of a folded constant.
+
+    Raises:
+        FormulaError: If the value is complex (e.g. ``(-8) ** 0.5``) or not
+            finite (e.g. ``log(0)``, ``1e308 * 10``).
+    """
+    if isinstance(value, complex) or np.iscomplexobj(value):
+        raise FormulaError(f"Invalid constant expression: complex result {value}")
+    try:
+        value = float(value)
+    except OverflowError as e:
+        raise FormulaError(f"Invalid constant expression: {e}") from e
+    if not np.isfinite(value):
+        raise FormulaError(f"Invalid constant expression: result is {value}")
+
+    def const(env):
+        return value, False
+    const.constant = value
+    return const
+
+
+@lru_cache(maxsize=256)
+def compile_spread_formula(spread_formula: str) -> CompiledFormula:
+    """
+    Parses and validates a spread formula, caching the result by formula string.
+
+    Only numbers, ``asset1``/``asset2``, the operators ``+ - * / **`` and the
+    functions in ``ALLOWED_FUNCTIONS`` are accepted.
+
+    Args:
+        spread_formula (str): The formula, e.g. "(asset2 * 100) - asset1".
+
+    Returns:
+        CompiledFormula: A callable evaluating the formula on NumPy arrays.
+
+    Raises:
+        FormulaError: If the formula cannot be parsed or is not allowed.
+    """
+    try:
+        tree = ast.parse(spread_formula.strip(), mode="eval")
+    except SyntaxError as e:
+        raise FormulaError(f"Invalid spread formula: {e.msg}") from e
+    return CompiledFormula(spread_formula, _compile_node(tree))
@@ -0,0 +1,147 @@
+import numpy as np
+
+# Starting variance of beta and alpha: a diffuse prior, so the first bars
+# (not a made-up (0, 0) guess) determine the hedge ratio.
+DIFFUSE_PRIOR_VAR = 1e6
+
+# Spread modes accepted by ``calculate_z_score`` / ``get_market_data``.
+HEDGE_MODES = ("formula", "rolling_ols", "kalman")
+
+
+def rolling_ols_hedge(asset1: np.ndarray, asset2: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling OLS of ``asset1 = alpha + beta * asset2`` over the last ``window`` bars.
+
+    Every window is solved from cumulative sums of ``x``, ``y``, ``x·x`` and
+    ``x·y``, so the whole series costs O(T) regardless of the window length.
+    The estimate at bar ``t`` only uses bars up to ``t``.
+
+    Args:
+        asset1 (np.ndarray): Prices of asset 1 (dependent leg).
+        asset2 (np.ndarray): Prices of asset 2.
+        window (int): Regression window in bars.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(alpha, beta)``, NaN until the window is full.
+    """
+    y = np.asarray(asset1, dtype=np.float64)
+    x = np.asarray(asset2, dtype=np.float64)
+    # Centering keeps the sums of squares from cancelling catastrophically.
+    mx, my = x.mean(), y.mean()
+    x = x - mx
+    y = y - my
+
+    def window_sum(values):
+        c = np.concatenate(([0.0], np.cumsum(values)))
+        out = np.full(len(values), np.nan)
+        out[window - 1:] = c[window:] - c[:-window]
+        return out
+
+    n = float(window)
+    sx, sy = window_sum(x), window_sum(y)
+    sxx, sxy = window_sum(x * x), window_sum(x * y)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (sxy - sx * sy / n) / (sxx - sx * sx / n)
+    alpha = (sy - beta * sx) / n + my - beta * mx
+    return alpha, beta
+
+
+class KalmanHedge:
+    """
+    Kalman filter on a random-walk hedge ratio: ``asset1 = alpha + beta * asset2 + noise``.
+
+    The state ``(beta, alpha)`` drifts as a random walk with variance
+    ``delta / (1 - delta)`` per bar, so each ``update`` is O(1) and the estimate
+    adapts to a slowly changing relationship.
+
+    Args:
+        delta (float): State drift; larger values track changes faster.
+        observation_var (float): Variance of the measurement noise, in asset 1
+            price units squared.
+        prior_var (float): Starting variance of beta and alpha.
+    """
+
+    def __init__(self, delta: float = 1e-4, observation_var: float = 1e-3, prior_var: float = DIFFUSE_PRIOR_VAR):
+        self.drift = delta / (1.0 - delta)
+        self.observation_var = float(observation_var)
+        self.beta = 0.0
+        self.alpha = 0.0
+        # State covariance [[p_bb, p_ba], [p_ba, p_aa]]. A zero covariance would
+        # pin the state to its (0, 0) start; a large one lets the data decide.
+        self._p = [float(prior_var), 0.0, float(prior_var)]
+        self.count = 0
+
+    def update(self, asset1_price: float, asset2_price: float) -> tuple[float, float]:
+        """
+        Adds one bar and returns the updated ``(alpha, beta)``.
+        """
+        y, x = float(asset1_price), float(asset2_price)
+        p_bb, p_ba, p_aa = self._p
+        p_bb += self.drift
+        p_aa += self.drift
+
+        # Innovation of y against the prediction with observation vector (x, 1).
+        error = y - (self.beta * x + self.alpha)
+        px_b = p_bb * x + p_ba
+        px_a = p_ba * x + p_aa
+        variance = px_b * x + px_a + self.observation_var
+        gain_b, gain_a = px_b / variance, px_a / variance
+
+        self.beta += gain_b * error
+        self.alpha += gain_a * error
+        self._p = [p_bb - gain_b * px_b, p_ba - gain_b * px_a, p_aa - gain_a * px_a]
+        self.count += 1
+        return self.alpha, self.beta
+
+
+def kalman_hedge(asset1: np.ndarray, asset2: np.ndarray, delta: float = 1e-4,
+                 observation_var: float | None = None,
+                 prior_var: float = DIFFUSE_PRIOR_VAR) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Runs ``KalmanHedge`` over a price history.
+
+    Args:
+        asset1 (np.ndarray): Prices of asset 1 (dependent leg).
+        asset2 (np.ndarray): Prices of asset 2.
+        delta (float): State drift of the hedge ratio.
+        observation_var (float, optional): Measurement noise variance. None uses
+            the variance of asset 1's daily changes, which matches its price scale.
+        prior_var (float): Starting variance of beta and alpha.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(alpha, beta)`` after each bar.
+    """
+    y = np.asarray(asset1, dtype=np.float64)
+    x = np.asarray(asset2, dtype=np.float64)
+    if observation_var is None:
+        observation_var = float(np.var(np.diff(y))) if len(y) > 2 else 1e-3
+    observation_var = observation_var or 1e-3
+    kalman = KalmanHedge(delta, observation_var, prior_var)
+    alpha = np.empty(len(y))
+    beta = np.empty(len(y))
+    for t, (p1, p2) in enumerate(zip(y.tolist(), x.tolist())):
+        alpha[t], beta[t] = kalman.update(p1, p2)
+    return alpha, beta
+
+
+def dynamic_spread(asset1: np.ndarray, asset2: np.ndarray, mode: str, window: int) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Spread with a dynamic hedge ratio, in the ``(asset2 * k) - asset1`` orientation.
+
+    Args:
+        asset1 (np.ndarray): Prices of asset 1.
+        asset2 (np.ndarray): Prices of asset 2.
+        mode (str): 'rolling_ols' or 'kalman'.
+        window (int): Regression window for 'rolling_ols'.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(spread, hedge_ratio)``.
+    """
+    if mode == "rolling_ols":
+        alpha, beta = rolling_ols_hedge(asset1, asset2, window)
+    elif mode == "kalman":
+        alpha, beta = kalman_hedge(asset1, asset2)
+    else:
+        raise ValueError(f"Unknown hedge mode {mode!r}; expected one of {HEDGE_MODES}")
+    spread = alpha + beta * np.asarray(asset2, dtype=np.float64) - np.asarray(asset1, dtype=np.float64)
+    return spread, beta
@@ -0,0 +1,333 @@
+import collections
+import json
+import logging
+import math
+import os
+import threading
+import time
+
+import pandas as pd
+
+DEFAULT_JOURNAL_PATH = os.environ.get(
+    "PAIRTRADING_JOURNAL",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "trade_journal.jsonl"),
+)
+
+# Column order of the History_Log worksheet.
+JOURNAL_FIELDS = ['date', 'action_type', 'z_score', 'asset1_action', 'asset2_action', 'note']
+
+# Old and alternative History_Log headers mapped to the journal field names.
+LEGACY_COLUMN_MAP = {
+    'Date': 'date',
+    'Action Type': 'action_type',
+    'Z-Score': 'z_score',
+    'Note': 'note',
+    'Gold Action': 'asset1_action',
+    'Silver Action': 'asset2_action',
+    'asset1_act': 'asset1_action',
+    'asset2_act': 'asset2_action',
+}
+
+# Fields that identify a trade when matching sheet rows against the journal.
+# The Z-Score is left out: the sheet may hand it back rounded to its display format.
+MATCH_FIELDS = [field for field in JOURNAL_FIELDS if field != 'z_score']
+
+logger = logging.getLogger(__name__)
+
+
+def normalize_record(record: dict) -> dict:
+    """Renames legacy History_Log headers to the journal field names."""
+    return {LEGACY_COLUMN_MAP.get(k, k): v for k, v in record.items()}
+
+
+def sheet_cell(value):
+    """A journal value as a worksheet cell: NaN, infinities and None become empty cells."""
+    if value is None or (isinstance(value, float) and not math.isfinite(value)):
+        return ''
+    return value
+
+
+def _match_key(record: dict) -> tuple:
+    return tuple(str(sheet_cell(record.get(field, ''))).strip() for field in MATCH_FIELDS)
+
+
+def _is_rejected(error: Exception) -> bool:
+    """
+    Whether the worksheet refused the rows themselves, as opposed to being
+    unreachable: a value that cannot be serialized, or a 4xx answer other than
+    429 (quota). Only rejections count towards dead-lettering a row.
+    """
+    if isinstance(error, (TypeError, ValueError)):
+        return True
+    status = getattr(getattr(error, "response", None), "status_code", None)
+    return isinstance(status, int) and 400 <= status < 500 and status != 429
+
+
+class TradeJournal:
+    """
+    Append-only local trade log (one JSON object per line).
+
+    This is the source of truth for the History_Log. Reads are incremental:
+    only lines appended since the previous read are parsed. The number of rows
+    already pushed to Google Sheets is kept in a ``.synced`` sidecar file.
+    """
+
+    def __init__(self, path: str = DEFAULT_JOURNAL_PATH):
+        self.path = path
+        self._lock = threading.RLock()
+        self._offset = 0
+        self._rows: list[dict] = []
+        self._frame = pd.DataFrame(columns=JOURNAL_FIELDS)
+        self._frame_rows = 0
+
+    @property
+    def _synced_path(self) -> str:
+        return self.path + ".synced"
+
+    def read_new(self) -> list[dict]:
+        """Parses the lines appended since the last call and returns them."""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return []
+            with open(self.path, "rb") as f:
+                f.seek(self._offset)
+                chunk = f.read()
+            # A line without its newline is still being written; leave it for next time.
+            end = chunk.rfind(b"\n") + 1
+            new_rows = [json.loads(line) for line in chunk[:end].splitlines() if line.strip()]
+            self._offset += end
+            self._rows.extend(new_rows)
+            return new_rows
+
+    def rows(self) -> list[dict]:
+        """Returns every row in the journal."""
+        with self._lock:
+            self.read_new()
+            return list(self._rows)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self.read_new()
+            return len(self._rows)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Returns the journal as a DataFrame, only converting rows that are new."""
+        with self._lock:
+            self.read_new()
+            if self._frame_rows < len(self._rows):
+                new = pd.DataFrame(self._rows[self._frame_rows:])
+                self._frame = new if self._frame_rows == 0 else pd.concat([self._frame, new], ignore_index=True)
+                self._frame_rows = len(self._rows)
+            return self._frame.copy()
+
+    def append(self, record: dict) -> int:
+        """
+        Appends one trade and returns its row number.
+
+        The line is flushed and fsynced before returning, so a saved trade
+        survives a crash even if it has not reached Google Sheets yet.
+        """
+        line = json.dumps(normalize_record(record), ensure_ascii=False, default=str) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+            self.read_new()
+            return len(self._rows) - 1
+
+    def reconcile(self, records: list[dict]) -> int:
+        """
+        Imports the History_Log rows the journal does not have yet, e.g. trades
+        entered on another machine or typed into the sheet by hand. On a new
+        machine (empty journal) this seeds the journal with the whole sheet.
+
+        Sheet rows are matched against the journal by ``MATCH_FIELDS``, counting
+        duplicates, so a trade recorded twice stays twice. Imported rows are
+        appended and marked as synced. Every local row must already be pushed
+        (see ``SheetSyncWorker.reconcile``), otherwise a pending row would be
+        imported back from the sheet once it lands there.
+
+        Args:
+            records (list[dict]): The worksheet rows (``get_all_records``).
+
+        Returns:
+            int: Number of rows imported.
+
+        Raises:
+            RuntimeError: If the journal has rows that are not synced yet.
+        """
+        with self._lock:
+            self.read_new()
+            if self.synced_count() < len(self._rows):
+                raise RuntimeError("Push the pending journal rows before reconciling with the sheet")
+            known = collections.Counter(_match_key(row) for row in self._rows)
+            missing = []
+            for record in map(normalize_record, records):
+                key = _match_key(record)
+                if known[key] > 0:
+                    known[key] -= 1
+                else:
+                    missing.append(record)
+            if missing:
+                with open(self.path, "a", encoding="utf-8") as f:
+                    for record in missing:
+                        f.write(json.dumps(record, ensure_ascii=False, default=str) + "\n")
+                    f.flush()
+                    os.fsync(f.fileno())
+                self.read_new()
+            self.mark_synced(len(self._rows))
+            return len(missing)
+
+    def synced_count(self) -> int:
+        """Returns how many rows have been pushed to Google Sheets."""
+        try:
+            with open(self._synced_path, encoding="utf-8") as f:
+                return int(f.read().strip() or 0)
+        except (OSError, ValueError):
+            return 0
+
+    def mark_synced(self, count: int):
+        tmp = self._synced_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(str(count))
+        os.replace(tmp, self._synced_path)
+
+    def unsynced(self) -> list[dict]:
+        """Returns the rows not yet pushed to Google Sheets."""
+        with self._lock:
+            self.read_new()
+            return self._rows[self.synced_count():]
+
+
+class SheetSyncWorker(threading.Thread):
+    """
+    Background thread mirroring the journal to the History_Log worksheet.
+
+    Pending rows are pushed in batches with ``append_rows``. Failed pushes are
+    retried with exponential backoff; nothing is lost because the journal keeps
+    track of what has been synced. When the sheet rejects a batch, its rows are
+    pushed one by one; a row rejected ``max_attempts`` times is moved to the
+    dead-letter file (``<journal>.deadletter``) so the rows behind it still sync.
+    """
+
+    def __init__(self, journal: TradeJournal, worksheet, batch_size: int = 100,
+                 interval: float = 5.0, max_backoff: float = 300.0, max_attempts: int = 5):
+        """
+        Args:
+            journal (TradeJournal): The local journal to mirror.
+            worksheet: A gspread worksheet (or anything with ``append_rows``).
+            batch_size (int): Maximum rows per ``append_rows`` call.
+            interval (float): Seconds between checks when idle.
+            max_backoff (float): Upper bound for the retry delay, in seconds.
+            max_attempts (int): Rejections of a single row before it is dead-lettered.
+        """
+        super().__init__(name="sheet-sync", daemon=True)
+        self.journal = journal
+        self.worksheet = worksheet
+        self.batch_size = batch_size
+        self.interval = interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max_attempts
+        self.last_error = None
+        self._rejections: dict[int, int] = {}
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+
+    @property
+    def dead_letter_path(self) -> str:
+        return self.journal.path + ".deadletter"
+
+    def notify(self):
+        """Wakes the worker up so a freshly saved trade is pushed right away."""
+        self._wake.set()
+
+    def stop(self, timeout: float | None = None):
+        self._stop_event.set()
+        self._wake.set()
+        self.join(timeout)
+
+    def _push(self, rows: list[dict]):
+        self.worksheet.append_rows([[sheet_cell(row.get(field, '')) for field in JOURNAL_FIELDS] for row in rows])
+
+    def _dead_letter(self, position: int, row: dict, error: Exception):
+        line = json.dumps({"row": position, "record": row, "error": repr(error),
+                           "time": time.strftime("%Y-%m-%dT%H:%M:%S")}, ensure_ascii=False, default=str)
+        with open(self.dead_letter_path, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        logger.warning("History_Log rejected journal row %d %d times, moved to %s: %r",
+                       position, self.max_attempts, self.dead_letter_path, error)
+
+    def sync_once(self) -> int:
+        """
+        Pushes every pending row. Returns the number of rows pushed.
+
+        Raises:
+            Exception: Whatever the worksheet raised; already pushed rows stay synced.
+        """
+        pushed = 0
+        with self.journal._lock:
+            synced = self.journal.synced_count()
+            pending = self.journal.unsynced()
+        for i in range(0, len(pending), self.batch_size):
+            batch = pending[i:i + self.batch_size]
+            try:
+                self._push(batch)
+            except Exception as e:
+                if not _is_rejected(e):
+                    raise
+                # Isolate the rejected row(s): the rest of the batch still goes through
+                for row in batch:
+                    try:
+                        self._push([row])
+                        pushed += 1
+                    except Exception as row_error:
+                        if not _is_rejected(row_error):
+                            raise
+                        attempts = self._rejections.get(synced, 0) + 1
+                        self._rejections[synced] = attempts
+                        if attempts < self.max_attempts:
+                            raise
+                        self._dead_letter(synced, row, row_error)
+                    self._rejections.pop(synced, None)
+                    synced += 1
+                    self.journal.mark_synced(synced)
+                continue
+            synced += len(batch)
+            pushed += len(batch)
+            self.journal.mark_synced(synced)
+        return pushed
+
+    def reconcile(self) -> int:
+        """
+        Pushes the pending rows, then imports the worksheet rows the journal is
+        missing (see ``TradeJournal.reconcile``). Returns the number imported.
+
+        Raises:
+            Exception: Whatever the worksheet raised, other than a row rejection.
+        """
+        with self.journal._lock:
+            while True:
+                try:
+                    self.sync_once()
+                    break
+                except Exception as e:
+                    # Each retry brings the rejected row closer to the dead-letter file
+                    if not _is_rejected(e):
+                        raise
+            return self.journal.reconcile(self.worksheet.get_all_records())
+
+    def run(self):
+        delay = self.interval
+        while not self._stop_event.is_set():
+            try:
+                self.sync_once()
+                self.last_error = None
+                delay = self.interval
+            except Exception as e:
+                self.last_error = e
+                delay = min(max(delay, 1.0) * 2, self.max_backoff)
+            self._wake.wait(delay)
+            self._wake.clear()
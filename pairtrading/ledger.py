@@ -0,0 +1,73 @@
+import numpy as np
+import pandas as pd
+
+# Column names used for the History_Log actions (see load_trade_history).
+ASSET_ACTION_COLUMNS = {'asset1': 'asset1_action', 'asset2': 'asset2_action'}
+
+# "BUY:1.23", "SELL 4.56", " buy : 2 " ... ':' is turned into a space first.
+_ACTION_PATTERN = r'^\s*(?P<act>\S+)\s+(?P<amount>\S+)'
+
+
+def parse_action_quantities(actions: pd.Series) -> pd.Series:
+    """
+    Converts a column of action strings into signed quantities.
+
+    Accepts the same formats as the old row-by-row parser: an action word and
+    an amount separated by ':' or a space, e.g. ``BUY:1.23`` or ``SELL 4.56``.
+    BUY is positive, SELL is negative, anything unparsable counts as 0.
+
+    Args:
+        actions (pd.Series): The raw action values.
+
+    Returns:
+        pd.Series: Signed float quantities, aligned with ``actions``.
+    """
+    text = actions.astype(str)
+    has_separator = text.str.contains(':', regex=False) | text.str.contains(' ', regex=False)
+    parts = text.str.replace(':', ' ', regex=False).str.extract(_ACTION_PATTERN)
+
+    amount = pd.to_numeric(parts['amount'], errors='coerce').to_numpy(dtype=float)
+    act = parts['act'].str.upper().to_numpy()
+    sign = np.select([act == 'BUY', act == 'SELL'], [1.0, -1.0], default=0.0)
+
+    qty = np.where(has_separator.to_numpy() & np.isfinite(amount), sign * amount, 0.0)
+    return pd.Series(qty, index=actions.index)
+
+
+def build_ledger(trade_history_df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Builds a per-row holdings ledger from the History_Log.
+
+    Args:
+        trade_history_df (pd.DataFrame): The trade history with ``asset1_action``
+            and ``asset2_action`` columns. Missing columns count as no trades.
+
+    Returns:
+        pd.DataFrame: ``asset1_qty``/``asset2_qty`` (signed quantity of each row) and
+        ``asset1_position``/``asset2_position`` (cumulative holdings after each row),
+        plus the ``date`` column when the log has one.
+    """
+    ledger = pd.DataFrame(index=trade_history_df.index)
+    if 'date' in trade_history_df.columns:
+        ledger['date'] = trade_history_df['date']
+    for asset, column in ASSET_ACTION_COLUMNS.items():
+        if column in trade_history_df.columns:
+            qty = parse_action_quantities(trade_history_df[column])
+        else:
+            qty = pd.Series(0.0, index=trade_history_df.index)
+        ledger[f'{asset}_qty'] = qty
+        ledger[f'{asset}_position'] = qty.cumsum()
+    return ledger
+
+
+def current_holdings(trade_history_df: pd.DataFrame) -> tuple[float, float]:
+    """
+    Net holdings of both assets after the whole History_Log.
+
+    Returns:
+        tuple[float, float]: ``(asset1, asset2)``; ``(0.0, 0.0)`` for an empty log.
+    """
+    if trade_history_df.empty:
+        return 0.0, 0.0
+    ledger = build_ledger(trade_history_df)
+    return float(ledger['asset1_position'].iloc[-1]), float(ledger['asset2_position'].iloc[-1])
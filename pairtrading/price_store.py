@@ -0,0 +1,361 @@
+import json
+import os
+import threading
+import time
+from datetime import datetime, timedelta
+from urllib.parse import quote
+
+import pandas as pd
+
+from bars import MAX_LOOKBACK, MAX_REQUEST_SPAN, check_interval, float32_precision_ok
+from tracing import span
+
+DEFAULT_STORE_DIR = os.environ.get(
+    "PAIRTRADING_PRICE_DIR",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".price_store"),
+)
+
+# Re-check the tail of a ticker at most this often (seconds).
+DEFAULT_REFRESH_INTERVAL = 300
+
+# Weekends and holidays: a stored series starting this close to the requested
+# start date is considered complete and is not backfilled.
+BACKFILL_SLACK = timedelta(days=5)
+# Intraday series only miss a weekend at their start.
+BACKFILL_SLACK_INTRADAY = timedelta(days=3)
+
+STORAGE_DTYPES = ("float64", "float32")
+
+# yf.download keeps per-call state in module globals, so concurrent calls from
+# different threads would mix their results. Every Yahoo download in the
+# process is therefore serial; only the merging and disk work can overlap.
+_YFINANCE_LOCK = threading.Lock()
+
+
+def yfinance_downloader(tickers: list[str], start, end, interval: str = "1d") -> pd.DataFrame:
+    """
+    Downloads closes from Yahoo Finance.
+
+    Ranges longer than Yahoo allows per request for ``interval`` (7 days of
+    1m bars) are split into several requests.
+
+    Returns:
+        pd.DataFrame: One column of Close prices per ticker, indexed by bar time.
+    """
+    import yfinance as yf
+
+    if interval != "1d":
+        # The store passes intraday ranges as UTC-naive; yfinance would read a
+        # naive time in the exchange's zone.
+        start, end = (pd.Timestamp(t).tz_localize("UTC") if pd.Timestamp(t).tz is None else pd.Timestamp(t)
+                      for t in (start, end))
+    step = MAX_REQUEST_SPAN.get(interval)
+    chunks = [(start, end)]
+    if step is not None:
+        edges = list(pd.date_range(pd.Timestamp(start), pd.Timestamp(end), freq=step)) + [pd.Timestamp(end)]
+        chunks = [(a, b) for a, b in zip(edges[:-1], edges[1:]) if a < b]
+
+    frames = []
+    for chunk_start, chunk_end in chunks:
+        with _YFINANCE_LOCK, span("yf.download", tickers=len(tickers), interval=interval):
+            data = yf.download(" ".join(tickers), start=chunk_start, end=chunk_end, interval=interval, progress=False)
+        if data is None or data.empty:
+            continue
+        close = data['Close']
+        if isinstance(close, pd.Series):
+            close = close.to_frame(name=tickers[0])
+        frames.append(close)
+    if not frames:
+        return pd.DataFrame(columns=tickers)
+    return pd.concat(frames) if len(frames) > 1 else frames[0]
+
+
+class PriceStore:
+    """
+    On-disk per-ticker store of closes (one Parquet file per ticker), for one
+    bar interval.
+
+    The first request for a ticker downloads the requested range. After that
+    only the missing tail (and, if a longer window is asked for, the missing
+    head) is downloaded and merged, and any ``days`` window is served from the
+    local copy. Intraday bars older than Yahoo's lookback limit (see
+    ``bars.MAX_LOOKBACK``) stay available locally once they were fetched.
+    """
+
+    def __init__(self, root: str = DEFAULT_STORE_DIR, downloader=yfinance_downloader,
+                 refresh_interval: float = DEFAULT_REFRESH_INTERVAL, clock=time.time,
+                 interval: str = "1d", dtype: str = "float64", precision_check: bool = False):
+        """
+        Args:
+            root (str): Folder holding the Parquet files.
+            downloader: Callable ``(tickers, start, end) -> DataFrame`` of closes;
+                intraday stores also pass ``interval=``. Tests pass a fake here so
+                nothing touches the network.
+            refresh_interval (float): Minimum seconds between tail refreshes of a ticker.
+            clock: Time source, in seconds.
+            interval (str): Bar interval ('1m', '5m', '1h' or '1d').
+            dtype (str): Storage precision. 'float32' halves memory and disk for
+                long minute histories; computations still run in float64.
+            precision_check (bool): With 'float32', keep a ticker in float64 when
+                its prices do not survive the round trip (``bars.float32_precision_ok``).
+        """
+        if dtype not in STORAGE_DTYPES:
+            raise ValueError(f"Unknown storage dtype {dtype!r}; expected one of {STORAGE_DTYPES}")
+        self.root = root
+        self.downloader = downloader
+        self.refresh_interval = refresh_interval
+        self.clock = clock
+        self.interval = check_interval(interval)
+        self.dtype = dtype
+        self.precision_check = precision_check
+        self._frames: dict[str, pd.Series] = {}
+        self._index = None
+        self._lock = threading.RLock()
+        # Tickers some thread is downloading right now, with the event it sets when done.
+        self._inflight: dict[str, threading.Event] = {}
+        os.makedirs(self.root, exist_ok=True)
+
+    # --- storage -------------------------------------------------------
+
+    def _path(self, ticker: str) -> str:
+        return os.path.join(self.root, quote(ticker, safe="") + ".parquet")
+
+    @property
+    def _index_path(self) -> str:
+        return os.path.join(self.root, "_index.json")
+
+    def _meta(self, ticker: str) -> dict:
+        if self._index is None:
+            try:
+                with open(self._index_path, encoding="utf-8") as f:
+                    self._index = json.load(f)
+            except (OSError, ValueError):
+                self._index = {}
+        return self._index.setdefault(ticker, {})
+
+    def _save_index(self):
+        tmp = self._index_path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(self._index, f)
+        os.replace(tmp, self._index_path)
+
+    def load(self, ticker: str) -> pd.Series:
+        """Returns every stored close for ``ticker`` (empty if never fetched)."""
+        if ticker not in self._frames:
+            path = self._path(ticker)
+            if os.path.exists(path):
+                series = pd.read_parquet(path)['Close']
+            else:
+                series = pd.Series(dtype="float64", index=pd.DatetimeIndex([]))
+            series.name = ticker
+            self._frames[ticker] = series
+        return self._frames[ticker]
+
+    def _storage_dtype(self, ticker: str, series: pd.Series) -> str:
+        if self.dtype == "float32" and self.precision_check and not float32_precision_ok(series):
+            self._meta(ticker)["dtype"] = "float64"
+        return self._meta(ticker).get("dtype", self.dtype)
+
+    def _write(self, ticker: str, series: pd.Series):
+        series = series.rename(ticker).astype(self._storage_dtype(ticker, series))
+        tmp = self._path(ticker) + ".tmp"
+        series.to_frame('Close').to_parquet(tmp)
+        os.replace(tmp, self._path(ticker))
+        self._frames[ticker] = series
+
+    def _normalize(self, series: pd.Series) -> pd.Series:
+        series = pd.to_numeric(series, errors='coerce').dropna().astype("float64")
+        index = pd.DatetimeIndex(series.index)
+        if index.tz is not None:
+            index = index.tz_convert("UTC").tz_localize(None)
+        # Daily bars are keyed by date; intraday bars keep their UTC bar time.
+        series.index = index.normalize() if self.interval == "1d" else index
+        return series[~series.index.duplicated(keep='last')].sort_index()
+
+    def merge(self, ticker: str, new: pd.Series) -> pd.Series:
+        """Merges freshly downloaded closes into the stored series and persists it."""
+        new = self._normalize(new)
+        old = self.load(ticker)
+        if new.empty:
+            return old
+        merged = pd.concat([old.astype("float64"), new]) if not old.empty else new
+        # Newer downloads win: the last bar of the old copy may have been intraday.
+        merged = merged[~merged.index.duplicated(keep='last')].sort_index()
+        self._write(ticker, merged)
+        return self._frames[ticker]
+
+    # --- fetching ------------------------------------------------------
+
+    def now(self) -> datetime:
+        """
+        Default end of a window, on the clock the bars are stored in: local
+        time for daily dates, UTC for intraday bars (see ``_normalize``).
+        """
+        if self.interval == "1d":
+            return datetime.now()
+        return pd.Timestamp.now(tz="UTC").tz_localize(None).to_pydatetime()
+
+    def _download(self, tickers: list[str], start, end) -> pd.DataFrame:
+        if self.interval == "1d":
+            data = self.downloader(list(tickers), start, end)
+        else:
+            data = self.downloader(list(tickers), start, end, interval=self.interval)
+        if isinstance(data, pd.Series):
+            data = data.to_frame(name=tickers[0])
+        return data
+
+    def _missing_ranges(self, ticker: str, start: datetime, end: datetime) -> list[tuple]:
+        """Works out which date ranges of ``ticker`` still need downloading."""
+        stored = self.load(ticker)
+        meta = self._meta(ticker)
+        if stored.empty:
+            return [(start, end)]
+
+        ranges = []
+        first, last = stored.index[0], stored.index[-1]
+        covered_from = pd.Timestamp(meta.get("covered_from", first))
+        slack = BACKFILL_SLACK if self.interval == "1d" else BACKFILL_SLACK_INTRADAY
+        if start < covered_from - slack:
+            ranges.append((start, first.to_pydatetime()))
+
+        checked_at = meta.get("checked_at", 0)
+        if self.clock() - checked_at >= self.refresh_interval:
+            # Re-download the last stored bar too, in case it was still forming.
+            ranges.append((last.to_pydatetime(), end))
+        return ranges
+
+    def refresh(self, tickers: list[str], days: int, end: datetime | None = None):
+        """
+        Downloads only the parts of ``[end - days, end]`` not already stored.
+
+        Tickers missing the same range are fetched together, one downloader
+        call per distinct range, so a session that needs the same tail of GC=F,
+        SI=F and HG=F costs one request instead of three, while a new ticker's
+        full window is not re-downloaded for tickers that only miss a tail.
+
+        A ticker another thread is already downloading is not requested twice:
+        the call waits for that download and then re-checks what is missing.
+        """
+        end = end or self.now()
+        start = end - timedelta(days=days)
+        if self.interval in MAX_LOOKBACK:
+            # Yahoo has nothing older; asking again would never complete the head.
+            start = max(start, end - MAX_LOOKBACK[self.interval].to_pytimedelta())
+        waiting = list(dict.fromkeys(tickers))
+        while waiting:
+            with self._lock:
+                busy = {t: self._inflight[t] for t in waiting if t in self._inflight}
+                groups: dict[tuple, list[str]] = {}
+                for ticker in waiting:
+                    if ticker not in busy:
+                        for missing in self._missing_ranges(ticker, start, end):
+                            groups.setdefault(missing, []).append(ticker)
+                claimed = list(dict.fromkeys(t for group in groups.values() for t in group))
+                done = threading.Event()
+                for ticker in claimed:
+                    self._inflight[ticker] = done
+            try:
+                self._fetch(groups, start, end)
+            finally:
+                with self._lock:
+                    for ticker in claimed:
+                        del self._inflight[ticker]
+                done.set()
+            for event in set(busy.values()):
+                event.wait()
+            waiting = list(busy)
+
+    def _fetch(self, groups: dict[tuple, list[str]], start: datetime, end: datetime):
+        # The downloads run outside the lock so refreshes of different tickers
+        # (e.g. from the background scheduler) can overlap; merging is idempotent.
+        # Each group is merged as soon as it arrives, so a failing download
+        # does not throw away the groups fetched before it.
+        for (range_start, range_end), group in groups.items():
+            # yfinance treats ``end`` as exclusive.
+            data = self._download(group, range_start, range_end + timedelta(days=1))
+            with self._lock:
+                for ticker in group:
+                    if ticker in data.columns:
+                        self.merge(ticker, data[ticker])
+                    meta = self._meta(ticker)
+                    if range_start <= start:
+                        covered_from = min(pd.Timestamp(meta.get("covered_from", start)), pd.Timestamp(start))
+                        meta["covered_from"] = covered_from.isoformat()
+                    if range_end >= end:
+                        meta["checked_at"] = self.clock()
+                self._save_index()
+
+    def get_closes(self, tickers: list[str], days: int = 365, end: datetime | None = None) -> pd.DataFrame:
+        """
+        Returns the closes of several tickers for the last ``days`` days.
+
+        Args:
+            tickers (list[str]): The ticker symbols. Duplicates are fetched once.
+            days (int): The number of days of history.
+            end (datetime, optional): End of the window (UTC-naive for intraday
+                stores). Defaults to ``now()``.
+
+        Returns:
+            pd.DataFrame: One column per ticker, outer-joined on bar time
+            (see ``bars.align_closes`` to line intraday legs up).
+        """
+        end = end or self.now()
+        tickers = list(dict.fromkeys(tickers))
+        self.refresh(tickers, days, end)
+        start = pd.Timestamp(end - timedelta(days=days))
+        if self.interval == "1d":
+            start = start.normalize()
+        return pd.concat([self.load(t).loc[start:pd.Timestamp(end)] for t in tickers], axis=1)
+
+    def get_close(self, ticker: str, days: int = 365, end: datetime | None = None) -> pd.Series:
+        """
+        Returns the closes of ``ticker`` for the last ``days`` days.
+
+        Args:
+            ticker (str): The ticker symbol.
+            days (int): The number of days of history.
+            end (datetime, optional): End of the window (UTC-naive for intraday
+                stores). Defaults to ``now()``.
+
+        Returns:
+            pd.Series: Closes indexed by date, named after the ticker.
+        """
+        return self.get_closes([ticker], days, end)[ticker]
+
+    def for_interval(self, interval: str) -> "PriceStore":
+        """
+        The store of ``interval`` bars that goes with this daily store: same
+        downloader, clock and refresh interval, in a subfolder of ``root``
+        (e.g. ``.price_store/5m``).
+        """
+        check_interval(interval)
+        if interval == self.interval:
+            return self
+        base = self.root if self.interval == "1d" else os.path.dirname(self.root)
+        if interval == "1d":
+            return PriceStore(base, self.downloader, self.refresh_interval, self.clock)
+        return PriceStore(os.path.join(base, interval), self.downloader, self.refresh_interval, self.clock,
+                          interval=interval, dtype=DEFAULT_INTRADAY_DTYPE, precision_check=True)
+
+
+# Minute bars are stored as float32 unless a ticker fails the precision check.
+DEFAULT_INTRADAY_DTYPE = os.environ.get("PAIRTRADING_INTRADAY_DTYPE", "float32")
+
+_default_stores: dict[str, PriceStore] = {}
+_stores_lock = threading.Lock()
+
+
+def get_price_store(interval: str = "1d") -> PriceStore:
+    """
+    Returns the process-wide store of ``interval`` bars.
+
+    Daily closes live in ``DEFAULT_STORE_DIR`` and each intraday interval in a
+    subfolder of it (e.g. ``.price_store/5m``).
+    """
+    check_interval(interval)
+    with _stores_lock:
+        if "1d" not in _default_stores:
+            _default_stores["1d"] = PriceStore()
+        if interval not in _default_stores:
+            _default_stores[interval] = _default_stores["1d"].for_interval(interval)
+        return _default_stores[interval]
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+from formula import compile_spread_formula
+
+# Scale-free default: the log price ratio works for any pair of tickers.
+DEFAULT_SCREEN_FORMULA = "log(asset1) - log(asset2)"
+
+
+def pair_indices(n_tickers: int) -> tuple[np.ndarray, np.ndarray]:
+    """Returns the (asset1, asset2) column indices of all N·(N−1)/2 pairs."""
+    return np.triu_indices(n_tickers, k=1)
+
+
+def latest_z_scores(spreads: np.ndarray, window: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Z-score of the last row of each spread column against its trailing window.
+
+    This is the last row of ``calculate_z_score`` (rolling mean and sample
+    standard deviation over ``window`` rows), computed for every column at once.
+
+    Args:
+        spreads (np.ndarray): A (T, M) array of spreads, one column per pair.
+        window (int): The rolling window period.
+
+    Returns:
+        tuple: ``(z_score, mean, std)`` arrays of length M. Columns with fewer than
+        ``window`` rows or with missing values inside the window are NaN.
+    """
+    tail = spreads[-window:]
+    if tail.shape[0] < window:
+        nan = np.full(spreads.shape[1], np.nan)
+        return nan, nan, nan.copy()
+    mean = tail.mean(axis=0)
+    std = tail.std(axis=0, ddof=1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z_score = (tail[-1] - mean) / std
+    return z_score, mean, std
+
+
+def screen_block(prices: np.ndarray, i_idx: np.ndarray, j_idx: np.ndarray,
+                 spread_formula: str, window: int) -> np.ndarray:
+    """
+    Computes spread statistics for one block of pairs.
+
+    Args:
+        prices (np.ndarray): A (T, N) price matrix, columns aligned with the universe.
+        i_idx (np.ndarray): Column indices used as ``asset1``.
+        j_idx (np.ndarray): Column indices used as ``asset2``.
+        spread_formula (str): Formula in terms of ``asset1`` and ``asset2``.
+        window (int): The rolling window period.
+
+    Returns:
+        np.ndarray: A (len(i_idx), 4) array of ``spread, mean, std, z_score``.
+    """
+    tail = prices[-window:]
+    # (window, pairs) matrices: every pair's spread evaluated in one pass.
+    spreads = compile_spread_formula(spread_formula)(tail[:, i_idx], tail[:, j_idx])
+    z_score, mean, std = latest_z_scores(spreads, window)
+    last = spreads[-1] if len(spreads) else np.full(len(i_idx), np.nan)
+    return np.column_stack([last, mean, std, z_score])
+
+
+def rank_pairs(tickers, i_idx: np.ndarray, j_idx: np.ndarray, stats: np.ndarray,
+               top: int | None = None) -> pd.DataFrame:
+    """Turns per-pair statistics into a table sorted by |Z-score|, most stretched first."""
+    tickers = np.asarray(tickers, dtype=object)
+    table = pd.DataFrame({
+        'asset1': tickers[i_idx],
+        'asset2': tickers[j_idx],
+        'Spread': stats[:, 0],
+        'Mean': stats[:, 1],
+        'Std': stats[:, 2],
+        'Z_Score': stats[:, 3],
+    })
+    table['Abs_Z'] = table['Z_Score'].abs()
+    table = table[np.isfinite(table['Abs_Z'])]
+    table = table.sort_values('Abs_Z', ascending=False, kind='stable').reset_index(drop=True)
+    return table.head(top) if top else table
+
+
+def screen_pairs(prices: pd.DataFrame, spread_formula: str = DEFAULT_SCREEN_FORMULA, window: int = 90,
+                 top: int | None = 20, block_size: int = 50_000) -> pd.DataFrame:
+    """
+    Ranks every pair of a ticker universe by how stretched its spread is.
+
+    Args:
+        prices (pd.DataFrame): Close prices, one column per ticker, rows aligned
+            in time (e.g. the columns of ``tradingview_data.csv``).
+        spread_formula (str): Formula in terms of ``asset1`` and ``asset2``.
+        window (int): The rolling window period, in rows.
+        top (int, optional): Number of pairs to return. None returns all of them.
+        block_size (int): Pairs evaluated per NumPy pass, to bound memory.
+
+    Returns:
+        pd.DataFrame: ``asset1, asset2, Spread, Mean, Std, Z_Score, Abs_Z``, sorted
+        by ``Abs_Z``. Pairs with missing data in the window are left out.
+    """
+    values = prices.to_numpy(dtype=np.float64)
+    i_idx, j_idx = pair_indices(values.shape[1])
+    stats = np.empty((len(i_idx), 4))
+    for start in range(0, len(i_idx), block_size):
+        block = slice(start, start + block_size)
+        stats[block] = screen_block(values, i_idx[block], j_idx[block], spread_formula, window)
+    return rank_pairs(prices.columns, i_idx, j_idx, stats, top)
+
+
+# --- multi-process screening ------------------------------------------------
+
+def _screen_shared_block(shm_name: str, shape: tuple, i_idx: np.ndarray, j_idx: np.ndarray,
+                         spread_formula: str, window: int) -> np.ndarray:
+    """Worker entry point: attaches to the shared price matrix and scores one block."""
+    from multiprocessing import shared_memory
+
+    shm = shared_memory.SharedMemory(name=shm_name)
+    try:
+        # The result is a fresh array, so no view of the shared buffer outlives close().
+        return screen_block(np.ndarray(shape, dtype=np.float64, buffer=shm.buf),
+                            i_idx, j_idx, spread_formula, window)
+    finally:
+        shm.close()
+
+
+def screen_pairs_parallel(prices: pd.DataFrame, spread_formula: str = DEFAULT_SCREEN_FORMULA, window: int = 90,
+                          top: int | None = 20, max_workers: int | None = None,
+                          block_size: int = 20_000) -> pd.DataFrame:
+    """
+    Same result as ``screen_pairs``, with pair blocks spread over a process pool.
+
+    Only the trailing ``window`` rows are needed, so just that slice of the
+    price matrix is copied into ``multiprocessing.shared_memory``; workers map
+    it directly instead of receiving a pickled copy per task.
+
+    Args:
+        prices (pd.DataFrame): Close prices, one column per ticker.
+        spread_formula (str): Formula in terms of ``asset1`` and ``asset2``.
+        window (int): The rolling window period, in rows.
+        top (int, optional): Number of pairs to return. None returns all of them.
+        max_workers (int, optional): Worker processes. Defaults to the CPU count.
+        block_size (int): Pairs per task.
+
+    Returns:
+        pd.DataFrame: Same columns and ordering as ``screen_pairs``.
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from multiprocessing import shared_memory
+
+    values = np.ascontiguousarray(prices.to_numpy(dtype=np.float64)[-window:])
+    i_idx, j_idx = pair_indices(values.shape[1])
+    stats = np.empty((len(i_idx), 4))
+
+    shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+    try:
+        shared = np.ndarray(values.shape, dtype=np.float64, buffer=shm.buf)
+        shared[:] = values
+        with ProcessPoolExecutor(max_workers=max_workers) as pool:
+            futures = {}
+            for start in range(0, len(i_idx), block_size):
+                block = slice(start, start + block_size)
+                future = pool.submit(_screen_shared_block, shm.name, values.shape,
+                                     i_idx[block], j_idx[block], spread_formula, window)
+                futures[future] = block
+            for future, block in futures.items():
+                stats[block] = future.result()
+        del shared
+    finally:
+        shm.close()
+        shm.unlink()
+    return rank_pairs(prices.columns, i_idx, j_idx, stats, top)
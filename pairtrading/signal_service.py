@@ -0,0 +1,138 @@
+"""
+Headless signal service: latest price, Z-score and rebalance orders as JSON.
+
+Runs the same pipeline as the app's Dashboard & Action tab through the
+Streamlit-free ``core`` package, so it starts quickly in cron jobs and workers.
+
+Run from the pairtrading folder:
+    python signal_service.py GC=F:SI=F BTC-USD:ETH-USD --cash 1000
+    python signal_service.py --serve --port 8765
+
+HTTP:
+    GET  /signals?pair=GC=F:SI=F&pair=...&rolling_window=60   (settings apply to every pair)
+    GET  /signals?pair=GC=F:SI=F&interval=5m&days=30&rolling_window=4h
+    POST /signals   {"pairs": [{"asset1": "GC=F", "asset2": "SI=F", "qty_asset1": 1.5}, ...]}
+    GET  /health
+"""
+import argparse
+import json
+import sys
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from bars import INTERVALS, parse_window
+from core.signals import DEFAULT_PAIR, pair_signals
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+
+
+def parse_pair(text: str) -> dict:
+    """'GC=F:SI=F' -> {'asset1': 'GC=F', 'asset2': 'SI=F'}."""
+    asset1, sep, asset2 = text.partition(":")
+    if not sep or not asset1 or not asset2:
+        raise ValueError(f"Pair must look like ASSET1:ASSET2, got {text!r}")
+    return {"asset1": asset1.strip(), "asset2": asset2.strip()}
+
+
+def _coerce(name: str, value: str):
+    """Converts a query-string setting to the type of its ``DEFAULT_PAIR`` value."""
+    if name == "rolling_window":
+        # Bars ("90") or a time span ("4h"); rejected here rather than per pair.
+        parse_window(value)
+        return int(value) if value.strip().isdigit() else value
+    default = DEFAULT_PAIR[name]
+    return type(default)(float(value)) if isinstance(default, (int, float)) else value
+
+
+class SignalHandler(BaseHTTPRequestHandler):
+    server_version = "PairSignals/1.0"
+
+    def _send(self, status: int, payload) -> None:
+        body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == "/health":
+            return self._send(200, {"status": "ok"})
+        if url.path != "/signals":
+            return self._send(404, {"error": "Not found"})
+        query = parse_qs(url.query)
+        try:
+            settings = {k: _coerce(k, v[-1]) for k, v in query.items() if k in DEFAULT_PAIR}
+            pairs = [{**parse_pair(p), **settings} for p in query.get("pair", [])]
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        if not pairs:
+            return self._send(400, {"error": "Give at least one ?pair=ASSET1:ASSET2"})
+        self._send(200, {"signals": pair_signals(pairs)})
+
+    def do_POST(self):
+        if urlparse(self.path).path != "/signals":
+            return self._send(404, {"error": "Not found"})
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            body = json.loads(self.rfile.read(length) or b"{}")
+            pairs = body.get("pairs") if isinstance(body, dict) else body
+            if not isinstance(pairs, list) or not all(isinstance(p, dict) for p in pairs):
+                raise ValueError("Body must be {\"pairs\": [{...}, ...]}")
+        except ValueError as e:
+            return self._send(400, {"error": str(e)})
+        self._send(200, {"signals": pair_signals(pairs)})
+
+
+def serve(host: str = DEFAULT_HOST, port: int = DEFAULT_PORT) -> None:
+    server = ThreadingHTTPServer((host, port), SignalHandler)
+    print(f"Serving pair signals on http://{host}:{port}/signals", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Latest Z-score signals and rebalance orders as JSON.")
+    parser.add_argument("pairs", nargs="*", help="Pairs as ASSET1:ASSET2")
+    parser.add_argument("--serve", action="store_true", help="Run the HTTP endpoint instead of printing once")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--formula", dest="spread_formula", default=DEFAULT_PAIR["spread_formula"])
+    parser.add_argument("--mode", dest="hedge_mode", default=DEFAULT_PAIR["hedge_mode"],
+                        choices=["formula", "rolling_ols", "kalman"])
+    parser.add_argument("--window", dest="rolling_window", default=DEFAULT_PAIR["rolling_window"],
+                        help="bars (90) or a time span (4h, 20d)")
+    parser.add_argument("--interval", default=DEFAULT_PAIR["interval"], choices=list(INTERVALS))
+    parser.add_argument("--days", type=int, default=DEFAULT_PAIR["days"])
+    parser.add_argument("--high", dest="z_score_high", type=float, default=DEFAULT_PAIR["z_score_high"])
+    parser.add_argument("--low", dest="z_score_low", type=float, default=DEFAULT_PAIR["z_score_low"])
+    parser.add_argument("--qty1", dest="qty_asset1", type=float, default=DEFAULT_PAIR["qty_asset1"])
+    parser.add_argument("--qty2", dest="qty_asset2", type=float, default=DEFAULT_PAIR["qty_asset2"])
+    parser.add_argument("--cash", dest="cash_dca", type=float, default=DEFAULT_PAIR["cash_dca"])
+    parser.add_argument("--target", dest="target_asset1_pct", type=int, default=DEFAULT_PAIR["target_asset1_pct"])
+    args = parser.parse_args(argv)
+
+    if args.serve:
+        serve(args.host, args.port)
+        return 0
+    if not args.pairs:
+        parser.error("give at least one ASSET1:ASSET2 pair, or --serve")
+
+    settings = {k: v for k, v in vars(args).items() if k in DEFAULT_PAIR}
+    try:
+        pairs = [{**parse_pair(p), **settings} for p in args.pairs]
+    except ValueError as e:
+        parser.error(str(e))
+    json.dump({"signals": pair_signals(pairs)}, sys.stdout, ensure_ascii=False, indent=2)
+    print()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
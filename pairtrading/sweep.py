@@ -0,0 +1,154 @@
+import numpy as np
+import pandas as pd
+
+from formula import compile_spread_formula
+
+# Slider ranges of the sidebar's Technical Settings.
+DEFAULT_WINDOWS = np.arange(30, 181)
+DEFAULT_HIGHS = np.round(np.arange(1.0, 3.0001, 0.1), 1)
+DEFAULT_LOWS = np.round(np.arange(-3.0, -0.9999, 0.1), 1)
+
+PERIODS_PER_YEAR = 252
+
+
+def rolling_mean_std_many(values: np.ndarray, windows) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and sample standard deviation for many window lengths at once.
+
+    One cumulative sum of ``x`` and ``x**2`` is shared by every window, so the
+    cost is O(T) for the sums plus O(W·T) for the differences, instead of W
+    separate ``rolling(window)`` passes.
+
+    Args:
+        values (np.ndarray): A 1-D series (e.g. the spread).
+        windows: Window lengths.
+
+    Returns:
+        tuple[np.ndarray, np.ndarray]: ``(mean, std)`` arrays of shape (W, T),
+        NaN where the window is not full yet (like pandas).
+    """
+    x = np.asarray(values, dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    # Centering keeps the sum of squares from cancelling catastrophically.
+    finite = np.isfinite(x)
+    offset = x[finite].mean() if finite.any() else 0.0
+    x = x - offset
+    c1 = np.concatenate(([0.0], np.cumsum(x)))
+    c2 = np.concatenate(([0.0], np.cumsum(x * x)))
+
+    t = np.arange(1, len(x) + 1)
+    start = t[None, :] - windows[:, None]
+    valid = start >= 0
+    start = np.where(valid, start, 0)
+    s1 = c1[t][None, :] - c1[start]
+    s2 = c2[t][None, :] - c2[start]
+    w = windows[:, None].astype(np.float64)
+
+    mean = s1 / w
+    var = np.maximum(s2 - s1 * mean, 0.0) / (w - 1)
+    mean = np.where(valid, mean + offset, np.nan)
+    std = np.where(valid, np.sqrt(var), np.nan)
+    return mean, std
+
+
+def sweep_parameters(df: pd.DataFrame, spread_formula: str, windows=DEFAULT_WINDOWS,
+                     highs=DEFAULT_HIGHS, lows=DEFAULT_LOWS) -> pd.DataFrame:
+    """
+    Evaluates every (rolling_window, high, low) combination of the Z-score rule.
+
+    The signal follows ``get_z_score_advice``: above ``high`` the pair is held
+    long asset1 / short asset2, below ``low`` long asset2 / short asset1, flat
+    otherwise. A position decided on a bar's close earns the next bar's return,
+    with half the capital on each leg. All combinations are scored on the same
+    period (after the longest window has filled) so they are comparable.
+
+    Args:
+        df (pd.DataFrame): Prices with ``asset1`` and ``asset2`` columns.
+        spread_formula (str): The formula to calculate the spread.
+        windows: Rolling window lengths to test.
+        highs: Upper Z-score thresholds to test.
+        lows: Lower Z-score thresholds to test.
+
+    Returns:
+        pd.DataFrame: One row per combination with ``window, high, low, sharpe,
+        max_drawdown, total_return, turnover`` (turnover = position changes per year).
+    """
+    p1 = df['asset1'].to_numpy(dtype=np.float64)
+    p2 = df['asset2'].to_numpy(dtype=np.float64)
+    windows = np.asarray(windows, dtype=np.int64)
+    highs = np.asarray(highs, dtype=np.float64)
+    lows = np.asarray(lows, dtype=np.float64)
+    if len(p1) <= windows.max() + 1:
+        raise ValueError(f"Need more than {windows.max() + 1} rows of data for a {windows.max()}-bar window")
+
+    spread = compile_spread_formula(spread_formula)(p1, p2)
+    mean, std = rolling_mean_std_many(spread, windows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        z = (spread[None, :] - mean) / std
+
+    # Return of (long asset2, short asset1), half the capital on each leg.
+    pair_ret = 0.5 * (p2[1:] / p2[:-1] - p1[1:] / p1[:-1])
+    start = windows.max() - 1
+    z = z[:, start:-1]
+    pair_ret = pair_ret[start:]
+
+    n_bars = pair_ret.shape[0]
+    rows = []
+    for k, window in enumerate(windows):
+        zk = z[k]
+        # Long and short are mutually exclusive (low < 0 < high), so for every
+        # (high, low) the P&L is a_low - b_high with a_low * b_high == 0. Sums,
+        # sums of squares, log growth and position changes are therefore
+        # separable: compute them per threshold and combine by broadcasting.
+        long_on = zk[None, :] < lows[:, None]     # (L, T)
+        short_on = zk[None, :] > highs[:, None]   # (H, T)
+        a = np.where(long_on, pair_ret, 0.0)
+        b = np.where(short_on, pair_ret, 0.0)
+
+        total = a.sum(axis=-1)[None, :] - b.sum(axis=-1)[:, None]                  # (H, L)
+        total_sq = (a * a).sum(axis=-1)[None, :] + (b * b).sum(axis=-1)[:, None]
+        mu = total / n_bars
+        var = np.maximum(total_sq - n_bars * mu * mu, 0.0) / (n_bars - 1)
+        sigma = np.sqrt(var)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            sharpe = np.where(sigma > 0, mu / sigma * np.sqrt(PERIODS_PER_YEAR), 0.0)
+
+        changes = (np.abs(np.diff(long_on, axis=-1, prepend=False)).sum(axis=-1)[None, :]
+                   + np.abs(np.diff(short_on, axis=-1, prepend=False)).sum(axis=-1)[:, None])
+
+        # Drawdown is path dependent: one broadcast pass over log equity.
+        log_a = np.cumsum(np.log1p(a), axis=-1)
+        log_b = np.cumsum(np.log1p(-b), axis=-1)
+        log_equity = log_a[None, :, :] + log_b[:, None, :]                       # (H, L, T)
+        peak = np.maximum(np.maximum.accumulate(log_equity, axis=-1), 0.0)
+        max_drawdown = np.expm1(np.subtract(log_equity, peak, out=peak).min(axis=-1))
+        total_return = np.expm1(log_a[:, -1][None, :] + log_b[:, -1][:, None])
+
+        rows.append(pd.DataFrame({
+            'window': window,
+            'high': np.repeat(highs, len(lows)),
+            'low': np.tile(lows, len(highs)),
+            'sharpe': sharpe.ravel(),
+            'max_drawdown': max_drawdown.ravel(),
+            'total_return': total_return.ravel(),
+            'turnover': (changes * PERIODS_PER_YEAR / n_bars).ravel(),
+        }))
+    return pd.concat(rows, ignore_index=True)
+
+
+def to_heatmap(result: pd.DataFrame, metric: str = 'sharpe', window: int | None = None) -> pd.DataFrame:
+    """
+    Pivots a sweep result into a heatmap-ready grid.
+
+    Args:
+        result (pd.DataFrame): Output of ``sweep_parameters``.
+        metric (str): Column to show.
+        window (int, optional): Fix the window and show high × low. When None,
+            the best value over all thresholds is shown for window × high.
+
+    Returns:
+        pd.DataFrame: The pivoted grid.
+    """
+    if window is not None:
+        return result[result['window'] == window].pivot(index='high', columns='low', values=metric)
+    return result.pivot_table(index='window', columns='high', values=metric, aggfunc='max')
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The app's modules are imported flat (``from hedge import ...``), as when
+# running from the pairtrading folder.
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
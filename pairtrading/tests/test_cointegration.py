@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+
+import cointegration
+from cointegration import engle_granger
+
+
+def make_prices(n_rows=300, n_tickers=4, seed=0):
+    rng = np.random.default_rng(seed)
+    common = rng.normal(0, 1, n_rows).cumsum()
+    data = {f"T{k}": 50 + (k + 1) * common + rng.normal(0, 1, n_rows) for k in range(n_tickers)}
+    return pd.DataFrame(data, index=pd.bdate_range("2023-01-02", periods=n_rows))
+
+
+def test_revised_history_is_not_served_from_the_cache():
+    prices = make_prices()
+    first = engle_granger(prices, pairs=[("T0", "T1")])
+
+    # Same tickers, same last date and row count; one old price revised.
+    revised = prices.copy()
+    revised.iloc[10, 0] += 25.0
+    second = engle_granger(revised, pairs=[("T0", "T1")])
+
+    expected = engle_granger(revised, pairs=[("T0", "T1")], use_cache=False)
+    pd.testing.assert_frame_equal(second, expected)
+    assert second["alpha"].iloc[0] != first["alpha"].iloc[0]
+
+
+def test_cache_keeps_the_most_recently_used_results(monkeypatch):
+    monkeypatch.setattr(cointegration, "_RESULT_CACHE", type(cointegration._RESULT_CACHE)())
+    monkeypatch.setattr(cointegration, "MAX_CACHE_ENTRIES", 3)
+    prices = make_prices()
+
+    engle_granger(prices, pairs=[("T0", "T1"), ("T0", "T2"), ("T0", "T3")])
+    engle_granger(prices, pairs=[("T0", "T1")])  # touched: now the most recent
+    engle_granger(prices, pairs=[("T1", "T2")])
+
+    cached = [key[:2] for key in cointegration._RESULT_CACHE]
+    assert cached == [("T0", "T3"), ("T0", "T1"), ("T1", "T2")]
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from core.decimate import decimate_series, finite_runs
+
+
+def make_z(n_rows=20_000, seed=0):
+    rng = np.random.default_rng(seed)
+    z = pd.Series(rng.normal(0, 1, n_rows).cumsum() / 30, index=pd.date_range("2020-01-01", periods=n_rows, freq="h"))
+    z.iloc[:90] = np.nan            # warm-up
+    z.iloc[8_000:8_050] = np.nan    # missing bars
+    z.iloc[15_000:15_003] = np.nan
+    return z
+
+
+def test_runs_are_decimated_separately_with_a_gap_marker_between_them():
+    z = make_z()
+    for method in ("minmax", "lttb"):
+        points = decimate_series(z, 1200, (-2.0, 2.0), method)
+
+        assert len(points) <= 1300
+        # One NaN per interior gap, at the first missing bar; no leading warm-up NaN.
+        assert list(points.index[points.isna()]) == [z.index[8_000], z.index[15_000]]
+        starts, ends = finite_runs(z.to_numpy())
+        for start, end in zip(starts, ends):
+            assert z.index[start] in points.index and z.index[end - 1] in points.index
+
+
+def test_threshold_crossings_are_kept():
+    z = make_z()
+    points = decimate_series(z, 600, (-1.0, 1.0))
+    full = np.sign(z.dropna() - 1.0)
+    kept = np.sign(points.dropna() - 1.0)
+    assert (full.diff().fillna(0) != 0).sum() == (kept.diff().fillna(0) != 0).sum()
+
+
+def test_short_series_are_returned_whole():
+    z = make_z(500)
+    points = decimate_series(z, 1000)
+    assert points.dropna().equals(z.dropna())
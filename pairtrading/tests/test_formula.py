@@ -0,0 +1,16 @@
+import numpy as np
+import pytest
+
+from formula import FormulaError, compile_spread_formula
+
+
+@pytest.mark.parametrize("formula", ["asset1 - (-8) ** 0.5", "asset1 - 1e308 * 10", "log(0) + asset1",
+                                     "sqrt(-1) * asset2", "asset1 + 1e999", "asset1 - 1" + "0" * 400])
+def test_folded_constants_must_be_finite_reals(formula):
+    with pytest.raises(FormulaError, match="Invalid constant expression"):
+        compile_spread_formula(formula)
+
+
+def test_folded_constants_evaluate_like_the_expression():
+    spread = compile_spread_formula("(asset2 * 2 ** 0.5) - -asset1 / 4")
+    np.testing.assert_allclose(spread([8.0], [3.0]), [3.0 * 2 ** 0.5 + 2.0])
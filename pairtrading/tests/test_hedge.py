@@ -0,0 +1,27 @@
+import numpy as np
+
+from hedge import kalman_hedge, rolling_ols_hedge
+
+
+def make_pair(n=2520, alpha=200.0, beta=80.0, seed=0):
+    rng = np.random.default_rng(seed)
+    asset2 = 20.0 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    asset1 = alpha + beta * asset2 + rng.normal(0, 5.0, n)
+    return asset1, asset2
+
+
+def test_kalman_recovers_known_beta_and_alpha():
+    asset1, asset2 = make_pair()
+    alpha, beta = kalman_hedge(asset1, asset2)
+    # Converged within the first year, not crawling from the starting guess.
+    assert abs(beta[250] - 80.0) < 2.0
+    assert abs(beta[-1] - 80.0) < 1.0
+    assert abs(alpha[-1] - 200.0) < 20.0
+
+
+def test_rolling_ols_recovers_known_beta_and_alpha():
+    asset1, asset2 = make_pair()
+    alpha, beta = rolling_ols_hedge(asset1, asset2, window=250)
+    assert np.isnan(beta[248]) and not np.isnan(beta[249])
+    assert abs(np.nanmedian(beta) - 80.0) < 2.0
+    assert abs(np.nanmedian(alpha) - 200.0) < 40.0
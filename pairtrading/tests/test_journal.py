@@ -0,0 +1,98 @@
+import json
+import math
+
+import pytest
+
+from journal import SheetSyncWorker, TradeJournal
+
+
+class FakeWorksheet:
+    """Keeps appended rows; like the Sheets API, refuses NaN and any row whose note is 'poison'."""
+
+    def __init__(self, records=()):
+        self.records = [dict(r) for r in records]
+        self.calls = 0
+
+    def append_rows(self, values):
+        self.calls += 1
+        for row in values:
+            if any(isinstance(v, float) and not math.isfinite(v) for v in row):
+                raise ValueError("Out of range float values are not JSON compliant")
+            if row[-1] == "poison":
+                raise ValueError("Invalid value at 'data.values'")
+        self.records.extend(dict(zip(["date", "action_type", "z_score", "asset1_action", "asset2_action", "note"], row))
+                            for row in values)
+
+    def get_all_records(self):
+        return [dict(r) for r in self.records]
+
+
+def trade(date, note="", z_score=1.5):
+    return {"date": date, "action_type": "Entry", "z_score": z_score,
+            "asset1_action": "BUY:1", "asset2_action": "SELL:10", "note": note}
+
+
+@pytest.fixture
+def journal(tmp_path):
+    return TradeJournal(str(tmp_path / "trade_journal.jsonl"))
+
+
+def test_non_finite_values_are_pushed_as_empty_cells(journal):
+    journal.append(trade("2024-01-02", z_score=float("nan")))
+    sheet = FakeWorksheet()
+    assert SheetSyncWorker(journal, sheet).sync_once() == 1
+    assert sheet.records[0]["z_score"] == ""
+    assert journal.unsynced() == []
+
+
+def test_poison_row_is_dead_lettered_and_later_rows_still_sync(journal):
+    for date, note in [("2024-01-02", ""), ("2024-01-03", "poison"), ("2024-01-04", "")]:
+        journal.append(trade(date, note))
+    sheet = FakeWorksheet()
+    worker = SheetSyncWorker(journal, sheet, max_attempts=3)
+
+    for _ in range(2):
+        with pytest.raises(ValueError):
+            worker.sync_once()
+    assert [r["date"] for r in sheet.records] == ["2024-01-02"]
+    assert journal.synced_count() == 1
+
+    assert worker.sync_once() == 1
+    assert [r["date"] for r in sheet.records] == ["2024-01-02", "2024-01-04"]
+    assert journal.unsynced() == []
+    with open(worker.dead_letter_path, encoding="utf-8") as f:
+        dead = [json.loads(line) for line in f]
+    assert [(d["row"], d["record"]["date"]) for d in dead] == [(1, "2024-01-03")]
+
+
+def test_unreachable_sheet_is_never_dead_lettered(journal):
+    class Offline(FakeWorksheet):
+        def append_rows(self, values):
+            raise ConnectionError("unreachable")
+
+    journal.append(trade("2024-01-02"))
+    worker = SheetSyncWorker(journal, Offline(), max_attempts=1)
+    for _ in range(3):
+        with pytest.raises(ConnectionError):
+            worker.sync_once()
+    assert len(journal.unsynced()) == 1
+
+
+def test_reconcile_imports_sheet_rows_on_every_start(journal):
+    sheet = FakeWorksheet([trade("2024-01-02")])
+    SheetSyncWorker(journal, sheet).reconcile()
+    assert [r["date"] for r in journal.rows()] == ["2024-01-02"]
+
+    # Saved here while another machine added a row (and the sheet rounds the Z-Score)
+    journal.append(trade("2024-01-05"))
+    sheet.records.append(trade("2024-01-04", z_score=1.23))
+    sheet.records[0]["z_score"] = 1.5
+
+    assert SheetSyncWorker(journal, sheet).reconcile() == 1
+    assert sorted(r["date"] for r in journal.rows()) == ["2024-01-02", "2024-01-04", "2024-01-05"]
+    assert sorted(r["date"] for r in sheet.records) == ["2024-01-02", "2024-01-04", "2024-01-05"]
+    assert journal.unsynced() == []
+
+    # Nothing new on either side: a restart imports nothing
+    assert SheetSyncWorker(journal, sheet).reconcile() == 0
+    assert len(journal) == 3
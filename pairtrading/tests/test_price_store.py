@@ -0,0 +1,164 @@
+import os
+import threading
+import time
+from datetime import datetime
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_store import DEFAULT_REFRESH_INTERVAL, PriceStore
+
+
+class FakeDownloader:
+    """Records every requested range and returns ``fake_close`` for each bar."""
+
+    def __init__(self, interval="1d", last_bar=None):
+        self.interval = interval
+        self.last_bar = last_bar
+        self.calls = []
+
+    def __call__(self, tickers, start, end, interval=None):
+        assert interval == (None if self.interval == "1d" else self.interval)
+        self.calls.append((list(tickers), pd.Timestamp(start), pd.Timestamp(end)))
+        if self.interval == "1d":
+            index = pd.bdate_range(pd.Timestamp(start).normalize(), pd.Timestamp(end), inclusive="left")
+        else:
+            # Bars exist up to ``last_bar`` (a UTC instant), like a live feed.
+            stop = min(pd.Timestamp(end).tz_localize("UTC"), self.last_bar)
+            index = pd.date_range(pd.Timestamp(start).tz_localize("UTC").ceil("5min"), stop, freq="5min")
+            index = index.tz_convert("America/New_York")
+        return pd.DataFrame({t: fake_close(t, index) for t in tickers}, index=index)
+
+
+def fake_close(ticker, index):
+    """The close the fake serves for ``ticker`` at each bar, whichever range asked for it."""
+    minutes = pd.DatetimeIndex(index).asi8 // 60_000_000_000
+    return (minutes % 1_000_000).astype(float) + sum(map(ord, ticker))
+
+
+def expected_closes(ticker, start, end):
+    index = pd.bdate_range(start, end)
+    return pd.Series(fake_close(ticker, index), index=index, name=ticker)
+
+
+@pytest.fixture
+def daily(tmp_path):
+    now = [0.0]
+    fake = FakeDownloader()
+    store = PriceStore(str(tmp_path), downloader=fake, clock=lambda: now[0])
+    return store, fake, now
+
+
+@pytest.fixture
+def local_tz():
+    old = os.environ.get("TZ")
+    os.environ["TZ"] = "America/New_York"
+    time.tzset()
+    yield
+    if old is None:
+        os.environ.pop("TZ")
+    else:
+        os.environ["TZ"] = old
+    time.tzset()
+
+
+def test_intraday_window_ends_at_utc_now_in_a_non_utc_zone(tmp_path, local_tz):
+    now_utc = pd.Timestamp.now(tz="UTC").floor("5min")
+    fake = FakeDownloader("5m", last_bar=now_utc)
+    store = PriceStore(str(tmp_path), downloader=fake, interval="5m")
+
+    closes = store.get_closes(["GC=F", "SI=F"], days=2)
+
+    # Bars are stored UTC-naive; the newest one must not lose the local UTC offset.
+    assert closes.index[-1] == now_utc.tz_localize(None)
+    assert fake.calls[0][2] >= now_utc.tz_localize(None)
+
+
+def test_tickers_missing_the_same_range_share_one_download(tmp_path):
+    now = [0.0]
+    fake = FakeDownloader()
+    store = PriceStore(str(tmp_path), downloader=fake, clock=lambda: now[0])
+    store.get_closes(["GC=F", "SI=F"], days=30, end=datetime(2024, 3, 1))
+    now[0] += DEFAULT_REFRESH_INTERVAL
+
+    store.get_closes(["GC=F", "SI=F", "HG=F"], days=30, end=datetime(2024, 3, 5))
+
+    # The stored pair only needs its tail; the new ticker its whole window.
+    assert fake.calls[1:] == [
+        (["GC=F", "SI=F"], pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-06")),
+        (["HG=F"], pd.Timestamp("2024-02-04"), pd.Timestamp("2024-03-06")),
+    ]
+
+
+def test_concurrent_refreshes_of_a_ticker_download_it_once(tmp_path):
+    started, release = threading.Event(), threading.Event()
+
+    class SlowDownloader(FakeDownloader):
+        def __call__(self, tickers, start, end, interval=None):
+            started.set()
+            release.wait(5)
+            return super().__call__(tickers, start, end, interval)
+
+    fake = SlowDownloader()
+    store = PriceStore(str(tmp_path), downloader=fake)
+    end = datetime(2024, 3, 1)
+    first = threading.Thread(target=store.refresh, args=(["GC=F"], 30, end))
+    first.start()
+    started.wait(5)
+    second = threading.Thread(target=store.refresh, args=(["GC=F"], 30, end))
+    second.start()
+    second.join(0.2)
+    assert second.is_alive()  # waiting for the first download, not starting its own
+
+    release.set()
+    first.join(5)
+    second.join(5)
+    assert len(fake.calls) == 1
+    assert not store.load("GC=F").empty
+
+
+def test_initial_fetch_downloads_the_whole_window(daily):
+    store, fake, _ = daily
+    closes = store.get_closes(["GC=F"], days=30, end=datetime(2024, 3, 1))
+
+    assert fake.calls == [(["GC=F"], pd.Timestamp("2024-01-31"), pd.Timestamp("2024-03-02"))]
+    pd.testing.assert_series_equal(closes["GC=F"], expected_closes("GC=F", "2024-01-31", "2024-03-01"),
+                                   check_freq=False)
+
+
+def test_tail_delta_only_downloads_from_the_last_stored_bar(daily):
+    store, fake, now = daily
+    store.get_closes(["GC=F"], days=30, end=datetime(2024, 3, 1))
+    store.get_closes(["GC=F"], days=30, end=datetime(2024, 3, 1))
+    assert len(fake.calls) == 1  # within the refresh interval: served from disk
+
+    now[0] += DEFAULT_REFRESH_INTERVAL
+    store.get_closes(["GC=F"], days=30, end=datetime(2024, 3, 8))
+
+    assert fake.calls[1:] == [(["GC=F"], pd.Timestamp("2024-03-01"), pd.Timestamp("2024-03-09"))]
+    pd.testing.assert_series_equal(store.load("GC=F"), expected_closes("GC=F", "2024-01-31", "2024-03-08"),
+                                   check_freq=False)
+
+
+def test_longer_window_extends_the_head(daily):
+    store, fake, _ = daily
+    store.get_closes(["GC=F"], days=30, end=datetime(2024, 3, 1))
+    closes = store.get_closes(["GC=F"], days=60, end=datetime(2024, 3, 1))
+
+    assert fake.calls[1:] == [(["GC=F"], pd.Timestamp("2024-01-01"), pd.Timestamp("2024-02-01"))]
+    pd.testing.assert_series_equal(closes["GC=F"], expected_closes("GC=F", "2024-01-01", "2024-03-01"),
+                                   check_freq=False)
+    store.get_closes(["GC=F"], days=60, end=datetime(2024, 3, 1))
+    assert len(fake.calls) == 2  # the head is recorded as covered
+
+
+def test_new_ticker_only_downloads_itself(daily):
+    store, fake, _ = daily
+    store.get_closes(["GC=F"], days=30, end=datetime(2024, 3, 1))
+    closes = store.get_closes(["GC=F", "SI=F"], days=30, end=datetime(2024, 3, 1))
+
+    assert fake.calls[1:] == [(["SI=F"], pd.Timestamp("2024-01-31"), pd.Timestamp("2024-03-02"))]
+    for ticker in ("GC=F", "SI=F"):
+        pd.testing.assert_series_equal(closes[ticker], expected_closes(ticker, "2024-01-31", "2024-03-01"),
+                                       check_freq=False)
@@ -0,0 +1,60 @@
+import asyncio
+
+import numpy as np
+import pandas as pd
+
+from core.market import calculate_z_score
+from core.scheduler import RefreshScheduler, SignalSnapshot
+from core.signals import DEFAULT_PAIR
+from price_store import PriceStore
+from test_price_store import FakeDownloader
+
+
+def test_intraday_pairs_use_the_injected_store_downloader(tmp_path):
+    daily, intraday = FakeDownloader(), FakeDownloader("5m", last_bar=pd.Timestamp.now(tz="UTC").floor("5min"))
+
+    def downloader(tickers, start, end, interval=None):
+        return (intraday if interval else daily)(tickers, start, end, interval)
+
+    store = PriceStore(str(tmp_path), downloader=downloader)
+    watchlist = [{"asset1": "GC=F", "asset2": "SI=F"},
+                 {"asset1": "GC=F", "asset2": "SI=F", "interval": "5m", "days": 2, "rolling_window": "1h"}]
+    scheduler = RefreshScheduler(watchlist, store=store, snapshot=SignalSnapshot(None))
+
+    published = asyncio.run(scheduler.run_once())
+
+    assert sorted(published) == ["GC=F:SI=F", "GC=F:SI=F@5m"]
+    assert not any("error" in signal for signal in scheduler.snapshot.entries().values())
+    assert scheduler.store_for("5m").root == str(tmp_path / "5m")
+    assert [c[0] for c in daily.calls] == [["GC=F", "SI=F"]]
+    assert [c[0] for c in intraday.calls] == [["GC=F", "SI=F"]]
+
+
+def test_formula_pairs_only_feed_new_bars_to_their_rolling_state(tmp_path):
+    rng = np.random.default_rng(0)
+    n = 260
+    prices = pd.DataFrame({"asset1": 1800 + rng.normal(0, 10, n).cumsum(), "asset2": 22 + rng.normal(0, 0.1, n).cumsum()},
+                          index=pd.bdate_range("2023-01-02", periods=n))
+    settings = {**DEFAULT_PAIR, "rolling_window": 90}
+    scheduler = RefreshScheduler([], store=PriceStore(str(tmp_path)), snapshot=SignalSnapshot(None))
+
+    def expected(rows):
+        return calculate_z_score(rows.copy(), settings["spread_formula"], 90).iloc[-1]
+
+    assert len(scheduler._z_score_frame("pair", prices.iloc[:200].copy(), settings)) == 200  # seeded
+    for end in (201, 205, 206):
+        row = scheduler._z_score_frame("pair", prices.iloc[:end].copy(), settings)
+        assert len(row) == 1
+        np.testing.assert_allclose(row.iloc[-1][["Mean", "Std", "Z_Score"]].to_numpy(dtype=float),
+                                   expected(prices.iloc[:end])[["Mean", "Std", "Z_Score"]].to_numpy(dtype=float),
+                                   rtol=1e-9)
+
+    # A revised bar the state already absorbed forces a full recompute.
+    revised = prices.iloc[:207].copy()
+    revised.iloc[204, 0] += 50.0
+    assert len(scheduler._z_score_frame("pair", revised, settings)) == 207
+
+    # So does one deeper in the window, not just the bar the state ended on.
+    revised = pd.concat([revised, prices.iloc[207:208]])
+    revised.iloc[150, 1] += 1.0
+    assert len(scheduler._z_score_frame("pair", revised, settings)) == 208
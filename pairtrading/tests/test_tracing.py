@@ -0,0 +1,48 @@
+import threading
+
+from tracing import Tracer
+
+
+def test_sessions_do_not_share_enabled_flag_or_spans():
+    tracer = Tracer(enabled=False)
+    a, b = tracer.session(), tracer.session()
+    a.enabled = True
+    results = {}
+
+    def rerun(session, label):
+        tracer.activate(session)
+        session.begin_rerun()
+        with tracer.span(label):
+            pass
+        results[label] = tracer.enabled
+
+    threads = [threading.Thread(target=rerun, args=(a, "a")), threading.Thread(target=rerun, args=(b, "b"))]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert results == {"a": True, "b": False}
+    assert [r["name"] for r in a.records()] == ["a"]
+    assert b.records() == []
+    assert tracer.background.records() == []
+
+
+def test_spans_outside_a_session_go_to_the_background_stream():
+    tracer = Tracer(enabled=True)
+    session = tracer.session()
+
+    def background_work():
+        with tracer.span("scheduler.refresh"):
+            pass
+
+    tracer.activate(session)
+    session.begin_rerun()
+    worker = threading.Thread(target=background_work)
+    worker.start()
+    worker.join()
+    with tracer.span("render_chart"):
+        pass
+
+    assert [r["name"] for r in session.records()] == ["render_chart"]
+    assert [r["name"] for r in tracer.background.records(all_reruns=True)] == ["scheduler.refresh"]
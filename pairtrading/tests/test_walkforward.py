@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+
+from backtest import run_pair_backtest
+from core.market import calculate_z_score
+from walkforward import backtest_score, optimize_backtest, walk_forward
+
+FORMULA = "asset1 - 80 * asset2"
+GRID = {"windows": (30, 60), "highs": (1.5, 2.0), "lows": (-2.0, -1.5)}
+
+
+def make_pair(n_rows, seed=0):
+    rng = np.random.default_rng(seed)
+    asset2 = 25.0 + rng.normal(0, 0.3, n_rows).cumsum()
+    asset1 = 80.0 * asset2 + 200.0 + rng.normal(0, 15.0, n_rows)
+    return pd.DataFrame({"asset1": asset1, "asset2": asset2}, index=pd.bdate_range("2020-01-01", periods=n_rows))
+
+
+def test_in_sample_score_is_the_backtest_the_test_period_uses():
+    train = make_pair(400)
+    params = {"spread_formula": FORMULA, **GRID, "objective": "sharpe", "target_asset1_pct": 50,
+              "dca_amount": 1000.0, "dca_every": 21}
+    best = optimize_backtest(train, params)
+
+    # Scored from the bar where the longest window has filled, like every combination.
+    scored = calculate_z_score(train, FORMULA, best["window"]).iloc[max(GRID["windows"]) - 1:]
+    result = run_pair_backtest(scored, 50, best["high"], best["low"], 1000.0, 21)
+    assert np.isclose(best["in_sample"], backtest_score(result.equity["NAV"].to_numpy(), "sharpe"))
+
+
+def test_test_periods_carry_holdings_and_cash_across_folds():
+    result = walk_forward(make_pair(700), FORMULA, train_bars=300, test_bars=105, max_workers=1, cache_dir=None,
+                          **GRID)
+
+    assert len(result.folds) == 4
+    equity = result.equity
+    # A fold starting from scratch would be worth one DCA payment on its first bar.
+    for test_start in result.folds["test_start"].iloc[1:]:
+        assert equity.loc[test_start, "Equity"] > 2 * 1000.0
+    assert equity["Contributed"].iloc[-1] == 1000.0 * 4 * 5
+
+
+def test_cached_folds_are_keyed_on_where_the_test_period_starts(tmp_path):
+    prices = make_pair(400)
+    # Both layouts have a single fold over rows 0-400; only the split differs.
+    for train_bars in (300, 295):
+        result = walk_forward(prices, FORMULA, train_bars=train_bars, test_bars=105, max_workers=1,
+                              cache_dir=str(tmp_path), **GRID)
+        assert result.folds["test_start"].iloc[0] == prices.index[train_bars]
+        assert result.equity.index[0] == prices.index[train_bars]
+        assert len(result.equity) == 400 - train_bars
@@ -0,0 +1,40 @@
+import numpy as np
+import pandas as pd
+
+from core.market import calculate_z_score
+from zscore_state import RollingZScore
+
+
+def make_pair(n_rows=1500, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({"asset1": 1800 + rng.normal(0, 10, n_rows).cumsum(),
+                         "asset2": 22 + rng.normal(0, 0.1, n_rows).cumsum()})
+
+
+def test_matches_batch_with_missing_prices():
+    prices = make_pair()
+    prices.iloc[400, 0] = np.nan
+    prices.iloc[700:705, 1] = np.nan
+    batch = calculate_z_score(prices, "(asset2 * 100) - asset1", 90)
+
+    # NaN rows make the window NaN until they roll out, exactly like pandas.
+    assert RollingZScore(90).matches_batch(batch)
+    assert batch["Z_Score"].iloc[400:490].isna().all()
+
+
+def test_matches_batch_is_relative_to_the_spread_scale():
+    prices = make_pair() * 1e6
+    batch = calculate_z_score(prices, "(asset2 * 100) - asset1", 30)
+    state = RollingZScore(30)
+    assert state.matches_batch(batch)
+    assert not state.matches_batch(batch.assign(Mean=batch["Mean"] * (1 + 1e-6)))
+
+
+def test_preview_does_not_change_the_state():
+    batch = calculate_z_score(make_pair(), "(asset2 * 100) - asset1", 60)
+    state = RollingZScore.from_frame(batch.iloc[:-1], 60)
+    before = state.snapshot()
+    preview = state.preview(batch["Spread"].iloc[-1])
+    assert state.snapshot() == before
+    np.testing.assert_allclose([preview["Mean"], preview["Std"], preview["Z_Score"]],
+                               batch[["Mean", "Std", "Z_Score"]].iloc[-1].to_numpy(dtype=float), rtol=1e-9)
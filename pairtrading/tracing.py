@@ -0,0 +1,291 @@
+"""
+Lightweight timing/tracing for the app and the core pipeline.
+
+    from tracing import span, traced, tracer
+
+    with span("render_chart"):
+        st.plotly_chart(fig)
+
+    @traced("load_trade_history")
+    def load_trade_history(journal): ...
+
+Spans go to the ``TraceSession`` activated for the current context (one per
+app session, see ``Tracer.activate``) or else to ``tracer.background``. They
+are grouped per app rerun (``begin_rerun()``), can be summarized for a debug
+panel and exported as JSON lines. Tracing is off unless ``PAIRTRADING_TRACE=1``
+or the session is enabled; when off, ``span`` returns a shared no-op object and
+``traced`` functions cost one context lookup.
+"""
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_RERUNS = 50
+
+
+def payload_size(value) -> int | None:
+    """Approximate in-memory size in bytes of common results (None if unknown)."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True, deep=False).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True, deep=False))
+    if isinstance(value, np.ndarray):
+        return int(value.nbytes)
+    if isinstance(value, (bytes, bytearray, str)):
+        return len(value)
+    if isinstance(value, tuple):
+        sizes = [payload_size(v) for v in value]
+        return sum(s for s in sizes if s is not None) if any(s is not None for s in sizes) else None
+    return None
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+    def set(self, **attrs):
+        pass
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    __slots__ = ("tracer", "session", "name", "attrs", "start", "wall")
+
+    def __init__(self, tracer, session, name, attrs):
+        self.tracer = tracer
+        self.session = session
+        self.name = name
+        self.attrs = attrs
+
+    def __enter__(self):
+        self.tracer._stack().append(self)
+        self.wall = time.time()
+        self.start = time.perf_counter()
+        return self
+
+    def set(self, **attrs):
+        """Adds attributes (e.g. ``cache='miss'``, ``bytes=...``) to the span."""
+        self.attrs.update(attrs)
+
+    def __exit__(self, exc_type, exc, tb):
+        seconds = time.perf_counter() - self.start
+        stack = self.tracer._stack()
+        stack.pop()
+        if exc_type is not None:
+            self.attrs["error"] = exc_type.__name__
+        self.session._record({
+            "name": self.name,
+            "start": self.wall,
+            "ms": seconds * 1000.0,
+            "depth": len(stack),
+            "thread": threading.current_thread().name,
+            **self.attrs,
+        })
+        return False
+
+
+class TraceSession:
+    """
+    One stream of spans (e.g. one app session), keeping its last ``max_reruns`` reruns.
+    """
+
+    def __init__(self, enabled: bool = False, max_reruns: int = DEFAULT_MAX_RERUNS, name: str = "session"):
+        self.enabled = enabled
+        self.name = name
+        self.rerun = 0
+        self._history: deque[tuple[int, list]] = deque(maxlen=max_reruns)
+        self._current: list = []
+        # Spans recorded before the first begin_rerun() count as rerun 0.
+        self._history.append((0, self._current))
+        self._lock = threading.Lock()
+
+    def _record(self, record: dict) -> None:
+        with self._lock:
+            record["rerun"] = self.rerun
+            record["stream"] = self.name
+            self._current.append(record)
+
+    def begin_rerun(self) -> None:
+        """Starts a new group of spans (call at the top of each app rerun)."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self.rerun += 1
+            self._current = []
+            self._history.append((self.rerun, self._current))
+
+    def records(self, all_reruns: bool = False) -> list[dict]:
+        """Spans of the current rerun (or of every kept rerun)."""
+        with self._lock:
+            if all_reruns:
+                return [dict(r) for _, spans in self._history for r in spans]
+            return [dict(r) for r in self._current]
+
+    def summary(self, all_reruns: bool = False) -> pd.DataFrame:
+        """Per span name: calls, total/max milliseconds, cache hits/misses and bytes."""
+        records = self.records(all_reruns)
+        columns = ["name", "calls", "total_ms", "max_ms", "hits", "misses", "bytes"]
+        if not records:
+            return pd.DataFrame(columns=columns)
+        df = pd.DataFrame(records)
+        for col in ("cache", "bytes"):
+            if col not in df.columns:
+                df[col] = None
+        grouped = df.groupby("name", sort=False)
+        out = pd.DataFrame({
+            "calls": grouped.size(),
+            "total_ms": grouped["ms"].sum().round(2),
+            "max_ms": grouped["ms"].max().round(2),
+            "hits": grouped["cache"].apply(lambda c: int((c == "hit").sum())),
+            "misses": grouped["cache"].apply(lambda c: int((c == "miss").sum())),
+            "bytes": grouped["bytes"].max(),
+        }).reset_index()
+        return out[columns].sort_values("total_ms", ascending=False, ignore_index=True)
+
+    def to_jsonl(self, all_reruns: bool = True) -> str:
+        """The spans as JSON lines, one span per line."""
+        return "".join(json.dumps(r, default=str) + "\n" for r in self.records(all_reruns))
+
+    def export_jsonl(self, path: str, all_reruns: bool = False) -> None:
+        """Appends the spans to a JSON lines file for offline analysis."""
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(self.to_jsonl(all_reruns))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._history.clear()
+            self._current = []
+
+
+class Tracer:
+    """
+    Routes spans to the ``TraceSession`` active in the current context.
+
+    The app activates one session per Streamlit session (``activate``), so
+    ``?debug=1`` and the debug tab only concern that visitor. Code running
+    outside any session, e.g. the background scheduler thread, records into
+    ``tracer.background``. The ``TraceSession`` methods (``begin_rerun``,
+    ``summary``, ...) are also available here and act on the active session.
+    """
+
+    def __init__(self, enabled: bool = False, max_reruns: int = DEFAULT_MAX_RERUNS):
+        self.default_enabled = enabled
+        self.max_reruns = max_reruns
+        self.background = TraceSession(enabled, max_reruns, name="background")
+        self._active = contextvars.ContextVar("trace_session", default=None)
+        self._local = threading.local()
+
+    def _stack(self) -> list:
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def session(self, enabled: bool | None = None, name: str = "session") -> TraceSession:
+        """A new span stream; enabled like the tracer unless ``enabled`` is given."""
+        return TraceSession(self.default_enabled if enabled is None else enabled, self.max_reruns, name)
+
+    def activate(self, session: TraceSession | None) -> None:
+        """Sends the spans of the current context (thread) to ``session``; None for ``background``."""
+        self._active.set(session)
+
+    @property
+    def current(self) -> TraceSession:
+        return self._active.get() or self.background
+
+    @property
+    def enabled(self) -> bool:
+        return self.current.enabled
+
+    @enabled.setter
+    def enabled(self, value: bool) -> None:
+        self.current.enabled = value
+
+    @property
+    def rerun(self) -> int:
+        return self.current.rerun
+
+    def span(self, name: str, **attrs):
+        """Context manager timing a block; a shared no-op when tracing is off."""
+        session = self.current
+        if not session.enabled:
+            return _NULL_SPAN
+        return _Span(self, session, name, attrs)
+
+    def traced(self, name: str | None = None, cached: bool = False, size: bool = True):
+        """
+        Decorator timing every call of a function.
+
+        Args:
+            name (str, optional): Span name; defaults to the function name.
+            cached (bool): The function is memoized (e.g. ``st.cache_data``); the
+                span reports ``cache='hit'`` unless the body calls ``mark_cache_miss``.
+            size (bool): Record ``payload_size`` of the result.
+        """
+        def decorator(fn):
+            label = name or fn.__name__
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                session = self.current
+                if not session.enabled:
+                    return fn(*args, **kwargs)
+                attrs = {"cache": "hit"} if cached else {}
+                with _Span(self, session, label, attrs) as s:
+                    result = fn(*args, **kwargs)
+                    if size:
+                        nbytes = payload_size(result)
+                        if nbytes is not None:
+                            s.set(bytes=nbytes)
+                return result
+
+            # Keep helpers of the wrapped object reachable (e.g. st.cache_data's .clear()).
+            if hasattr(fn, "clear"):
+                wrapper.clear = fn.clear
+            return wrapper
+
+        return decorator
+
+    def mark_cache_miss(self) -> None:
+        """Called from inside a memoized body: marks the enclosing span as a miss."""
+        stack = self._stack()
+        if stack:
+            stack[-1].attrs["cache"] = "miss"
+
+    def begin_rerun(self) -> None:
+        self.current.begin_rerun()
+
+    def records(self, all_reruns: bool = False) -> list[dict]:
+        return self.current.records(all_reruns)
+
+    def summary(self, all_reruns: bool = False) -> pd.DataFrame:
+        return self.current.summary(all_reruns)
+
+    def to_jsonl(self, all_reruns: bool = True) -> str:
+        return self.current.to_jsonl(all_reruns)
+
+    def export_jsonl(self, path: str, all_reruns: bool = False) -> None:
+        self.current.export_jsonl(path, all_reruns)
+
+    def clear(self) -> None:
+        self.current.clear()
+
+
+tracer = Tracer(enabled=os.environ.get("PAIRTRADING_TRACE") == "1")
+span = tracer.span
+traced = tracer.traced
+mark_cache_miss = tracer.mark_cache_miss
@@ -0,0 +1,266 @@
+import hashlib
+import os
+import pickle
+from concurrent.futures import ProcessPoolExecutor
+from typing import NamedTuple
+
+import numpy as np
+import pandas as pd
+
+from backtest import replay_events, run_pair_backtest, time_weighted_nav
+from core.market import calculate_z_score
+from sweep import DEFAULT_HIGHS, DEFAULT_LOWS, DEFAULT_WINDOWS, PERIODS_PER_YEAR
+
+DEFAULT_CACHE_DIR = os.environ.get(
+    "PAIRTRADING_WALKFORWARD_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".walkforward_cache"),
+)
+
+# Bump when the fold computation changes so stale cache entries are ignored.
+CACHE_VERSION = 3
+
+# Scores of a backtest the folds can optimize (all maximized).
+OBJECTIVES = ('sharpe', 'total_return', 'max_drawdown')
+
+
+class WalkForwardResult(NamedTuple):
+    folds: pd.DataFrame
+    equity: pd.DataFrame
+    trades: pd.DataFrame
+
+
+def make_folds(n_rows: int, train_bars: int, test_bars: int) -> list[tuple[int, int, int]]:
+    """
+    Splits ``n_rows`` into rolling (train_start, test_start, test_end) folds.
+
+    Folds are anchored at the first row, so appending data never moves an
+    existing fold; only the last (possibly partial) fold changes.
+    """
+    folds = []
+    start = 0
+    while start + train_bars < n_rows:
+        test_start = start + train_bars
+        folds.append((start, test_start, min(test_start + test_bars, n_rows)))
+        start += test_bars
+    return folds
+
+
+def _fold_key(prices: pd.DataFrame, test_start: int, params: dict) -> str:
+    # The same rows split at a different row are a different fold.
+    digest = hashlib.sha1()
+    digest.update(repr((CACHE_VERSION, int(test_start), sorted(params.items()))).encode())
+    digest.update(pd.util.hash_pandas_object(prices, index=True).to_numpy().tobytes())
+    return digest.hexdigest()
+
+
+def backtest_score(nav: np.ndarray, objective: str) -> float:
+    """Scores a backtest's NAV curve by ``objective`` (one of ``OBJECTIVES``)."""
+    if objective == 'total_return':
+        return float(nav[-1] - 1.0)
+    if objective == 'max_drawdown':
+        return float((nav / np.maximum.accumulate(nav) - 1.0).min())
+    returns = nav[1:] / nav[:-1] - 1.0
+    sigma = returns.std(ddof=1) if len(returns) > 1 else 0.0
+    return float(returns.mean() / sigma * np.sqrt(PERIODS_PER_YEAR)) if sigma > 0 else 0.0
+
+
+def optimize_backtest(train: pd.DataFrame, params: dict) -> dict:
+    """
+    Picks the (window, high, low) whose DCA + rebalance backtest scores best on ``train``.
+
+    Every combination is backtested on the same bars (after the longest window
+    has filled) with ``run_pair_backtest``'s rules, so the in-sample score is
+    the one the test period is evaluated with. The orders only depend on which
+    side of the thresholds the Z-score is on at each DCA event, so
+    combinations that put every event on the same side share one replay.
+
+    Returns:
+        dict: ``window``, ``high``, ``low`` and ``in_sample`` (the score).
+
+    Raises:
+        ValueError: If ``train`` is shorter than the longest window, or on an unknown objective.
+    """
+    if params['objective'] not in OBJECTIVES:
+        raise ValueError(f"Unknown objective {params['objective']!r}; expected one of {OBJECTIVES}")
+    windows, highs, lows = params['windows'], params['highs'], params['lows']
+    start = max(windows) - 1
+    if len(train) <= start + 1:
+        raise ValueError(f"Need more than {start + 1} rows of data for a {max(windows)}-bar window")
+    p1 = train['asset1'].to_numpy(dtype=float)[start:]
+    p2 = train['asset2'].to_numpy(dtype=float)[start:]
+    flows = np.zeros(len(p1))
+    flows[::params['dca_every']] = params['dca_amount']
+
+    scores = {}
+    best = None
+    for window in windows:
+        z = calculate_z_score(train, params['spread_formula'], window)['Z_Score'].to_numpy(dtype=float)[start:]
+        at_events = z[::params['dca_every']]
+        finite = at_events[np.isfinite(at_events)]
+        for high in highs:
+            for low in lows:
+                key = (np.isfinite(at_events).tobytes(), (finite > high).tobytes(), (finite < low).tobytes())
+                if key not in scores:
+                    events, qty1, qty2, cash, _ = replay_events(
+                        p1, p2, z, params['target_asset1_pct'], high, low, params['dca_amount'], params['dca_every'])
+                    slot = np.searchsorted(events, np.arange(len(p1)), side='right') - 1
+                    equity = qty1[slot] * p1 + qty2[slot] * p2 + cash[slot]
+                    scores[key] = backtest_score(time_weighted_nav(equity, flows)[0], params['objective'])
+                if best is None or scores[key] > best['in_sample']:
+                    best = {'window': int(window), 'high': float(high), 'low': float(low), 'in_sample': scores[key]}
+    return best
+
+
+def run_fold(prices: pd.DataFrame, test_start: int, params: dict) -> dict:
+    """
+    Optimizes on the train rows of one fold and scores its test rows with the chosen window.
+
+    The test period itself is traded by ``walk_forward``, which carries the
+    holdings and cash from one fold to the next.
+
+    Args:
+        prices (pd.DataFrame): ``asset1``/``asset2`` for the whole fold (train + test).
+        test_start (int): Row of ``prices`` where the test period begins.
+        params (dict): Sweep grid, objective and backtest settings.
+
+    Returns:
+        dict: Chosen parameters, in-sample score and the test rows' ``scored`` Z-score frame.
+    """
+    best = optimize_backtest(prices.iloc[:test_start], params)
+    window = best['window']
+
+    # The Z-score of the first test bars needs the preceding window as history.
+    history = prices.iloc[max(test_start - window, 0):].copy()
+    scored = calculate_z_score(history, params['spread_formula'], window).iloc[test_start - max(test_start - window, 0):]
+    return {**best, 'scored': scored}
+
+
+def walk_forward(
+    df: pd.DataFrame,
+    spread_formula: str,
+    train_bars: int = 756,
+    test_bars: int = 126,
+    windows=DEFAULT_WINDOWS,
+    highs=DEFAULT_HIGHS,
+    lows=DEFAULT_LOWS,
+    objective: str = 'sharpe',
+    target_asset1_pct: int = 50,
+    dca_amount: float = 1000.0,
+    dca_every: int = 21,
+    max_workers: int | None = None,
+    cache_dir: str | None = DEFAULT_CACHE_DIR,
+) -> WalkForwardResult:
+    """
+    Walk-forward optimization of ``rolling_window`` and the Z-score thresholds.
+
+    Each fold backtests the grid on its train rows with the DCA + rebalance
+    rules, picks the best combination by ``objective`` and trades the
+    following test rows with it. The test periods form one continuous
+    account: each fold starts with the holdings and cash the previous fold
+    ended with. The optimizations run in parallel on a process pool, and each
+    is cached on disk under a hash of its fold's data and settings, so adding
+    new bars only recomputes the newest fold(s).
+
+    Args:
+        df (pd.DataFrame): Prices with ``asset1`` and ``asset2`` columns.
+        spread_formula (str): The formula to calculate the spread.
+        train_bars (int): Rows used for optimization in each fold.
+        test_bars (int): Out-of-sample rows per fold.
+        windows, highs, lows: The sweep grid.
+        objective (str): Backtest score to maximize, one of ``OBJECTIVES``.
+        target_asset1_pct (int): The target percentage for asset 1.
+        dca_amount (float): Cash injected at every backtest event.
+        dca_every (int): Bars between backtest events.
+        max_workers (int, optional): Worker processes. 1 runs in-process.
+        cache_dir (str, optional): Folder for cached folds. None disables caching.
+
+    Returns:
+        WalkForwardResult: ``folds`` (one row per fold), ``equity`` (the
+        out-of-sample ``Equity``, ``Contributed``, ``NAV`` and ``Drawdown``) and ``trades``.
+    """
+    prices = df[['asset1', 'asset2']]
+    params = {
+        'spread_formula': spread_formula,
+        'windows': tuple(int(w) for w in windows),
+        'highs': tuple(float(h) for h in highs),
+        'lows': tuple(float(x) for x in lows),
+        'objective': objective,
+        'target_asset1_pct': target_asset1_pct,
+        'dca_amount': dca_amount,
+        'dca_every': dca_every,
+    }
+    folds = make_folds(len(prices), train_bars, test_bars)
+    if not folds:
+        raise ValueError(f"Need more than {train_bars} rows for a {train_bars}-bar training period")
+
+    results = [None] * len(folds)
+    pending = {}
+    for k, (start, test_start, end) in enumerate(folds):
+        fold_prices = prices.iloc[start:end]
+        key = _fold_key(fold_prices, test_start - start, params)
+        path = os.path.join(cache_dir, f"fold_{key}.pkl") if cache_dir else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                results[k] = pickle.load(f)
+        else:
+            pending[k] = (fold_prices, test_start - start, path)
+
+    if pending:
+        if max_workers == 1 or len(pending) == 1:
+            computed = {k: run_fold(p, t, params) for k, (p, t, _) in pending.items()}
+        else:
+            with ProcessPoolExecutor(max_workers=max_workers) as pool:
+                futures = {k: pool.submit(run_fold, p, t, params) for k, (p, t, _) in pending.items()}
+                computed = {k: future.result() for k, future in futures.items()}
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        for k, result in computed.items():
+            results[k] = result
+            path = pending[k][2]
+            if path:
+                with open(path + ".tmp", "wb") as f:
+                    pickle.dump(result, f)
+                os.replace(path + ".tmp", path)
+
+    # Trade the test periods as one account, carrying holdings and cash across folds.
+    q1 = q2 = cash = 0.0
+    tested = []
+    for r in results:
+        result = run_pair_backtest(
+            r['scored'],
+            target_asset1_pct=target_asset1_pct,
+            z_score_threshold_high=r['high'],
+            z_score_threshold_low=r['low'],
+            dca_amount=dca_amount,
+            dca_every=dca_every,
+            initial_cash=cash,
+            initial_asset1_qty=q1,
+            initial_asset2_qty=q2,
+        )
+        last = result.equity.iloc[-1]
+        q1, q2, cash = float(last['asset1_qty']), float(last['asset2_qty']), float(last['Cash'])
+        tested.append(result)
+
+    summary = pd.DataFrame([{
+        'train_start': prices.index[start],
+        'test_start': prices.index[test_start],
+        'test_end': prices.index[end - 1],
+        'window': r['window'],
+        'high': r['high'],
+        'low': r['low'],
+        f'in_sample_{objective}': r['in_sample'],
+        f'oos_{objective}': backtest_score(result.equity['NAV'].to_numpy(), objective),
+        'oos_return': result.stats['total_return'],
+        'oos_max_drawdown': result.stats['max_drawdown'],
+        'oos_trades': result.stats['trades'],
+    } for (start, test_start, end), r, result in zip(folds, results, tested)])
+
+    # Only the DCA cash is new money; the holdings carried into a fold are not.
+    equity = pd.concat([result.equity['Equity'] for result in tested])
+    flows = np.concatenate([np.where(np.arange(len(result.equity)) % dca_every == 0, dca_amount, 0.0)
+                            for result in tested])
+    nav, drawdown = time_weighted_nav(equity.to_numpy(), flows)
+    equity = pd.DataFrame({'Equity': equity, 'Contributed': np.cumsum(flows), 'NAV': nav, 'Drawdown': drawdown},
+                          index=equity.index)
+    trades = pd.concat([result.trades for result in tested], ignore_index=True)
+    return WalkForwardResult(summary, equity, trades)
@@ -0,0 +1,194 @@
+import math
+
+import numpy as np
+import pandas as pd
+
+from formula import compile_spread_formula
+
+
+class RollingZScore:
+    """
+    Incremental version of the rolling statistics in ``calculate_z_score``.
+
+    Keeps a ring buffer of the last ``window`` spreads together with a running
+    mean and sum of squared deviations (Welford's algorithm, sliding-window
+    form). Each new bar is absorbed in O(1), so polling many pairs intraday no
+    longer means re-running ``rolling(window)`` over the whole history (see
+    ``core.scheduler.RefreshScheduler``).
+
+    The statistics match pandas' ``rolling(window).mean()`` / ``.std()``
+    (sample standard deviation, ``ddof=1``): they are NaN until the window is
+    full, and a NaN spread takes its bar's place in the window, making the
+    statistics NaN until it has rolled out again.
+    """
+
+    def __init__(self, window: int, spread_formula: str | None = None):
+        """
+        Args:
+            window (int): The rolling window period, in bars.
+            spread_formula (str, optional): Formula used by ``update_prices``.
+        """
+        if window < 2:
+            raise ValueError("window must be at least 2")
+        self.window = int(window)
+        self.spread_formula = spread_formula
+        self._buffer = np.full(self.window, math.nan, dtype=np.float64)
+        self._pos = 0
+        self._count = 0
+        self._n = 0  # finite spreads in the window
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.last_spread = math.nan
+
+    @classmethod
+    def from_frame(cls, df: pd.DataFrame, window: int, spread_formula: str | None = None) -> "RollingZScore":
+        """
+        Seeds a state from a batch result, e.g. the output of ``calculate_z_score``.
+
+        Only the last ``window`` rows of ``df['Spread']`` are used.
+        """
+        state = cls(window, spread_formula)
+        for spread in df['Spread'].to_numpy(dtype=float)[-state.window:]:
+            state.update(spread)
+        return state
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def is_ready(self) -> bool:
+        return self._n == self.window
+
+    @property
+    def mean(self) -> float:
+        return self._mean if self.is_ready else math.nan
+
+    @property
+    def std(self) -> float:
+        return self._std(self._n, self._m2)
+
+    @property
+    def z_score(self) -> float:
+        return self._z(self.last_spread, self._n, self._mean, self._m2)
+
+    def _std(self, n: int, m2: float) -> float:
+        if n < self.window:
+            return math.nan
+        return math.sqrt(max(m2, 0.0) / (self.window - 1))
+
+    def _z(self, x: float, n: int, mean: float, m2: float) -> float:
+        std = self._std(n, m2)
+        if math.isnan(std) or math.isnan(x):
+            return math.nan
+        if std == 0.0:
+            return math.nan if x == mean else math.copysign(math.inf, x - mean)
+        return (x - mean) / std
+
+    def _step(self, x: float) -> tuple[int, float, float]:
+        """``(n, mean, m2)`` after ``x`` enters the window (and the oldest spread leaves it)."""
+        n, mean, m2 = self._n, self._mean, self._m2
+        if self._count == self.window:
+            old = float(self._buffer[self._pos])
+            if math.isfinite(old):
+                if math.isfinite(x):
+                    # Replace in one step: same count, shifted mean.
+                    new_mean = mean + (x - old) / n
+                    return n, new_mean, m2 + (x - old) * ((x - new_mean) + (old - mean))
+                n -= 1
+                if n == 0:
+                    return 0, 0.0, 0.0
+                new_mean = (mean * (n + 1) - old) / n
+                m2 -= (old - new_mean) * (old - mean)
+                mean = new_mean
+        if math.isfinite(x):
+            n += 1
+            delta = x - mean
+            mean += delta / n
+            m2 += delta * (x - mean)
+        return n, mean, m2
+
+    def spreads(self) -> np.ndarray:
+        """The spreads currently in the window, oldest first (NaN for a bar without one)."""
+        if self._count < self.window:
+            return self._buffer[:self._count].copy()
+        return np.roll(self._buffer, -self._pos)
+
+    def update(self, spread: float) -> float:
+        """
+        Adds one spread value and returns the updated Z-score.
+
+        Args:
+            spread (float): The newest spread value (NaN for a bar without one).
+
+        Returns:
+            float: The Z-score of ``spread`` against the current window (NaN until full).
+        """
+        x = float(spread)
+        if math.isinf(x):
+            x = math.nan
+        self._n, self._mean, self._m2 = self._step(x)
+        self._buffer[self._pos] = x
+        self._pos = (self._pos + 1) % self.window
+        self._count = min(self._count + 1, self.window)
+        self.last_spread = x
+        return self.z_score
+
+    def preview(self, spread: float) -> dict:
+        """
+        The ``snapshot`` that ``update(spread)`` would produce, without changing
+        the state. Used for a bar that is still forming and may be revised.
+        """
+        x = float(spread)
+        if math.isinf(x):
+            x = math.nan
+        n, mean, m2 = self._step(x)
+        return {'Spread': x, 'Mean': mean if n == self.window else math.nan, 'Std': self._std(n, m2),
+                'Z_Score': self._z(x, n, mean, m2)}
+
+    def update_prices(self, p_asset1: float, p_asset2: float) -> float:
+        """
+        Computes the spread of a new price bar with ``spread_formula`` and absorbs it.
+        """
+        if self.spread_formula is None:
+            raise ValueError("spread_formula is required to update from prices")
+        spread = compile_spread_formula(self.spread_formula)(p_asset1, p_asset2)
+        return self.update(float(spread))
+
+    def snapshot(self) -> dict:
+        """Returns the current statistics in the column names used by ``calculate_z_score``."""
+        return {'Spread': self.last_spread, 'Mean': self.mean, 'Std': self.std, 'Z_Score': self.z_score}
+
+    def _replay(self, df: pd.DataFrame) -> np.ndarray:
+        replay = RollingZScore(self.window)
+        rows = []
+        for spread in df['Spread'].to_numpy(dtype=float):
+            replay.update(spread)
+            rows.append((replay.mean, replay.std, replay.z_score))
+        return np.array(rows, dtype=np.float64).reshape(-1, 3)
+
+    def max_deviation(self, df: pd.DataFrame) -> float:
+        """
+        Replays ``df['Spread']`` through a fresh state and compares the result with
+        the batch ``Mean``/``Std``/``Z_Score`` columns of ``df``.
+
+        Args:
+            df (pd.DataFrame): Output of ``calculate_z_score`` with the same window.
+
+        Returns:
+            float: The largest absolute difference over all rows and columns.
+        """
+        incremental = self._replay(df)
+        batch = df[['Mean', 'Std', 'Z_Score']].to_numpy(dtype=np.float64)
+        both_nan = np.isnan(incremental) & np.isnan(batch)
+        diff = np.where(both_nan, 0.0, np.abs(incremental - batch))
+        return float(np.nanmax(np.where(np.isnan(diff), np.inf, diff))) if diff.size else 0.0
+
+    def matches_batch(self, df: pd.DataFrame, rtol: float = 1e-9, atol: float = 1e-8) -> bool:
+        """
+        Whether replaying ``df['Spread']`` reproduces its batch statistics within
+        ``rtol`` (relative, so large spreads such as ``asset2 * 100`` compare
+        fairly) plus ``atol``, with NaN in the same places.
+        """
+        batch = df[['Mean', 'Std', 'Z_Score']].to_numpy(dtype=np.float64)
+        return bool(np.allclose(self._replay(df), batch, rtol=rtol, atol=atol, equal_nan=True))